@@ -0,0 +1,86 @@
+"""
+Otto Compression Benchmark
+Compares local extractive compression with bear-1 on recorded tool outputs,
+and single-request vs chunked parallel bear-1 on a large payload.
+Reports compression ratio and throughput; bear-1 rows need TTC_API_KEY.
+Run with: python bench_compression.py [iterations]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from local_compression import local_compress
+from ttc_compression import compress_chunked, compress_remote, get_client, split_chunks
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "tool_outputs.json")
+
+
+def bench_local(name: str, text: str, iterations: int) -> None:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        compressed = local_compress(text)
+    elapsed = (time.perf_counter() - t0) / iterations
+    ratio = len(text) / len(compressed) if compressed else 1.0
+    print(f"  {name:24} local  | {len(text):>5} -> {len(compressed):>5} chars | {ratio:4.2f}x"
+          f" | {elapsed * 1000:7.3f}ms | {len(text) / elapsed / 1e6:6.2f} MB/s")
+
+
+async def bench_remote(name: str, text: str) -> None:
+    t0 = time.perf_counter()
+    try:
+        compressed = await compress_remote(text)
+    except Exception as e:
+        print(f"  {name:24} bear-1 | failed: {e}")
+        return
+    elapsed = time.perf_counter() - t0
+    ratio = len(text) / len(compressed) if compressed else 1.0
+    print(f"  {name:24} bear-1 | {len(text):>5} -> {len(compressed):>5} chars | {ratio:4.2f}x"
+          f" | {elapsed * 1000:7.1f}ms | {len(text) / elapsed / 1e6:6.2f} MB/s")
+
+
+async def bench_large(outputs: dict) -> None:
+    """One bear-1 request for a large payload vs chunked parallel (cold, then cached)."""
+    text = "\n\n".join(outputs.values()) * 4
+    print(f"\n  Large payload: {len(text)} chars, {len(split_chunks(text))} chunks")
+    for label, compress in [("single request", compress_remote),
+                            ("chunked (cold)", compress_chunked),
+                            ("chunked (cached)", compress_chunked)]:
+        t0 = time.perf_counter()
+        try:
+            compressed = await compress(text)
+        except Exception as e:
+            print(f"  {label:24} | failed: {e}")
+            continue
+        elapsed = time.perf_counter() - t0
+        print(f"  {label:24} | {len(compressed):>5} chars | {elapsed * 1000:7.1f}ms")
+
+
+async def main(iterations: int) -> None:
+    with open(FIXTURES) as f:
+        outputs = json.load(f)
+
+    print("=" * 60)
+    print("OTTO COMPRESSION BENCHMARK")
+    print("=" * 60)
+    remote = get_client() is not None
+    for name, text in outputs.items():
+        bench_local(name, text, iterations)
+        if remote:
+            await bench_remote(name, text)
+    if remote:
+        await bench_large(outputs)
+    else:
+        print("(bear-1 skipped - add TTC_API_KEY to .env to compare)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,108 @@
+"""
+Otto Event Memory Benchmark
+Builds inbox and GitHub event lists the size of a busy user's history
+(10,000+ events per user, a few dozen distinct senders and authors) from
+the JSON the API returns, and measures the memory they hold as parsed
+dicts (what response.json() gives) and as compact Events, with
+tracemalloc (which also slows the timed parsing down). Also times ranking
+and formatting one user's events.
+Run with: python bench_events.py [events_per_user] [users]
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from events import compact_events
+from memory_accounting import deep_sizeof
+from tools import format_github_activity, format_email_page
+
+PEOPLE = [f"{first} {last}" for first in ("Sarah", "Alex", "Jordan", "Rachel", "Sam", "Priya")
+          for last in ("Chen", "Kim", "Lee", "Green", "Patel", "Nguyen")]
+REPOS = ["acme/otto", "acme/website", "acme/infra", "acme/mobile"]
+WORDS = "fix add update remove refactor login dashboard docs api cache worker build release tests".split()
+
+
+def sample_payloads(count: int, seed: int) -> tuple[bytes, bytes]:
+    """JSON bodies of /api/gmail and /api/github with `count` events each."""
+    rng = random.Random(seed)
+    now = datetime.now()
+    emails = [
+        {
+            "id": f"msg-{seed}-{i}",
+            "actor": f"{rng.choice(PEOPLE)} <{rng.randrange(40)}@example.com>",
+            "title": " ".join(rng.choice(WORDS) for _ in range(5)).capitalize(),
+            "date": (now - timedelta(minutes=7 * i)).strftime("%a, %d %b %Y %H:%M:%S"),
+            "unread": rng.random() < 0.3,
+        }
+        for i in range(count)
+    ]
+    github = [
+        {
+            "event_type": rng.choice(("commit", "commit", "commit", "pull_request")),
+            "actor": rng.choice(PEOPLE).split()[0],
+            "title": " ".join(rng.choice(WORDS) for _ in range(6)).capitalize(),
+            "date": (now - timedelta(minutes=5 * i)).isoformat(),
+            "repo": rng.choice(REPOS),
+            "state": "open",
+        }
+        for i in range(count)
+    ]
+    return (json.dumps({"events": emails, "nextCursor": "20", "connected": True}).encode(),
+            json.dumps({"events": github, "connected": True}).encode())
+
+
+def measure(build) -> tuple[object, int, float]:
+    """Run build() under tracemalloc; returns its result, bytes it still holds and seconds."""
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 12000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    payloads = [sample_payloads(count, seed) for seed in range(users)]
+
+    # What the cache held before: the parsed JSON of each response
+    as_dicts, dict_bytes, dict_seconds = measure(
+        lambda: [(json.loads(inbox), json.loads(github)) for inbox, github in payloads])
+    # Parsed, then reduced to Events (the JSON is freed once converted)
+    as_events, event_bytes, event_seconds = measure(
+        lambda: [(compact_events("email")(json.loads(inbox)), compact_events("commit")(json.loads(github)))
+                 for inbox, github in payloads])
+
+    total = 2 * count * users
+    print(f"{users} users x {count} emails + {count} GitHub events ({total} events)")
+    print(f"  dicts:  {dict_bytes / 1e6:7.2f} MB held | {dict_bytes / total:6.0f} B/event "
+          f"| parse {dict_seconds * 1000:6.0f}ms | deep_sizeof {deep_sizeof(as_dicts, limit=10_000_000) / 1e6:.2f} MB")
+    print(f"  Events: {event_bytes / 1e6:7.2f} MB held | {event_bytes / total:6.0f} B/event "
+          f"| parse + convert {event_seconds * 1000:6.0f}ms | deep_sizeof {deep_sizeof(as_events, limit=10_000_000) / 1e6:.2f} MB")
+    print(f"  {dict_bytes / event_bytes:.1f}x smaller")
+
+    inbox, github = as_events[0]
+    actors = {id(e.actor) for e in github["events"]}
+    print(f"  distinct actor strings in one user's {count} GitHub events: {len(actors)}")
+
+    t0 = time.perf_counter()
+    format_github_activity(github["events"])
+    format_email_page(inbox["events"][:20], has_more=True)
+    print(f"  rank + format one user's events: {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Otto Free/Busy Benchmark
+Times index build and slot search on synthetic dense calendars.
+Run with: python bench_freebusy.py [weeks] [people]
+"""
+
+import os
+import sys
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from freebusy import BusyIndex, find_free_slots
+
+
+def synthetic_calendar(start: datetime, weeks: int, meetings_per_day: int, rng: random.Random) -> list[tuple[float, float]]:
+    """Random 15-60 minute meetings on 15-minute boundaries between 8am and 7pm."""
+    intervals = []
+    for day in range(weeks * 7):
+        base = start + timedelta(days=day)
+        for _ in range(meetings_per_day):
+            begin = base.replace(hour=8) + timedelta(minutes=15 * rng.randrange(44))
+            length = timedelta(minutes=15 * rng.randint(1, 4))
+            intervals.append((begin.timestamp(), (begin + length).timestamp()))
+    return intervals
+
+
+def bench(weeks: int, people: int, meetings_per_day: int = 4, queries: int = 200):
+    rng = random.Random(42)
+    tz = timezone.utc
+    start = datetime(2026, 1, 5, tzinfo=tz)
+    end = start + timedelta(weeks=weeks)
+
+    intervals = []
+    for _ in range(people):
+        intervals.extend(synthetic_calendar(start, weeks, meetings_per_day, rng))
+
+    t0 = time.perf_counter()
+    index = BusyIndex(intervals)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    for i in range(queries):
+        duration = (30, 45, 60, 90)[i % 4]
+        slots = find_free_slots(index, start, end, duration, tz=tz, max_results=5)
+    query_ms = (time.perf_counter() - t0) * 1000 / queries
+
+    # Worst case: scan the whole range for a slot that never fits
+    t0 = time.perf_counter()
+    find_free_slots(index, start, end, 8 * 60 + 1, tz=tz)
+    full_scan_ms = (time.perf_counter() - t0) * 1000
+
+    print(
+        f"  {weeks:>3} weeks x {people:>2} people | {len(intervals):>6} busy -> {len(index):>5} merged"
+        f" | build {build_ms:7.2f}ms | query {query_ms:6.3f}ms | full scan {full_scan_ms:6.2f}ms"
+        f" | slots found {len(slots)}"
+    )
+
+
+if __name__ == "__main__":
+    weeks = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    people = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    print("=" * 60)
+    print("OTTO FREE/BUSY BENCHMARK")
+    print("=" * 60)
+    if weeks and people:
+        bench(weeks, people)
+    else:
+        for w, p in [(1, 1), (4, 2), (8, 3), (26, 3), (52, 5)]:
+            bench(w, p)
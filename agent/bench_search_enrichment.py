@@ -0,0 +1,75 @@
+"""
+Otto Search Enrichment Benchmark
+Enriches canned search results that point at the fixture pages served by
+the fake backend (one of them slow, one of them huge), cold and then from
+the page cache, for a few time budgets. Reports time per search, how many
+results were answered from their page rather than the snippet, and bytes
+read.
+Run with: python bench_search_enrichment.py [slow_chunk_delay_seconds]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import search_enrichment
+import shared_cache
+from fake_backend import start_fake_backend
+
+QUERIES = [
+    ("when was python 3.13 released", "python-release.html"),
+    ("espresso ratio grams shot time", "espresso.html"),
+]
+BUDGETS_MS = [300, 800, 1500]
+
+
+def results_for(base_url: str, page: str, delay: float) -> list[dict]:
+    return [
+        {"title": page, "href": f"{base_url}/pages/{page}", "body": "Snippet cut off at two hundred characters..."},
+        {"title": "Portal", "href": f"{base_url}/pages/menu-only.html", "body": "A page with only links."},
+        {"title": "Huge", "href": f"{base_url}/pages/huge.html?delay={delay}", "body": "A very large slow page."},
+    ]
+
+
+async def run(base_url: str, budget: float, delay: float) -> dict:
+    search_enrichment._page_cache = None
+    search_enrichment._stats.clear()
+    rows = {}
+    for label in ("cold", "cached"):
+        t0 = time.perf_counter()
+        answered = 0
+        for query, page in QUERIES:
+            answers = await search_enrichment.enrich_results(query, results_for(base_url, page, delay), budget=budget)
+            answered += sum(a is not None for a in answers)
+        rows[label] = ((time.perf_counter() - t0) * 1000 / len(QUERIES), answered)
+    rows["stats"] = search_enrichment.get_enrichment_stats()
+    return rows
+
+
+def main():
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    logging.disable(logging.WARNING)
+    shared_cache.SHARED_CACHE_BACKEND = "off"
+    search_enrichment.ALLOW_PRIVATE_HOSTS = True  # the fake backend is on loopback
+    server = start_fake_backend()
+
+    print(f"{len(QUERIES)} searches x 3 results, huge page chunks every {delay * 1000:.0f}ms")
+    for budget_ms in BUDGETS_MS:
+        rows = asyncio.run(run(server.url, budget_ms / 1000.0, delay))
+        stats = rows["stats"]
+        print(f"\nBudget {budget_ms}ms")
+        for label in ("cold", "cached"):
+            ms, answered = rows[label]
+            print(f"  {label:6} {ms:7.1f}ms per search | {answered}/{len(QUERIES) * 3} results answered from the page")
+        print(f"  read {stats['bytes'] / 1024:.0f} KB | timed out {stats['timed_out']} "
+              f"| cut at budget {stats['truncated']} | cached pages {stats['cached_pages']}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
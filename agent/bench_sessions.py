@@ -0,0 +1,182 @@
+"""
+Otto Session Density Benchmark
+Starts N real AgentSessions in one process (no room, and a scripted model
+in place of the realtime one) against the fake backend, runs several
+turns of tool calls in each, and reports RSS and tracemalloc growth per
+session once started, after half and after all of the turns, and after
+the sessions are closed.
+
+Each session loads its own Silero VAD, as main.py does, so the model's
+weights and inference state count towards its footprint. The scripted
+model holds no audio buffers or model connection, so the numbers are the
+VAD plus Otto's own per-session state (agent, session, tool data and
+caches) - a lower bound for a live realtime session, not a capacity figure.
+
+Sessions are only ever run one at a time: the tools read the current user
+from module-level state, which each session points at itself before its
+turn. This measures how much memory N live sessions hold, not how N
+sessions talking at once behave.
+Run with: python bench_sessions.py [sessions] [--turns N] [--trace]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from livekit.agents import AgentSession, llm
+from livekit.agents.llm import ChatChunk, ChoiceDelta, FunctionToolCall
+from livekit.plugins import silero
+
+import tools
+from fake_backend import start_fake_backend
+from main import OttoAgent
+from memory_accounting import cache_sizes, rss_bytes
+
+MB = 2 ** 20
+
+# What the user asks each turn, and the tool call the model answers it with
+TURNS = [
+    ("What's on my calendar?", "get_calendar_events", {}),
+    ("Any new email?", "get_unread_emails", {}),
+    ("What happened on GitHub?", "get_github_activity", {"repo_name": "all"}),
+    ("When am I free for half an hour?", "find_free_time", {"duration_minutes": 30}),
+]
+TOOL_FOR = {text: (name, args) for text, name, args in TURNS}
+
+
+class ScriptedLLM(llm.LLM):
+    """Answers each user turn with its tool call, then a short spoken reply."""
+
+    def chat(self, *, chat_ctx, tools=None, conn_options=llm.llm.DEFAULT_API_CONNECT_OPTIONS, **kwargs):
+        return ScriptedStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class ScriptedStream(llm.LLMStream):
+    async def _run(self) -> None:
+        last = self._chat_ctx.items[-1]
+        if last.type == "function_call_output":
+            delta = ChoiceDelta(role="assistant", content=f"Here's what I found. {last.output[:200]}")
+        else:
+            name, args = TOOL_FOR[last.text_content]
+            call = FunctionToolCall(name=name, arguments=json.dumps(args), call_id=f"call-{len(self._chat_ctx.items)}")
+            delta = ChoiceDelta(role="assistant", tool_calls=[call])
+        self._event_ch.send_nowait(ChatChunk(id=f"chunk-{len(self._chat_ctx.items)}", delta=delta))
+
+
+def use_session(name: str) -> str:
+    """Point the tools at a simulated session's user; returns its scope."""
+    tools.set_current_user_id(f"user-{name}")
+    tools.set_current_session_id(f"sim-{name}")
+    return tools.session_scope()
+
+
+async def start_session(name: str) -> tuple[AgentSession, str]:
+    scope = use_session(name)
+    session = AgentSession(llm=ScriptedLLM(), vad=silero.VAD.load())
+    await session.start(OttoAgent(frozenset({"google", "github"})))
+    return session, scope
+
+
+async def run_turns(sessions: list, turns: int, first: int = 0) -> None:
+    """Turns first..first+turns-1 in every session, one session at a time (the tools read the current user)."""
+    for turn in range(first, first + turns):
+        text = TURNS[turn % len(TURNS)][0]
+        for i, (session, _) in enumerate(sessions):
+            use_session(str(i))
+            await session.run(user_input=text)
+
+
+async def close_sessions(sessions: list) -> None:
+    for session, scope in sessions:
+        await session.aclose()
+        tools.close_session(scope)
+
+
+def measure() -> tuple[int, int]:
+    """(RSS, bytes traced by tracemalloc) after a full collection."""
+    gc.collect()
+    return rss_bytes(), tracemalloc.get_traced_memory()[0]
+
+
+def report(label: str, now: tuple[int, int], base: tuple[int, int], sessions: int) -> None:
+    rss, traced = now[0] - base[0], now[1] - base[1]
+    print(f"  {label:30} RSS {rss / MB:+7.1f} MB ({rss / sessions / 1024:+7.1f} KB/session)"
+          f" | traced {traced / MB:+7.1f} MB ({traced / sessions / 1024:+7.1f} KB/session)")
+
+
+async def bench(sessions: int, turns: int, trace: bool) -> None:
+    server = start_fake_backend()
+    tools.API_URL = server.url
+    tracemalloc.start()
+
+    # A warm worker: one session already run and closed, so that lazy
+    # imports and first-use setup aren't charged to the sessions below
+    with contextlib.redirect_stdout(io.StringIO()):
+        warmup = [await start_session("warmup")]
+        await run_turns(warmup, len(TURNS))
+        await close_sessions(warmup)
+    base = measure()
+    start_snapshot = tracemalloc.take_snapshot() if trace else None
+    print(f"  Baseline RSS (warm worker) {base[0] / MB:.1f} MB\n")
+
+    t0 = time.perf_counter()
+    live = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(sessions):
+            live.append(await start_session(str(i)))
+    report("Started", measure(), base, sessions)
+
+    # Half the turns, then the rest: what the second half adds is the cost of each further turn
+    half = max(1, turns // 2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        await run_turns(live, half)
+    report(f"After {half} turns", measure(), base, sessions)
+    with contextlib.redirect_stdout(io.StringIO()):
+        await run_turns(live, turns - half, first=half)
+    report(f"After {turns} turns", measure(), base, sessions)
+    elapsed = time.perf_counter() - t0
+
+    print("\n  Cache sizes:")
+    for name, size in cache_sizes().items():
+        print(f"    {name:20} {size['entries']:>6} entries | {size['bytes'] / 1024:8.1f} KB")
+
+    if trace:
+        diff = tracemalloc.take_snapshot().compare_to(start_snapshot, "filename")
+        print("\n  Top allocations since baseline by file (tracemalloc):")
+        for stat in diff[:10]:
+            print(f"    {stat.size_diff / 1024:8.1f} KB  {stat.traceback[0].filename}")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await close_sessions(live)
+    del live
+    print()
+    report("After closing all sessions", measure(), base, sessions)
+    print(f"\n  {sessions} sessions x {turns} turns in {elapsed:.1f}s (under tracemalloc)")
+
+    tracemalloc.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-session memory of started sessions")
+    parser.add_argument("sessions", nargs="?", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=8, help="User turns per session (each one tool call and a reply)")
+    parser.add_argument("--trace", action="store_true", help="Also break allocations down by file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print("=" * 60)
+    print("OTTO SESSION DENSITY BENCHMARK")
+    print("=" * 60)
+    asyncio.run(bench(args.sessions, args.turns, args.trace))
@@ -0,0 +1,149 @@
+"""
+Otto Shared Cache Benchmark
+Runs several worker processes against one fake backend, each serving the
+same users' morning tool calls (plus bear-1 compression of a long result,
+simulated with a fixed delay), first with the shared tier off and then on.
+Reports shared cache hit rates per process and overall, backend requests
+(how many were answered 304 Not Modified, and response bytes), remote
+compression calls and time per process.
+Run with: python bench_shared_cache.py [processes] [users] [--backend sqlite|redis]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import shared_cache
+import tools
+import ttc_compression
+from fake_backend import start_fake_backend
+
+# Simulated bear-1 round trip per chunk
+REMOTE_COMPRESS_SECONDS = 0.05
+# Remote compression calls made by this process
+_remote_calls = 0
+
+SAMPLE_TEXT = "\n\n".join(
+    f"Paragraph {i}: the quarterly planning notes cover hiring, the roadmap for "
+    f"the voice agent, latency budgets for tool calls and follow-ups from review {i}."
+    for i in range(60)
+)
+
+
+async def fake_compress_remote(text: str, aggressiveness: float = 0.7) -> str:
+    global _remote_calls
+    _remote_calls += 1
+    await asyncio.sleep(REMOTE_COMPRESS_SECONDS)
+    return text[: len(text) // 2]
+
+
+async def serve_users(users: list[str]) -> None:
+    for user in users:
+        tools.set_current_user_id(user)
+        tools.set_current_session_id(f"bench-{os.getpid()}-{user}")
+        await tools.get_calendar_events.__wrapped__(None)
+        await tools.get_unread_emails.__wrapped__(None)
+        await tools.get_github_activity.__wrapped__(None, "all")
+        await ttc_compression.compress_chunked(f"{user}\n\n{SAMPLE_TEXT}")
+
+
+def worker(index: int, api_url: str, backend: str, path: str, users: list[str], results) -> None:
+    tools.API_URL = api_url
+    shared_cache.SHARED_CACHE_BACKEND = backend
+    shared_cache.SHARED_CACHE_PATH = path
+    ttc_compression.compress_remote = fake_compress_remote
+
+    # Stagger starts so later processes can find what earlier ones wrote
+    time.sleep(index * 0.2)
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(serve_users(users))
+    elapsed = time.perf_counter() - t0
+
+    cache = shared_cache.get_shared_cache()
+    hits = sum(cache.hits.values())
+    misses = sum(cache.misses.values())
+    results.put({
+        "index": index,
+        "seconds": elapsed,
+        "hits": hits,
+        "misses": misses,
+        "remote_calls": _remote_calls,
+        "by_namespace": {ns: (cache.hits[ns], cache.misses[ns]) for ns in sorted(set(cache.hits) | set(cache.misses))},
+    })
+
+
+def run(processes: int, users: list[str], backend: str, path: str, server) -> dict:
+    state = server.state
+    requests_before = len(state.requests)
+    not_modified_before = state.not_modified
+    bytes_before = state.bytes_sent
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    procs = [
+        context.Process(target=worker, args=(i, server.url, backend, path, users, results))
+        for i in range(processes)
+    ]
+    for p in procs:
+        p.start()
+    rows = sorted((results.get() for _ in procs), key=lambda r: r["index"])
+    for p in procs:
+        p.join()
+
+    return {
+        "rows": rows,
+        "requests": len(state.requests) - requests_before,
+        "not_modified": state.not_modified - not_modified_before,
+        "bytes": state.bytes_sent - bytes_before,
+    }
+
+
+def print_run(label: str, run_result: dict) -> None:
+    print(f"\n{label}")
+    total_hits = total_misses = 0
+    for row in run_result["rows"]:
+        lookups = row["hits"] + row["misses"]
+        rate = row["hits"] / lookups if lookups else 0.0
+        total_hits += row["hits"]
+        total_misses += row["misses"]
+        namespaces = ", ".join(f"{ns} {h}/{h + m}" for ns, (h, m) in row["by_namespace"].items())
+        print(f"  process {row['index']}: {row['seconds']:6.2f}s | hit rate {rate:5.1%} "
+              f"| remote compressions {row['remote_calls']} | {namespaces or 'no lookups'}")
+    lookups = total_hits + total_misses
+    overall = total_hits / lookups if lookups else 0.0
+    print(f"  overall hit rate {overall:.1%} | backend requests {run_result['requests']} "
+          f"| 304 Not Modified {run_result['not_modified']} | response bytes {run_result['bytes'] / 1024:.1f} KB "
+          f"| remote compressions {sum(r['remote_calls'] for r in run_result['rows'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("processes", type=int, nargs="?", default=4)
+    parser.add_argument("users", type=int, nargs="?", default=5)
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "redis"])
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    server = start_fake_backend()
+    users = [f"user-{i}" for i in range(args.users)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "otto-cache.db")
+        print(f"{args.processes} processes x {args.users} users, chunk compression {REMOTE_COMPRESS_SECONDS * 1000:.0f}ms")
+        print_run("Shared cache off", run(args.processes, users, "off", path, server))
+        print_run(f"Shared cache on ({args.backend})", run(args.processes, users, args.backend, path, server))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
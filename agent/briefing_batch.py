@@ -0,0 +1,230 @@
+"""
+Otto Voice Agent - Briefing Batch
+Precomputes each active user's daily briefing off-peak with a bounded
+worker pool, using the same fetch and format helpers as the tools, and
+stores the compressed result on disk so a session can open with it
+instead of hitting every backend during the morning rush.
+
+Run once with: python briefing_batch.py --once
+Or every day at 5am: python briefing_batch.py --at 05:00 [--workers 8]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+load_dotenv()
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tools
+from tools import (
+    fetch_calendar_events,
+    fetch_email_page,
+    fetch_github_events,
+    format_calendar_events,
+    format_email_page,
+    format_github_activity,
+)
+from ttc_compression import compress_text
+
+BRIEFING_DIR = Path(os.getenv("OTTO_BRIEFING_DIR", Path(__file__).parent / ".briefings"))
+# Briefings older than this are not served (a missed run shouldn't read out yesterday)
+BRIEFING_MAX_AGE = float(os.getenv("OTTO_BRIEFING_MAX_AGE_HOURS", "12")) * 3600
+BRIEFING_WORKERS = int(os.getenv("OTTO_BRIEFING_WORKERS", "8"))
+BRIEFING_AGGRESSIVENESS = 0.5
+BRIEFING_EMAILS = 5
+
+
+def _briefing_path(user_id: str) -> Path:
+    name = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:24]
+    return BRIEFING_DIR / f"{name}.json"
+
+
+def store_briefing(user_id: str, text: str, raw_chars: int) -> Path:
+    """
+    Write a user's briefing atomically (readers never see a partial file).
+
+    Briefings read out inbox subjects, senders and calendar entries, so the
+    directory is owner-only (0700) and each file 0600.
+    """
+    BRIEFING_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    os.chmod(BRIEFING_DIR, 0o700)
+    path = _briefing_path(user_id)
+    tmp = path.with_suffix(".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    with os.fdopen(fd, "w") as f:
+        os.fchmod(fd, 0o600)  # a leftover .tmp keeps its old mode
+        f.write(json.dumps({
+            "user_id": user_id,
+            "generated_at": time.time(),
+            "raw_chars": raw_chars,
+            "text": text,
+        }))
+    os.replace(tmp, path)
+    return path
+
+
+def load_briefing(user_id: str, max_age: float = BRIEFING_MAX_AGE) -> Optional[str]:
+    """
+    Get a user's precomputed briefing if one is fresh enough.
+
+    Args:
+        user_id: The user to look up
+        max_age: Maximum age in seconds
+    """
+    try:
+        data = json.loads(_briefing_path(user_id).read_text())
+    except (OSError, ValueError):
+        return None
+    if data.get("user_id") != user_id or time.time() - data.get("generated_at", 0) > max_age:
+        return None
+    return data.get("text") or None
+
+
+async def list_active_users(client: httpx.AsyncClient) -> list[dict]:
+    """
+    Users with at least one connected integration, as {"id", "connected"}.
+
+    Raises RuntimeError without AGENT_SECRET: the list is only served to the agent.
+    """
+    secret = os.getenv("AGENT_SECRET")
+    if not secret:
+        raise RuntimeError("AGENT_SECRET is not set - it is required to list users (or pass --users)")
+    response = await client.get(f"{tools.API_URL}/api/agent/users", headers={"x-agent-secret": secret}, timeout=30.0)
+    response.raise_for_status()
+    return response.json().get("users", [])
+
+
+async def build_briefing(client: httpx.AsyncClient, user_id: str, connected: list[str]) -> Optional[str]:
+    """
+    Fetch and format every briefing section for one user.
+
+    Sections that fail are left out; returns None if none succeeded.
+    """
+    async def calendar() -> str:
+        return format_calendar_events(await fetch_calendar_events(client, 1, user_id))
+
+    async def emails() -> str:
+        page, next_cursor = await fetch_email_page(BRIEFING_EMAILS, user_id=user_id)
+        if not page:
+            return "No unread emails found. Your inbox is clear!"
+        return format_email_page(page, has_more=bool(next_cursor))
+
+    async def github() -> str:
+        semaphore = asyncio.Semaphore(1)
+        return format_github_activity(await fetch_github_events(client, None, 1, semaphore, user_id))
+
+    sections = []
+    if "google" in connected:
+        sections += [("Calendar", calendar), ("Email", emails)]
+    if "github" in connected:
+        sections.append(("GitHub", github))
+    if not sections:
+        return None
+
+    results = await asyncio.gather(*(fetch() for _, fetch in sections), return_exceptions=True)
+    parts = []
+    for (label, _), result in zip(sections, results):
+        if isinstance(result, BaseException):
+            logging.warning(f"Briefing {label} section failed for {user_id}: {result}")
+        else:
+            parts.append(f"{label}:\n{result}")
+    return "\n\n".join(parts) if parts else None
+
+
+async def run_batch(workers: int = BRIEFING_WORKERS, user_ids: Optional[list[str]] = None) -> dict:
+    """
+    Precompute briefings for all active users with a bounded worker pool.
+
+    Args:
+        workers: Number of users processed concurrently
+        user_ids: Only these users (assumed fully connected) instead of listing them
+    """
+    started = time.perf_counter()
+    stats = {"users": 0, "built": 0, "empty": 0, "failed": 0, "raw_chars": 0, "stored_chars": 0}
+
+    async with httpx.AsyncClient() as client:
+        if user_ids:
+            users = [{"id": u, "connected": ["google", "github"]} for u in user_ids]
+        else:
+            users = await list_active_users(client)
+        stats["users"] = len(users)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for user in users:
+            queue.put_nowait(user)
+
+        async def worker():
+            while True:
+                try:
+                    user = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                user_id = user["id"]
+                try:
+                    text = await build_briefing(client, user_id, user.get("connected", []))
+                    if text is None:
+                        stats["empty"] += 1
+                        continue
+                    compressed = await compress_text(text, BRIEFING_AGGRESSIVENESS)
+                    store_briefing(user_id, compressed, len(text))
+                    stats["built"] += 1
+                    stats["raw_chars"] += len(text)
+                    stats["stored_chars"] += len(compressed)
+                except Exception as e:
+                    logging.error(f"Briefing failed for {user_id}: {e}")
+                    stats["failed"] += 1
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(workers, len(users) or 1)))))
+
+    stats["elapsed_s"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def next_run(at: str, now: Optional[datetime] = None) -> datetime:
+    """Next local time matching HH:MM (today if still ahead, else tomorrow)."""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in at.split(":"))
+    run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return run if run > now else run + timedelta(days=1)
+
+
+async def run_daily(at: str, workers: int) -> None:
+    """Run the batch every day at the given local time."""
+    while True:
+        run = next_run(at)
+        print(f"⏰ Next briefing batch at {run:%Y-%m-%d %H:%M}")
+        await asyncio.sleep((run - datetime.now()).total_seconds())
+        try:
+            print(f"📰 Briefing batch: {await run_batch(workers)}")
+        except Exception as e:
+            logging.error(f"Briefing batch failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute daily briefings")
+    parser.add_argument("--once", action="store_true", help="Run a single batch now and exit")
+    parser.add_argument("--at", default="05:00", help="Daily run time, local HH:MM (default: 05:00)")
+    parser.add_argument("--workers", type=int, default=BRIEFING_WORKERS, help="Users processed concurrently")
+    parser.add_argument("--users", help="Comma-separated user IDs instead of listing active users")
+    args = parser.parse_args()
+    if not args.users and not os.getenv("AGENT_SECRET"):
+        parser.error("AGENT_SECRET must be set to list active users (or pass --users)")
+
+    if args.once:
+        user_ids = [u.strip() for u in args.users.split(",") if u.strip()] if args.users else None
+        print(f"📰 Briefing batch: {asyncio.run(run_batch(args.workers, user_ids))}")
+    else:
+        asyncio.run(run_daily(args.at, args.workers))
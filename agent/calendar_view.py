@@ -0,0 +1,380 @@
+"""
+Otto Voice Agent - Calendar View
+One fetch of the user's calendar covers a range of days: events are
+normalized to the user's time zone, recurring series are expanded into
+their occurrences (with moved and cancelled instances applied), and the
+result is indexed by day. Later questions about any day in the range
+("and tomorrow?", "what about Thursday?") are answered from the index.
+
+/api/calendar?days=N returns series rather than instances (singleEvents
+off), so a daily standup is one event with an RRULE instead of N copies.
+A series is expanded in the zone it was written in (its timeZone), so it
+keeps its wall-clock time across DST changes there, and each occurrence
+is then converted to the user's zone.
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# Days fetched per request, from today - a week covers most follow-ups
+CALENDAR_FETCH_DAYS = int(os.getenv("OTTO_CALENDAR_FETCH_DAYS", "7"))
+# Longest range one query may cover - also how far ahead /api/calendar?days= reaches
+CALENDAR_MAX_DAYS = 31
+# Seconds a fetched range is trusted before refetching
+CALENDAR_VIEW_TTL = 120
+# Safety bound on occurrences generated from one series
+MAX_OCCURRENCES = 500
+
+_WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+_DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+@dataclass(slots=True)
+class Occurrence:
+    """One meeting on one day, in the user's time zone (a week of them stays cached)."""
+    event_id: str
+    title: str
+    start: datetime
+    end: datetime
+    all_day: bool = False
+    location: Optional[str] = None
+
+
+def parse_when(value: str, tz: tzinfo) -> tuple[datetime, bool]:
+    """
+    An API start/end as an aware datetime in tz, and whether it was a bare date.
+
+    Naive times are taken to already be in tz.
+    """
+    if len(value) == 10:
+        return datetime.fromisoformat(value).replace(tzinfo=tz), True
+    when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if when.tzinfo is None:
+        return when.replace(tzinfo=tz), False
+    return when.astimezone(tz), False
+
+
+def parse_rrule(rule: str) -> dict[str, str]:
+    """"RRULE:FREQ=WEEKLY;BYDAY=MO,WE" -> {"FREQ": "WEEKLY", "BYDAY": "MO,WE"}"""
+    rule = rule.split(":", 1)[1] if rule.upper().startswith("RRULE:") else rule
+    parts = dict(p.split("=", 1) for p in rule.split(";") if "=" in p)
+    return {k.upper(): v.upper() for k, v in parts.items()}
+
+
+def _parse_exdates(rules: list[str], tz: tzinfo) -> tuple[set[datetime], set[date]]:
+    """
+    EXDATE lines as excluded start times, plus excluded whole days for
+    VALUE=DATE entries. Times take the line's TZID, UTC for a Z suffix, and
+    else the series' zone.
+    """
+    times: set[datetime] = set()
+    days: set[date] = set()
+    for line in rules:
+        if not line.upper().startswith("EXDATE"):
+            continue
+        params, _, values = line.partition(":")
+        zone = tz
+        for param in params.split(";")[1:]:
+            key, _, value = param.partition("=")
+            if key.upper() == "TZID":
+                try:
+                    zone = ZoneInfo(value)
+                except Exception:
+                    logging.warning(f"Unknown EXDATE zone {value}, using the series zone")
+        for value in values.split(","):
+            value = value.strip()
+            try:
+                if "T" not in value:
+                    days.add(datetime.strptime(value, "%Y%m%d").date())
+                elif value.endswith("Z"):
+                    times.add(datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc))
+                else:
+                    times.add(datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=zone))
+            except ValueError:
+                logging.warning(f"Skipping bad EXDATE value {value}")
+    return times, days
+
+
+def _parse_until(value: str, tz: tzinfo) -> datetime:
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc).astimezone(tz)
+    if "T" in value:
+        return datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=tz)
+    return datetime.strptime(value, "%Y%m%d").replace(hour=23, minute=59, second=59, tzinfo=tz)
+
+
+def _add_months(when: datetime, months: int) -> Optional[datetime]:
+    month = when.month - 1 + months
+    year = when.year + month // 12
+    try:
+        return when.replace(year=year, month=month % 12 + 1)
+    except ValueError:
+        return None  # e.g. the 31st in a shorter month - RFC 5545 skips it
+
+
+def recurrence_starts(
+    start: datetime,
+    rules: list[str],
+    range_start: datetime,
+    range_end: datetime,
+    tz: tzinfo,
+) -> list[datetime]:
+    """
+    Start times of a series between range_start and range_end.
+
+    start must be in the series' own zone tz: occurrences keep its wall-clock
+    time there. Supports FREQ DAILY/WEEKLY/MONTHLY/YEARLY with INTERVAL,
+    COUNT, UNTIL and weekly BYDAY, plus EXDATE lines. Anything else yields
+    just the first start.
+    """
+    rrule = next((parse_rrule(r) for r in rules if r.upper().startswith("RRULE")), None)
+    excluded_times, excluded_days = _parse_exdates(rules, tz)
+    if rrule is None:
+        return [start]
+
+    freq = rrule.get("FREQ")
+    interval = max(1, int(rrule.get("INTERVAL", "1")))
+    count = int(rrule["COUNT"]) if "COUNT" in rrule else None
+    until = _parse_until(rrule["UNTIL"], tz) if "UNTIL" in rrule else None
+    stop = min(range_end, until) if until else range_end
+    byday = [_WEEKDAYS.index(d[-2:]) for d in rrule.get("BYDAY", "").split(",") if d[-2:] in _WEEKDAYS]
+    if freq not in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY") or (byday and freq != "WEEKLY"):
+        logging.warning(f"Unsupported recurrence {rrule}, showing the first occurrence only")
+        return [start]
+
+    starts = []
+    n = 0
+    step = 0
+    # Aware datetime arithmetic keeps the wall-clock time across DST changes
+    while len(starts) < MAX_OCCURRENCES:
+        if freq == "DAILY":
+            candidates = [start + timedelta(days=step * interval)]
+        elif freq == "WEEKLY":
+            week_start = start - timedelta(days=start.weekday()) + timedelta(weeks=step * interval)
+            days = byday or [start.weekday()]
+            candidates = [week_start + timedelta(days=d) for d in sorted(days)]
+        elif freq == "MONTHLY":
+            candidates = [_add_months(start, step * interval)]
+        else:
+            candidates = [_add_months(start, 12 * step * interval)]
+        step += 1
+
+        past_stop = False
+        for candidate in candidates:
+            if candidate is None or candidate < start:
+                continue
+            if candidate > stop:
+                past_stop = True
+                break
+            n += 1
+            if count is not None and n > count:
+                past_stop = True
+                break
+            # Aware datetimes compare as instants, whatever zone the EXDATE was in
+            if (candidate >= range_start and candidate not in excluded_times
+                    and candidate.date() not in excluded_days):
+                starts.append(candidate)
+        if past_stop:
+            break
+    return starts
+
+
+def build_day_index(events: list[dict], first_day: date, last_day: date, tz: tzinfo) -> dict[date, list[Occurrence]]:
+    """
+    Occurrences from first_day through last_day, by day and in start order.
+
+    Events are API series or single events; instances with a recurringEventId
+    replace (or, when cancelled, remove) the series occurrence they moved.
+    Timed events are read in their own timeZone (tz if none) and shown in tz;
+    all-day events are dates, the same in every zone.
+    """
+    range_start = datetime.combine(first_day, datetime.min.time(), tz)
+    range_end = datetime.combine(last_day + timedelta(days=1), datetime.min.time(), tz)
+
+    # (series ID, original start) of instances that were moved or cancelled
+    overridden = set()
+    for e in events:
+        if e.get("recurringEventId") and e.get("originalStart"):
+            original, _ = parse_when(e["originalStart"], _event_zone(e, tz))
+            overridden.add((e["recurringEventId"], original))
+
+    index: dict[date, list[Occurrence]] = {}
+    for e in events:
+        if e.get("status") == "cancelled" or not e.get("start"):
+            continue
+        try:
+            # All-day events are bare dates - the same days in every zone
+            zone = tz if len(e["start"]) == 10 else _event_zone(e, tz)
+            start, all_day = parse_when(e["start"], zone)
+            end = parse_when(e["end"], zone)[0] if e.get("end") else start + (
+                timedelta(days=1) if all_day else timedelta(hours=1))
+        except (TypeError, ValueError):
+            logging.warning(f"Skipping calendar event with bad times: {e.get('id')}")
+            continue
+        duration = end - start
+        if e.get("recurrence"):
+            starts = recurrence_starts(start, e["recurrence"], range_start - duration, range_end, zone)
+        else:
+            starts = [start]
+        for occurrence_start in starts:
+            if (e.get("id"), occurrence_start) in overridden:
+                continue
+            # Wall-clock duration in the series' zone, then shown in the user's
+            occurrence_end = (occurrence_start + duration).astimezone(tz)
+            occurrence_start = occurrence_start.astimezone(tz)
+            if occurrence_end <= range_start or occurrence_start >= range_end:
+                continue
+            occurrence = Occurrence(
+                e.get("id", ""), e.get("title", "Untitled meeting"),
+                occurrence_start, occurrence_end, all_day, e.get("location"),
+            )
+            # All-day and multi-day events appear on each day they cover
+            day = max(occurrence_start.date(), first_day)
+            while day <= last_day and datetime.combine(day, datetime.min.time(), tz) < occurrence_end:
+                index.setdefault(day, []).append(occurrence)
+                day += timedelta(days=1)
+
+    for occurrences in index.values():
+        occurrences.sort(key=lambda o: (not o.all_day, o.start))
+    return index
+
+
+def _event_zone(event: dict, default: tzinfo) -> tzinfo:
+    """The zone an event was written in, from its timeZone field."""
+    name = event.get("timeZone")
+    if name:
+        try:
+            return ZoneInfo(name)
+        except Exception:
+            logging.warning(f"Unknown event time zone {name}, using the user's")
+    return default
+
+
+class CalendarView:
+    """A fetched range of days for one user, indexed by day."""
+
+    def __init__(self, user_id: str, first_day: date, last_day: date, tz: tzinfo, events: list[dict]):
+        self.user_id = user_id
+        self.first_day = first_day
+        self.last_day = last_day
+        self.tz = tz
+        self.fetched_at = time.monotonic()
+        self.days = build_day_index(events, first_day, last_day, tz)
+
+    def covers(self, first_day: date, last_day: date) -> bool:
+        fresh = time.monotonic() - self.fetched_at < CALENDAR_VIEW_TTL
+        return fresh and self.first_day <= first_day and last_day <= self.last_day
+
+    def occurrences(self, first_day: date, last_day: date) -> dict[date, list[Occurrence]]:
+        """The indexed days from first_day through last_day (days without meetings included)."""
+        days = {}
+        day = first_day
+        while day <= last_day:
+            days[day] = self.days.get(day, [])
+            day += timedelta(days=1)
+        return days
+
+
+def parse_day(text: Optional[str], today: date) -> date:
+    """"today", "tomorrow", a weekday name or YYYY-MM-DD -> a date (today if unrecognized)."""
+    if not text:
+        return today
+    value = text.lower().strip()
+    if value == "tomorrow":
+        return today + timedelta(days=1)
+    if value.startswith("next "):
+        value = value[5:]
+    if value in _DAY_NAMES:
+        ahead = (_DAY_NAMES.index(value) - today.weekday()) % 7
+        return today + timedelta(days=ahead)
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return today
+
+
+def _day_label(day: date, today: date) -> str:
+    if day == today:
+        return "Today"
+    if day == today + timedelta(days=1):
+        return "Tomorrow"
+    return f"{day:%A %b} {day.day}"
+
+
+def _clock(when: datetime) -> str:
+    return when.strftime("%I:%M %p").lstrip("0")
+
+
+def _describe(o: Occurrence) -> str:
+    when = "all day" if o.all_day else f"at {_clock(o.start)}"
+    where = f" ({o.location})" if o.location else ""
+    return f"{o.title} {when}{where}"
+
+
+def format_calendar_view(days: dict[date, list[Occurrence]], today: date) -> str:
+    """Format a range of days for voice, grouped by day with times in the user's zone"""
+    total = sum(len(o) for o in days.values())
+    zone = next((o.start.tzname() for occurrences in days.values() for o in occurrences), None)
+    zone_line = [f"Times are {zone}."] if zone else []
+
+    if len(days) == 1:
+        day, occurrences = next(iter(days.items()))
+        label = _day_label(day, today).lower() if day in (today, today + timedelta(days=1)) else f"on {_day_label(day, today)}"
+        if not occurrences:
+            return f"No meetings scheduled {label}. Your calendar is clear!"
+        lines = [f"You have {total} meeting{'s' if total != 1 else ''} {label}:"]
+        lines.extend(f"  - {_describe(o)}" for o in occurrences)
+        return "\n".join(lines + zone_line)
+
+    if not total:
+        return f"No meetings in the next {len(days)} days. Your calendar is clear!"
+    lines = [f"You have {total} meetings over {len(days)} days:"]
+
+    # A meeting at the same time on 3+ days is said once rather than per day
+    repeats: dict[str, list[date]] = {}
+    for day, occurrences in days.items():
+        for o in occurrences:
+            repeats.setdefault(_describe(o), []).append(day)
+    repeats = {text: on for text, on in repeats.items() if len(on) >= 3}
+    if repeats:
+        lines.append("Repeating:")
+        for text, on in repeats.items():
+            # Weekday names alone are ambiguous past a week
+            names = [f"{d:%a}" if len(days) <= 7 else f"{d:%a %b} {d.day}" for d in on]
+            lines.append(f"  - {text} on {', '.join(names)}")
+
+    for day, occurrences in days.items():
+        rest = [text for text in map(_describe, occurrences) if text not in repeats]
+        if rest:
+            lines.append(f"{_day_label(day, today)}:")
+            lines.extend(f"  - {text}" for text in rest)
+    return "\n".join(lines + zone_line)
+
+
+# Latest fetched range per user
+_views: dict[str, CalendarView] = {}
+
+
+def get_cached_view(user_id: str, first_day: date, last_day: date) -> Optional[CalendarView]:
+    """The user's fetched range if it is fresh and covers these days."""
+    view = _views.get(user_id)
+    if view is not None and view.covers(first_day, last_day):
+        return view
+    return None
+
+
+def store_view(view: CalendarView) -> None:
+    _views[view.user_id] = view
+
+
+def invalidate_calendar_view(user_id: Optional[str] = None) -> None:
+    """Drop the fetched range (of one user, or everyone), e.g. after creating an event."""
+    if user_id is None:
+        _views.clear()
+    else:
+        _views.pop(user_id, None)
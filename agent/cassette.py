@@ -0,0 +1,357 @@
+"""
+Otto Voice Agent - Record/Replay Cassettes
+Captures the agent's external exchanges - backend HTTP calls, DuckDuckGo
+searches, result pages and the DNS answers they were checked against, and
+bear-1 compressions - into a JSON cassette, and serves them
+back later without any network, sleeping for the recorded latency times a
+scale factor. Replayed runs are repeatable, so timings can be compared.
+
+Use from a driver script:
+    with use_cassette("morning.json", "record"):   # against the real services
+        ...
+    with use_cassette("morning.json", "replay", latency_scale=0.0):
+        ...
+or set OTTO_CASSETTE, OTTO_CASSETTE_MODE and OTTO_CASSETTE_LATENCY_SCALE
+and call cassette_from_env().
+
+Caches that would answer calls without making them (the host-wide shared
+tier, conditional GET entries, summaries on disk, in-process chunk, page
+and calendar caches) are swapped for empty ones while a cassette is in
+use, and recording never sends If-None-Match, so a cassette always holds
+full responses and replays the same on any machine.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import duckduckgo_search
+
+import calendar_view
+import email_summaries
+import http_cache
+import search_enrichment
+import shared_cache
+import ttc_compression
+
+CASSETTE_VERSION = 1
+
+# Response headers worth keeping; the body is stored decoded, so no encoding/length
+_KEEP_HEADERS = ("content-type", "etag", "idempotent-replayed")
+
+
+class CassetteMiss(Exception):
+    """A replayed run made a call that was never recorded."""
+
+
+def _hash(*parts: Any) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Recorded exchanges and the patches that record or replay them."""
+
+    def __init__(self, path: str, mode: str = "replay", latency_scale: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Cassette mode must be 'record' or 'replay', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.http: list[dict] = []
+        self.search: list[dict] = []
+        self.compression: list[dict] = []
+        self.dns: list[dict] = []
+        self.misses = 0
+        self._patches: list[tuple[Any, str, Any]] = []
+
+        if mode == "replay":
+            with open(path) as f:
+                data = json.load(f)
+            self.http = data.get("http", [])
+            self.search = data.get("search", [])
+            self.compression = data.get("compression", [])
+            self.dns = data.get("dns", [])
+
+        # Replay queues: exact request first, then any request to the same
+        # endpoint (bodies can embed today's date); the last answer repeats
+        self._http_exact: dict[str, deque] = defaultdict(deque)
+        self._http_loose: dict[str, deque] = defaultdict(deque)
+        for entry in self.http:
+            self._http_exact[entry["key"]].append(entry)
+            self._http_loose[entry["method"] + " " + entry["path"]].append(entry)
+        self._search = {entry["key"]: entry for entry in self.search}
+        self._compression = {entry["key"]: entry for entry in self.compression}
+        self._dns = {entry["key"]: entry for entry in self.dns}
+
+    # --- patching ---
+
+    def _patch(self, owner: Any, name: str, value: Any) -> None:
+        self._patches.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def install(self) -> None:
+        """Route HTTP, search, DNS and compression through the cassette, starting from empty caches."""
+        self._isolate_caches()
+        self._patch(httpx.AsyncHTTPTransport, "handle_async_request", self._http_handler())
+        search_class = self._search_class()
+        self._patch(duckduckgo_search, "DDGS", search_class)
+        # tools imported DDGS by name
+        if "tools" in sys.modules:
+            self._patch(sys.modules["tools"], "DDGS", search_class)
+        self._patch(search_enrichment, "resolve_host", self._resolve_host())
+        self._patch(ttc_compression, "compress_remote", self._compress_remote())
+        if self.mode == "replay" and self.compression:
+            # bear-1 was used when recording, so "configure" it for replay too
+            self._patch(ttc_compression, "get_client", lambda: self)
+
+    def _isolate_caches(self) -> None:
+        # A warm cache while recording would leave calls (or 304s) in the
+        # cassette that a cold replay can't answer
+        self._patch(shared_cache, "_shared_cache", shared_cache.SharedCache())
+        self._patch(shared_cache, "_shared_cache_pid", os.getpid())
+        self._patch(http_cache, "_cache", http_cache.RevalidationCache())
+        self._patch(email_summaries, "_store", email_summaries.EmailSummaryStore(":memory:"))
+        self._patch(search_enrichment, "_page_cache", search_enrichment.PageCache())
+        self._patch(ttc_compression, "_chunk_cache", type(ttc_compression._chunk_cache)())
+        self._patch(calendar_view, "_views", {})
+        if "tools" in sys.modules:
+            self._patch(sys.modules["tools"], "_integrations_cache", {})
+
+    def uninstall(self) -> None:
+        """Undo install(), most recent patch first."""
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    def save(self) -> None:
+        """Write recorded exchanges to the cassette file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({
+                "version": CASSETTE_VERSION,
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "http": self.http,
+                "search": self.search,
+                "compression": self.compression,
+                "dns": self.dns,
+            }, f, indent=1)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "http": len(self.http),
+            "search": len(self.search),
+            "compression": len(self.compression),
+            "dns": len(self.dns),
+            "misses": self.misses,
+        }
+
+    def _delay(self, latency_ms: float) -> float:
+        return max(0.0, latency_ms * self.latency_scale / 1000.0)
+
+    # --- backend HTTP ---
+
+    def _http_handler(self):
+        cassette = self
+        original = httpx.AsyncHTTPTransport.handle_async_request
+
+        async def handle(transport, request: httpx.Request) -> httpx.Response:
+            url = urlsplit(str(request.url))
+            path = url.path + (f"?{url.query}" if url.query else "")
+            if "sni_hostname" in request.extensions:
+                # A result page, sent to a resolved address: the host tells pages apart
+                path = f"//{request.headers['host']}{path}"
+            body = request.content.decode("utf-8", "replace")
+            key = _hash(request.method, path, body)
+
+            if cassette.mode == "replay":
+                entry = cassette._next_http(key, request.method + " " + path)
+                await asyncio.sleep(cassette._delay(entry["latency_ms"]))
+                return httpx.Response(
+                    entry["status"],
+                    headers=entry["headers"],
+                    content=entry["body"].encode("utf-8"),
+                    request=request,
+                )
+
+            # Record the full body, never a 304 for something cached outside the cassette
+            request.headers.pop("If-None-Match", None)
+            t0 = time.perf_counter()
+            response = await original(transport, request)
+            content = await response.aread()
+            latency_ms = (time.perf_counter() - t0) * 1000
+            headers = {k: v for k, v in response.headers.items() if k.lower() in _KEEP_HEADERS}
+            cassette.http.append({
+                "key": key,
+                "method": request.method,
+                "path": path,
+                "status": response.status_code,
+                "headers": headers,
+                "body": content.decode("utf-8", "replace"),
+                "latency_ms": round(latency_ms, 2),
+            })
+            return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+        return handle
+
+    def _next_http(self, key: str, endpoint: str) -> dict:
+        exact = self._http_exact.get(key)
+        loose = self._http_loose.get(endpoint)
+        if exact:
+            entry = exact.popleft() if len(exact) > 1 else exact[0]
+        elif loose:
+            entry = loose[0]
+        else:
+            self.misses += 1
+            raise CassetteMiss(f"No recorded response for {endpoint}")
+        # Consume it from the endpoint queue too, keeping the last answer
+        if loose and len(loose) > 1 and entry in loose:
+            loose.remove(entry)
+        return entry
+
+    # --- DuckDuckGo ---
+
+    def _search_class(self):
+        cassette = self
+        original_class = duckduckgo_search.DDGS
+
+        class CassetteDDGS:
+            """DDGS stand-in: records real searches or replays them (blocking, like the real one)."""
+
+            def __init__(self, *args, **kwargs):
+                self._real = original_class(*args, **kwargs) if cassette.mode == "record" else None
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                if self._real is not None and hasattr(self._real, "__exit__"):
+                    self._real.__exit__(*exc)
+                return False
+
+            def text(self, keywords: str, max_results: Optional[int] = None, **kwargs) -> list[dict]:
+                key = _hash(keywords, max_results)
+                if cassette.mode == "replay":
+                    entry = cassette._search.get(key)
+                    if entry is None:
+                        cassette.misses += 1
+                        raise CassetteMiss(f"No recorded search for {keywords!r}")
+                    time.sleep(cassette._delay(entry["latency_ms"]))
+                    return entry["results"]
+
+                t0 = time.perf_counter()
+                results = list(self._real.text(keywords, max_results=max_results, **kwargs))
+                cassette.search.append({
+                    "key": key,
+                    "query": keywords,
+                    "results": results,
+                    "latency_ms": round((time.perf_counter() - t0) * 1000, 2),
+                })
+                return results
+
+        return CassetteDDGS
+
+    # --- DNS (result page hosts) ---
+
+    def _resolve_host(self):
+        cassette = self
+        original = search_enrichment.resolve_host
+
+        async def resolve_host(host: str, port: int) -> list[str]:
+            key = _hash(host, port)
+            if cassette.mode == "replay":
+                entry = cassette._dns.get(key)
+                if entry is None:
+                    cassette.misses += 1
+                    raise CassetteMiss(f"No recorded DNS answer for {host}")
+                await asyncio.sleep(cassette._delay(entry["latency_ms"]))
+                return entry["addresses"]
+
+            t0 = time.perf_counter()
+            addresses = await original(host, port)
+            cassette.dns.append({
+                "key": key,
+                "host": host,
+                "addresses": addresses,
+                "latency_ms": round((time.perf_counter() - t0) * 1000, 2),
+            })
+            return addresses
+
+        return resolve_host
+
+    # --- bear-1 ---
+
+    def _compress_remote(self):
+        cassette = self
+        original = ttc_compression.compress_remote
+
+        async def compress_remote(text: str, aggressiveness: float = 0.7) -> str:
+            key = _hash(text, aggressiveness)
+            if cassette.mode == "replay":
+                entry = cassette._compression.get(key)
+                if entry is None:
+                    # Same as bear-1 being down: the caller falls back to local
+                    cassette.misses += 1
+                    raise CassetteMiss("No recorded compression for this text")
+                await asyncio.sleep(cassette._delay(entry["latency_ms"]))
+                return entry["output"]
+
+            t0 = time.perf_counter()
+            output = await original(text, aggressiveness)
+            cassette.compression.append({
+                "key": key,
+                "chars": len(text),
+                "output": output,
+                "latency_ms": round((time.perf_counter() - t0) * 1000, 2),
+            })
+            return output
+
+        return compress_remote
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", latency_scale: float = 1.0):
+    """
+    Record or replay external calls made inside the block.
+
+    Args:
+        path: Cassette file (written when recording, read when replaying)
+        mode: "record" or "replay"
+        latency_scale: Multiplier on recorded latencies when replaying (0 = none)
+    """
+    cassette = Cassette(path, mode, latency_scale)
+    cassette.install()
+    try:
+        yield cassette
+    finally:
+        cassette.uninstall()
+        if mode == "record":
+            cassette.save()
+        logging.info(f"Cassette {path}: {cassette.stats()}")
+
+
+def cassette_from_env():
+    """use_cassette() configured from OTTO_CASSETTE* env vars, or a no-op if unset."""
+    path = os.getenv("OTTO_CASSETTE")
+    if not path:
+        return _no_cassette()
+    return use_cassette(
+        path,
+        os.getenv("OTTO_CASSETTE_MODE", "replay").lower(),
+        float(os.getenv("OTTO_CASSETTE_LATENCY_SCALE", "1.0")),
+    )
+
+
+@contextmanager
+def _no_cassette():
+    yield None
@@ -0,0 +1,198 @@
+"""
+Otto Voice Agent - Adaptive Compression Controller
+Accounts for characters, estimated tokens and latency before and after
+compression per tool, and tunes each tool's threshold and aggressiveness
+to maximize net latency saved: model input time saved minus time spent
+compressing.
+"""
+
+import os
+import time
+import random
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from ttc_compression import compress_text
+
+# Realtime model cost of one input token (ms) - what a saved token is worth
+MODEL_MS_PER_TOKEN = float(os.getenv("OTTO_MODEL_MS_PER_TOKEN", "0.3"))
+CHARS_PER_TOKEN = 4.0
+
+DEFAULT_THRESHOLD = 500
+MIN_THRESHOLD = 200
+MAX_THRESHOLD = 20000
+AGGRESSIVENESS_LEVELS = (0.5, 0.7, 0.9)
+DEFAULT_AGGRESSIVENESS = 0.7
+
+# Samples needed before a tool's settings adapt, and how often to explore
+MIN_SAMPLES = 5
+EXPLORE_RATE = 0.1
+EWMA_ALPHA = 0.2
+
+
+def _ewma(old: Optional[float], new: float) -> float:
+    return new if old is None else old + EWMA_ALPHA * (new - old)
+
+
+@dataclass
+class LevelStats:
+    """
+    Running estimates for one aggressiveness level of one tool.
+
+    Latency is fit as fixed_ms + ms_per_char * length by least squares,
+    since a compression call costs a round trip plus time proportional to size.
+    """
+    samples: int = 0
+    ratio: Optional[float] = None  # EWMA of output chars / input chars
+    sum_x: float = 0.0
+    sum_y: float = 0.0
+    sum_xx: float = 0.0
+    sum_xy: float = 0.0
+
+    def add(self, chars_in: int, chars_out: int, elapsed_ms: float) -> None:
+        self.samples += 1
+        self.ratio = _ewma(self.ratio, chars_out / chars_in if chars_in else 1.0)
+        self.sum_x += chars_in
+        self.sum_y += elapsed_ms
+        self.sum_xx += chars_in * chars_in
+        self.sum_xy += chars_in * elapsed_ms
+
+    def latency_model(self) -> tuple[float, float]:
+        """(fixed_ms, ms_per_char) fit to the samples."""
+        n = self.samples
+        mean_x, mean_y = self.sum_x / n, self.sum_y / n
+        var = self.sum_xx / n - mean_x * mean_x
+        if var <= 1e-9:
+            return mean_y, 0.0
+        slope = max(0.0, (self.sum_xy / n - mean_x * mean_y) / var)
+        return max(0.0, mean_y - slope * mean_x), slope
+
+    @property
+    def mean_chars(self) -> float:
+        return self.sum_x / self.samples
+
+
+@dataclass
+class ToolStats:
+    """Per-tool accounting and current settings."""
+    calls: int = 0
+    result_chars: int = 0
+    compressed: int = 0
+    chars_in: int = 0
+    chars_out: int = 0
+    compress_ms: float = 0.0
+    net_saved_ms: float = 0.0
+    threshold: int = DEFAULT_THRESHOLD
+    aggressiveness: float = DEFAULT_AGGRESSIVENESS
+    levels: dict = field(default_factory=lambda: {a: LevelStats() for a in AGGRESSIVENESS_LEVELS})
+
+
+class CompressionController:
+    """Decides per call whether and how hard to compress a tool result."""
+
+    def __init__(self, ms_per_token: float = MODEL_MS_PER_TOKEN):
+        self.ms_per_token = ms_per_token
+        self.tools: dict[str, ToolStats] = {}
+
+    def _stats(self, tool: str) -> ToolStats:
+        return self.tools.setdefault(tool, ToolStats())
+
+    def decide(self, tool: str, length: int) -> Optional[float]:
+        """Aggressiveness to compress with, or None to send the text as is."""
+        stats = self._stats(tool)
+        stats.calls += 1
+        stats.result_chars += length
+        explore = random.random() < EXPLORE_RATE
+        if length < stats.threshold and not (explore and length >= MIN_THRESHOLD):
+            return None
+        if explore:
+            return random.choice(AGGRESSIVENESS_LEVELS)
+        return stats.aggressiveness
+
+    def record(self, tool: str, aggressiveness: float, chars_in: int, chars_out: int, elapsed_ms: float) -> None:
+        """Account for one compression and re-tune the tool's settings."""
+        stats = self._stats(tool)
+        stats.compressed += 1
+        stats.chars_in += chars_in
+        stats.chars_out += chars_out
+        stats.compress_ms += elapsed_ms
+        saved_ms = (chars_in - chars_out) / CHARS_PER_TOKEN * self.ms_per_token
+        stats.net_saved_ms += saved_ms - elapsed_ms
+
+        stats.levels.setdefault(aggressiveness, LevelStats()).add(chars_in, chars_out, elapsed_ms)
+        self._retune(stats)
+
+    def _retune(self, stats: ToolStats) -> None:
+        trained = [(a, l) for a, l in stats.levels.items() if l.samples >= MIN_SAMPLES]
+        if not trained:
+            return
+
+        def model(level: LevelStats) -> tuple[float, float, float]:
+            fixed_ms, ms_per_char = level.latency_model()
+            saved_per_char = (1.0 - level.ratio) / CHARS_PER_TOKEN * self.ms_per_token
+            return fixed_ms, ms_per_char, saved_per_char
+
+        def net_at_typical_length(item) -> float:
+            fixed_ms, ms_per_char, saved_per_char = model(item[1])
+            return (saved_per_char - ms_per_char) * item[1].mean_chars - fixed_ms
+
+        best_a, best = max(trained, key=net_at_typical_length)
+        stats.aggressiveness = best_a
+
+        # Break-even length: net(L) = (saved_per_char - ms_per_char) * L - fixed_ms
+        fixed_ms, ms_per_char, saved_per_char = model(best)
+        margin = saved_per_char - ms_per_char
+        if margin <= 0:
+            stats.threshold = MAX_THRESHOLD
+        else:
+            stats.threshold = max(MIN_THRESHOLD, min(int(fixed_ms / margin), MAX_THRESHOLD))
+
+    def metrics(self) -> dict:
+        """Per-tool metrics snapshot."""
+        report = {}
+        for tool, s in self.tools.items():
+            report[tool] = {
+                "calls": s.calls,
+                "result_chars": s.result_chars,
+                "compressed": s.compressed,
+                "chars_in": s.chars_in,
+                "chars_out": s.chars_out,
+                "tokens_saved": round((s.chars_in - s.chars_out) / CHARS_PER_TOKEN),
+                "compress_ms": round(s.compress_ms, 1),
+                "net_saved_ms": round(s.net_saved_ms, 1),
+                "threshold": s.threshold,
+                "aggressiveness": s.aggressiveness,
+            }
+        return report
+
+
+_controller = CompressionController()
+
+
+def get_compression_controller() -> CompressionController:
+    """Get the shared compression controller."""
+    return _controller
+
+
+async def compress_for_tool(tool: str, text: str) -> str:
+    """
+    Compress a tool result if the controller expects it to pay off.
+
+    Args:
+        tool: Name of the tool that produced the text
+        text: The tool result
+    """
+    aggressiveness = _controller.decide(tool, len(text))
+    if aggressiveness is None:
+        return text
+
+    t0 = time.perf_counter()
+    compressed = await compress_text(text, aggressiveness, min_chars=0)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    _controller.record(tool, aggressiveness, len(text), len(compressed), elapsed_ms)
+    logging.info(
+        f"{tool}: {len(text)} -> {len(compressed)} chars in {elapsed_ms:.0f}ms "
+        f"(aggressiveness {aggressiveness})"
+    )
+    return compressed
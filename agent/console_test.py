@@ -1,11 +1,20 @@
 """
 Otto Console Mode - Test the agent via text input (no microphone needed)
 Run with: python console_test.py
+
+Scripted runs take one command per line. Record the real backend, search
+and compression once, then replay them offline as a repeatable benchmark:
+    python console_test.py --script fixtures/morning_script.txt --record cassettes/morning.json
+    python console_test.py --script fixtures/morning_script.txt --replay cassettes/morning.json [--latency-scale 0]
 """
 
+import argparse
 import asyncio
+import json
 import os
 import sys
+import time
+from contextlib import nullcontext
 from datetime import datetime
 
 # Add current directory to path
@@ -14,23 +23,116 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
+from cassette import use_cassette
+
 # Mock RunContext for testing
 class MockRunContext:
     pass
 
-async def main():
-    """Interactive console to test Otto's tools"""
+COMMANDS = ["github", "emails", "more", "said", "calendar", "schedule", "free", "search", "test-dates"]
+
+
+async def run_command(ctx, user_input: str) -> None:
+    """Run one console command and print Otto's answer"""
     from tools import (
         get_github_activity,
         get_unread_emails,
+        get_email_summary,
         get_calendar_events,
         create_calendar_event,
+        find_free_time,
         send_email,
         search_web,
-        log_tool_call,
-        log_tool_result,
     )
-    
+
+    parts = user_input.split()
+    command = parts[0].lower()
+
+    if command == 'github':
+        repo = parts[1] if len(parts) > 1 else None
+        # Call the function directly since it's decorated
+        result = await get_github_activity.__wrapped__(ctx, repo_name=repo, days_back=1)
+        print(f"\033[1;32mOtto:\033[0m {result}")
+
+    elif command == 'emails':
+        result = await get_unread_emails.__wrapped__(ctx, max_count=5)
+        print(f"\033[1;32mOtto:\033[0m {result}")
+
+    elif command == 'more':
+        result = await get_unread_emails.__wrapped__(ctx, max_count=5, continue_reading=True)
+        print(f"\033[1;32mOtto:\033[0m {result}")
+
+    elif command == 'said':
+        sender = " ".join(parts[1:]) or None
+        result = await get_email_summary.__wrapped__(ctx, sender=sender)
+        print(f"\033[1;32mOtto:\033[0m {result}")
+
+    elif command == 'calendar':
+        result = await get_calendar_events.__wrapped__(ctx, days_ahead=1)
+        print(f"\033[1;32mOtto:\033[0m {result}")
+
+    elif command == 'schedule':
+        if len(parts) < 4:
+            print("\033[1;31mUsage:\033[0m schedule <title> <date> <time>")
+            print("Example: schedule Meeting tomorrow 3pm")
+        else:
+            title = parts[1]
+            date = parts[2]
+            time = parts[3]
+            result = await create_calendar_event.__wrapped__(
+                ctx, title=title, date=date, time=time
+            )
+            print(f"\033[1;32mOtto:\033[0m {result}")
+
+    elif command == 'free':
+        duration = int(parts[1]) if len(parts) > 1 else 30
+        attendees = parts[2] if len(parts) > 2 else None
+        result = await find_free_time.__wrapped__(
+            ctx, duration_minutes=duration, attendees=attendees
+        )
+        print(f"\033[1;32mOtto:\033[0m {result}")
+
+    elif command == 'search':
+        query = " ".join(parts[1:]) if len(parts) > 1 else "test"
+        result = await search_web.__wrapped__(ctx, query=query)
+        print(f"\033[1;32mOtto:\033[0m {result}")
+
+    elif command == 'test-dates':
+        from datetime import timedelta
+        test_cases = [
+            "today", "tomorrow", "January 28th", 
+            "Feb 15", "September 28", "next week"
+        ]
+        print("Date parsing results:")
+        for date_str in test_cases:
+            date_lower = date_str.lower().strip()
+            if date_lower == "today":
+                result = datetime.now().strftime("%Y-%m-%d")
+            elif date_lower == "tomorrow":
+                result = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+            elif date_lower == "next week":
+                result = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+            else:
+                clean = date_lower.replace("st","").replace("nd","").replace("rd","").replace("th","")
+                try:
+                    parsed = datetime.strptime(clean, "%B %d")
+                    parsed = parsed.replace(year=datetime.now().year)
+                    result = parsed.strftime("%Y-%m-%d")
+                except:
+                    try:
+                        parsed = datetime.strptime(clean, "%b %d")
+                        parsed = parsed.replace(year=datetime.now().year)
+                        result = parsed.strftime("%Y-%m-%d")
+                    except:
+                        result = date_str
+            print(f"  {date_str:20} → {result}")
+    else:
+        print(f"\033[1;33mUnknown command:\033[0m {command}")
+        print(f"Try: {', '.join(COMMANDS)}")
+
+
+async def interactive():
+    """Interactive console to test Otto's tools"""
     print("\n" + "=" * 60)
     print("🤖 OTTO CONSOLE MODE")
     print("=" * 60)
@@ -39,8 +141,11 @@ async def main():
     print("Available commands:")
     print("  github [repo]      - Get GitHub activity")
     print("  emails             - Get unread emails")
+    print("  more               - Read the next page of emails")
+    print("  said [name]        - What recent emails (from name) say")
     print("  calendar           - Get today's calendar")
     print("  schedule <title> <date> <time>  - Create event")
+    print("  free [minutes] [attendees]      - Find free time")
     print("  search <query>     - Web search")
     print("  test-dates         - Test date parsing")
     print("=" * 60 + "\n")
@@ -58,76 +163,8 @@ async def main():
                 print("\n👋 Goodbye!")
                 break
             
-            parts = user_input.split()
-            command = parts[0].lower()
-            
             print()  # Empty line for readability
-            
-            if command == 'github':
-                repo = parts[1] if len(parts) > 1 else None
-                # Call the function directly since it's decorated
-                result = await get_github_activity.__wrapped__(ctx, repo_name=repo, days_back=1)
-                print(f"\033[1;32mOtto:\033[0m {result}")
-                
-            elif command == 'emails':
-                result = await get_unread_emails.__wrapped__(ctx, max_count=5)
-                print(f"\033[1;32mOtto:\033[0m {result}")
-                
-            elif command == 'calendar':
-                result = await get_calendar_events.__wrapped__(ctx, days_ahead=1)
-                print(f"\033[1;32mOtto:\033[0m {result}")
-                
-            elif command == 'schedule':
-                if len(parts) < 4:
-                    print("\033[1;31mUsage:\033[0m schedule <title> <date> <time>")
-                    print("Example: schedule Meeting tomorrow 3pm")
-                else:
-                    title = parts[1]
-                    date = parts[2]
-                    time = parts[3]
-                    result = await create_calendar_event.__wrapped__(
-                        ctx, title=title, date=date, time=time
-                    )
-                    print(f"\033[1;32mOtto:\033[0m {result}")
-                    
-            elif command == 'search':
-                query = " ".join(parts[1:]) if len(parts) > 1 else "test"
-                result = await search_web.__wrapped__(ctx, query=query)
-                print(f"\033[1;32mOtto:\033[0m {result}")
-                
-            elif command == 'test-dates':
-                from datetime import timedelta
-                test_cases = [
-                    "today", "tomorrow", "January 28th", 
-                    "Feb 15", "September 28", "next week"
-                ]
-                print("Date parsing results:")
-                for date_str in test_cases:
-                    date_lower = date_str.lower().strip()
-                    if date_lower == "today":
-                        result = datetime.now().strftime("%Y-%m-%d")
-                    elif date_lower == "tomorrow":
-                        result = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-                    elif date_lower == "next week":
-                        result = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
-                    else:
-                        clean = date_lower.replace("st","").replace("nd","").replace("rd","").replace("th","")
-                        try:
-                            parsed = datetime.strptime(clean, "%B %d")
-                            parsed = parsed.replace(year=datetime.now().year)
-                            result = parsed.strftime("%Y-%m-%d")
-                        except:
-                            try:
-                                parsed = datetime.strptime(clean, "%b %d")
-                                parsed = parsed.replace(year=datetime.now().year)
-                                result = parsed.strftime("%Y-%m-%d")
-                            except:
-                                result = date_str
-                    print(f"  {date_str:20} → {result}")
-            else:
-                print(f"\033[1;33mUnknown command:\033[0m {command}")
-                print("Try: github, emails, calendar, schedule, search, test-dates")
-            
+            await run_command(ctx, user_input)
             print()  # Empty line after response
             
         except KeyboardInterrupt:
@@ -138,5 +175,67 @@ async def main():
             import traceback
             traceback.print_exc()
 
+
+async def scripted(script_path: str, report_path: str = None) -> list[dict]:
+    """Run a script of console commands, timing each one"""
+    with open(script_path) as f:
+        commands = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    ctx = MockRunContext()
+    timings = []
+    start = time.perf_counter()
+    for user_input in commands:
+        print(f"\033[1;36mYou:\033[0m {user_input}\n")
+        t0 = time.perf_counter()
+        try:
+            await run_command(ctx, user_input)
+        except Exception as e:
+            print(f"\033[1;31mError:\033[0m {str(e)}")
+        timings.append({"command": user_input, "ms": round((time.perf_counter() - t0) * 1000, 1)})
+        print()
+    total_ms = (time.perf_counter() - start) * 1000
+
+    print("=" * 60)
+    print("⏱️  SCRIPT TIMINGS")
+    print("=" * 60)
+    for t in timings:
+        print(f"  {t['ms']:9.1f}ms  {t['command']}")
+    print(f"  {total_ms:9.1f}ms  total ({len(timings)} commands)")
+
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump({"script": script_path, "total_ms": round(total_ms, 1), "commands": timings}, f, indent=2)
+        print(f"\n📄 Timings saved to: {report_path}")
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Test Otto's tools from the console")
+    parser.add_argument("--user", default=os.getenv("OTTO_USER_ID"), help="User ID to call the backend as (X-User-ID)")
+    parser.add_argument("--script", help="Run the commands in this file instead of prompting")
+    parser.add_argument("--record", metavar="CASSETTE", help="Record backend, search and compression calls")
+    parser.add_argument("--replay", metavar="CASSETTE", help="Replay a recorded cassette (no network)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on replayed latencies (default: 1)")
+    parser.add_argument("--report", help="Write script timings as JSON")
+    args = parser.parse_args()
+
+    if args.record and args.replay:
+        parser.error("use either --record or --replay")
+    if args.user:
+        from tools import set_current_user_id
+        set_current_user_id(args.user)
+    if args.record:
+        cassette = use_cassette(args.record, "record")
+    elif args.replay:
+        cassette = use_cassette(args.replay, "replay", args.latency_scale)
+    else:
+        cassette = nullcontext()
+
+    with cassette:
+        if args.script:
+            await scripted(args.script, args.report)
+        else:
+            await interactive()
+
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,237 @@
+"""
+Otto Voice Agent - Email Summary Cache
+A received email never changes, so its spoken summary only has to be made
+once. Bodies are fetched from /api/gmail in batches of message IDs,
+summarized locally and kept on disk per (user, message ID), so "what did
+Sarah say?" is answered from the store instead of refetching the thread.
+
+The store is a SQLite file (OTTO_EMAIL_SUMMARY_DB) bounded to
+OTTO_EMAIL_SUMMARY_MAX entries; the least recently read go first. It holds
+what users' emails say, so the file is created owner-only (0600), and it
+is shared by every worker process: lookups run in a worker thread with a
+short busy timeout, and a locked store reads as a miss rather than
+stalling the voice loop.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from local_compression import local_compress, strip_boilerplate
+from shared_cache import BUSY_TIMEOUT, _create_private
+
+SUMMARY_DB = os.getenv("OTTO_EMAIL_SUMMARY_DB", os.path.join(os.path.dirname(__file__), ".email_summaries.db"))
+SUMMARY_MAX_ENTRIES = int(os.getenv("OTTO_EMAIL_SUMMARY_MAX", "5000"))
+# Message IDs per body fetch (the /api/gmail page limit)
+BODY_BATCH_SIZE = 20
+BODY_FETCH_CONCURRENCY = 2
+# Spoken summaries stay short
+SUMMARY_MAX_CHARS = 280
+
+# A quoted reply starts here; everything after it is the older thread
+_QUOTE_START = re.compile(r"^\s*(>|On .+ wrote:\s*$|-+\s*Original Message\s*-+|From: .+@)", re.IGNORECASE)
+# "Hi team," / "Best," / a bare name - openers and sign-offs with nothing to say
+_FILLER_LINE = re.compile(
+    r"^\s*((hi|hey|hello|dear|thanks|thank you|best|cheers|regards|best regards|kind regards)\b[^.!?]{0,30}[,!]?"
+    r"|[A-Z][a-z]+)\s*$",
+    re.IGNORECASE,
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class EmailSummary:
+    """What Otto says about one message."""
+    message_id: str
+    sender: str
+    subject: str
+    summary: str
+
+
+def summarize_body(body: str, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """Short spoken summary of an email body: the new text only, its key sentences first."""
+    lines = []
+    # Signatures, footers and bare links go first
+    for line in strip_boilerplate(body):
+        if _QUOTE_START.match(line):
+            break
+        if not _FILLER_LINE.match(line):
+            lines.append(line)
+    text = " ".join(" ".join(lines).split())
+    if len(text) <= max_chars:
+        return text
+    text = " ".join(local_compress("\n".join(lines), aggressiveness=1.0).split())
+    if len(text) <= max_chars:
+        return text
+    # Whole sentences up to the limit, or a clipped first sentence
+    kept = ""
+    for sentence in _SENTENCE_END.split(text):
+        if len(kept) + len(sentence) + 1 > max_chars:
+            break
+        kept = f"{kept} {sentence}".strip()
+    return kept or text[:max_chars - 3].rstrip() + "..."
+
+
+class EmailSummaryStore:
+    """Summaries on disk by (user, message ID), evicting the least recently read."""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = SUMMARY_MAX_ENTRIES):
+        self.path = path or SUMMARY_DB
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            _create_private(self.path)
+        self._db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "user_id TEXT NOT NULL, message_id TEXT NOT NULL, sender TEXT, subject TEXT, "
+            "summary TEXT NOT NULL, last_read REAL NOT NULL, PRIMARY KEY (user_id, message_id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS summaries_last_read ON summaries (last_read)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def get_many(self, user_id: str, message_ids: list[str]) -> dict[str, EmailSummary]:
+        """Stored summaries among message_ids, marking them as just read."""
+        if not message_ids:
+            return {}
+        marks = ",".join("?" * len(message_ids))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT message_id, sender, subject, summary FROM summaries "
+                f"WHERE user_id = ? AND message_id IN ({marks})",
+                (user_id, *message_ids),
+            ).fetchall()
+            if rows:
+                self._db.execute(
+                    f"UPDATE summaries SET last_read = ? WHERE user_id = ? AND message_id IN ({marks})",
+                    (time.time(), user_id, *message_ids),
+                )
+        found = {row[0]: EmailSummary(*row) for row in rows}
+        self.hits += len(found)
+        self.misses += len(message_ids) - len(found)
+        return found
+
+    def put_many(self, user_id: str, summaries: list[EmailSummary]) -> None:
+        """Store summaries (messages don't change, so existing ones are kept) and evict the oldest."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO summaries VALUES (?, ?, ?, ?, ?, ?)",
+                [(user_id, s.message_id, s.sender, s.subject, s.summary, now) for s in summaries],
+            )
+            excess = self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM summaries WHERE rowid IN "
+                    "(SELECT rowid FROM summaries ORDER BY last_read LIMIT ?)",
+                    (excess,),
+                )
+
+    async def aget_many(self, user_id: str, message_ids: list[str]) -> dict[str, EmailSummary]:
+        """get_many() off the event loop; a locked or broken store finds nothing."""
+        try:
+            return await asyncio.to_thread(self.get_many, user_id, message_ids)
+        except sqlite3.Error as e:
+            logging.warning(f"Email summary store unavailable, summarizing again: {e}")
+            self.misses += len(message_ids)
+            return {}
+
+    async def aput_many(self, user_id: str, summaries: list[EmailSummary]) -> None:
+        """put_many() off the event loop; summaries that can't be stored are made again next time."""
+        try:
+            await asyncio.to_thread(self.put_many, user_id, summaries)
+        except sqlite3.Error as e:
+            logging.warning(f"Couldn't store email summaries: {e}")
+
+    def stats(self) -> dict:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+
+async def fetch_bodies(
+    client: httpx.AsyncClient,
+    api_url: str,
+    headers: dict,
+    message_ids: list[str],
+) -> list[dict]:
+    """Full messages for message_ids, fetched in batches; raises on HTTP errors"""
+    batches = [message_ids[i:i + BODY_BATCH_SIZE] for i in range(0, len(message_ids), BODY_BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(BODY_FETCH_CONCURRENCY)
+
+    async def fetch(batch: list[str]) -> list[dict]:
+        async with semaphore:
+            response = await client.get(
+                f"{api_url}/api/gmail",
+                params={"ids": ",".join(batch), "full": "true"},
+                headers=headers,
+                timeout=15.0,
+            )
+        response.raise_for_status()
+        return response.json().get("messages", [])
+
+    results = await asyncio.gather(*(fetch(batch) for batch in batches))
+    return [message for batch in results for message in batch]
+
+
+async def get_summaries(
+    user_id: str,
+    api_url: str,
+    headers: dict,
+    message_ids: list[str],
+) -> list[EmailSummary]:
+    """
+    Summaries for message_ids in the given order, fetching and summarizing
+    only those not already stored.
+
+    Args:
+        user_id: Whose mailbox (summaries are stored per user)
+        api_url: Base URL of the Next.js API
+        headers: Auth headers for /api/gmail
+        message_ids: Gmail message IDs
+    """
+    store = get_summary_store()
+    found = await store.aget_many(user_id, message_ids)
+    missing = [m for m in message_ids if m not in found]
+    if missing:
+        async with httpx.AsyncClient() as client:
+            messages = await fetch_bodies(client, api_url, headers, missing)
+        # Summarizing is CPU work - keep it off the event loop
+        fresh = await asyncio.to_thread(
+            lambda: [
+                EmailSummary(
+                    m["id"],
+                    m.get("from", "Unknown sender"),
+                    m.get("subject", "(no subject)"),
+                    summarize_body(m.get("body") or m.get("snippet", "")),
+                )
+                for m in messages if m.get("id")
+            ]
+        )
+        await store.aput_many(user_id, fresh)
+        found.update((s.message_id, s) for s in fresh)
+        logging.info(f"Summarized {len(fresh)} emails ({len(message_ids) - len(missing)} from cache)")
+    return [found[m] for m in message_ids if m in found]
+
+
+_store: Optional[EmailSummaryStore] = None
+
+
+def get_summary_store() -> EmailSummaryStore:
+    """Get the on-disk summary store (opened on first use)."""
+    global _store
+    if _store is None:
+        _store = EmailSummaryStore()
+    return _store
@@ -0,0 +1,70 @@
+"""
+Otto Voice Agent - Compact Events
+The inbox and GitHub endpoints return lists of events, kept in memory by
+the conditional GET cache between calls. As parsed JSON each event is a
+dict with its own copy of every key and sender name, several times the
+size of the few fields the tools read.
+
+Event keeps just those fields in __slots__, and interns the strings that
+repeat across events (actor, event type, repo), so 10,000 commits by five
+people hold five actor strings. bench_events.py compares the two.
+"""
+
+import sys
+from typing import Any, Optional
+
+
+class Event:
+    """One inbox message or GitHub event: who, what, when and what kind."""
+
+    __slots__ = ("id", "actor", "title", "time", "event_type", "repo")
+
+    def __init__(
+        self,
+        actor: str,
+        title: str,
+        time: str,
+        event_type: str,
+        repo: Optional[str] = None,
+        id: Optional[str] = None,
+    ):
+        self.actor = sys.intern(actor)
+        self.title = title
+        self.time = time
+        self.event_type = sys.intern(event_type)
+        self.repo = sys.intern(repo) if repo else None
+        self.id = id
+
+    @classmethod
+    def from_api(cls, item: dict, event_type: str = "event") -> "Event":
+        """An event from an /api/gmail or /api/github item ({actor, title, date, ...})."""
+        return cls(
+            item.get("actor") or "",
+            item.get("title") or "",
+            item.get("date") or "",
+            item.get("event_type") or event_type,
+            item.get("repo"),
+            item.get("id"),
+        )
+
+    def __repr__(self) -> str:
+        return f"Event({self.event_type}, {self.actor!r}, {self.title!r}, {self.time!r})"
+
+
+def compact_events(event_type: str = "event"):
+    """
+    A get_json transform keeping only a response's events, as Events.
+
+    Other list fields (e.g. /api/gmail's full "messages") are dropped;
+    scalars such as "nextCursor" are kept.
+
+    Args:
+        event_type: Type for items that don't carry their own ("email")
+    """
+    def transform(data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        compact = {k: v for k, v in data.items() if not isinstance(v, (list, dict))}
+        compact["events"] = [Event.from_api(item, event_type) for item in data.get("events", [])]
+        return compact
+    return transform
@@ -0,0 +1,414 @@
+"""
+Otto Voice Agent - Fake Backend
+Local stand-in for the Next.js API routes the agent tools call.
+Serves canned data in the same shapes as app/api/*, answers conditional
+GETs (ETag / If-None-Match) and honours the Idempotency-Key header on
+writes, so tools can be exercised without the real app, Google or GitHub.
+Also serves the web pages in fixtures/pages under /pages/<name> for search
+enrichment (add ?delay=<seconds> to pause between chunks).
+
+Run standalone with: python fake_backend.py [port]
+Then point the agent at it with API_URL=http://localhost:<port>
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import uuid
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+# Bytes per write when serving a page, so clients see it arrive in pieces
+PAGE_CHUNK = 4096
+
+
+def _sample_emails() -> list[dict]:
+    now = datetime.now()
+    senders = [
+        ("Sarah Chen", "sarah@example.com", "Design review notes",
+         "Hi team,\n\nThanks for the review today. We agreed to ship the new onboarding flow "
+         "on Thursday. Alex will fix the contrast issues on the settings page first. "
+         "Please send any remaining feedback on the mockups by Wednesday noon.\n\n"
+         "Best,\nSarah\n--\nSarah Chen | Design Lead\n\n"
+         "On Mon, Jordan Lee wrote:\n> Can we move the review to 2pm?"),
+        ("Alex Kim", "alex@example.com", "Login bug is fixed",
+         "Hey,\n\nThe login redirect loop is fixed and deployed to staging. It was a stale "
+         "session cookie after the auth migration. I'll promote it to production tomorrow "
+         "morning unless QA finds anything.\n\nAlex"),
+        ("Jordan Lee", "jordan@example.com", "API docs updated",
+         "The API docs now cover the calendar freebusy endpoint and the new idempotency header. "
+         "Let me know if the examples are unclear.\n\nJordan"),
+        ("GitHub", "noreply@github.com", "[otto] New pull request",
+         "Jordan opened a pull request: Update API docs.\n\nView it on GitHub: "
+         "https://github.com/acme/otto/pull/42\n\nYou are receiving this because you are subscribed."),
+        ("Rachel Green", "rachel@example.com", "Lunch tomorrow?",
+         "Are you free for lunch tomorrow at 12:30? I was thinking the new ramen place on 5th.\n\n"
+         "Sent from my iPhone"),
+    ]
+    return [
+        {
+            "id": f"msg-{i}",
+            "from": name,
+            "email": email,
+            "subject": subject,
+            "snippet": f"{subject} - see details inside.",
+            "body": body,
+            "date": (now - timedelta(hours=i)).strftime("%a, %d %b %Y %H:%M:%S"),
+            "unread": True,
+        }
+        for i, (name, email, subject, body) in enumerate(senders)
+    ]
+
+
+def _sample_calendar() -> list[dict]:
+    """Series and single events as /api/calendar?days=N returns them (local time, with offsets)."""
+    today = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
+    two_weeks_ago = today - timedelta(days=14)
+    standup_start = two_weeks_ago.replace(hour=10)
+    events = [
+        # Weekday standup; tomorrow's is moved to 11:00
+        ("evt-0", "Team standup", standup_start, timedelta(minutes=30),
+         ["RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"]),
+        ("evt-1", "Design review", today.replace(hour=14), timedelta(hours=1), None),
+        ("evt-2", "1:1 with Sarah", today.replace(hour=16), timedelta(hours=1), None),
+    ]
+    calendar = [
+        {
+            "id": event_id,
+            "title": title,
+            "start": start.isoformat(),
+            "end": (start + duration).isoformat(),
+            "recurrence": recurrence,
+            "recurringEventId": None,
+            "originalStart": None,
+            "status": "confirmed",
+            "location": None,
+        }
+        for event_id, title, start, duration, recurrence in events
+    ]
+    calendar.append({
+        "id": "evt-0_moved",
+        "title": "Team standup",
+        "start": tomorrow.replace(hour=11).isoformat(),
+        "end": tomorrow.replace(hour=11, minute=30).isoformat(),
+        "recurrence": None,
+        "recurringEventId": "evt-0",
+        "originalStart": tomorrow.replace(hour=10).isoformat(),
+        "status": "confirmed",
+        "location": "Room 4",
+    })
+    offsite = (today + timedelta(days=3)).date()
+    calendar.append({
+        "id": "evt-3",
+        "title": "Company offsite",
+        "start": offsite.isoformat(),
+        "end": (offsite + timedelta(days=1)).isoformat(),
+        "recurrence": None,
+        "recurringEventId": None,
+        "originalStart": None,
+        "status": "confirmed",
+        "location": None,
+    })
+    return calendar
+
+
+def _sample_busy() -> dict[str, list[dict]]:
+    """Today's 1-hour meetings at 10, 14 and 16 as busy periods."""
+    today = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+    busy = [
+        {
+            "start": today.replace(hour=hour).isoformat(),
+            "end": (today.replace(hour=hour) + timedelta(hours=1)).isoformat(),
+        }
+        for hour in (10, 14, 16)
+    ]
+    return {"primary": busy}
+
+
+def _sample_github() -> list[dict]:
+    now = datetime.now()
+    items = [
+        ("acme/otto", "commit", "Alex", "Fix login redirect loop"),
+        ("acme/otto", "commit", "Sarah", "Add dashboard widgets"),
+        ("acme/website", "pull_request", "Jordan", "Update API docs"),
+        ("acme/otto", "commit", "Jordan", "Bump dependencies"),
+        ("acme/infra", "commit", "Rachel", "Raise worker memory limit"),
+        ("acme/website", "commit", "Sarah", "Fix pricing page typo"),
+    ]
+    return [
+        {
+            "event_type": event_type,
+            "actor": actor,
+            "title": title,
+            "date": (now - timedelta(hours=i)).isoformat(),
+            "repo": repo,
+        }
+        for i, (repo, event_type, actor, title) in enumerate(items)
+    ]
+
+
+class FakeBackendState:
+    """Mutable data and counters shared by all handler threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.emails = _sample_emails()
+        self.calendar = _sample_calendar()
+        self.busy = _sample_busy()
+        self.github = _sample_github()
+        self.connected = ["google", "github"]
+        # Users listed by /api/agent/users (all share the sample data)
+        self.users = ["u1", "u2", "u3"]
+
+        # Writes that actually took effect
+        self.sent_emails: list[dict] = []
+        # Sends to any of these addresses fail with 400, like a bad address would
+        self.rejected_recipients: set[str] = set()
+        self.created_events: list[dict] = []
+
+        # Idempotency-Key -> (status, response body)
+        self.idempotent_responses: dict[str, tuple[int, dict]] = {}
+        self.replayed_writes = 0
+
+        # Conditional GETs answered with 304 Not Modified
+        self.not_modified = 0
+        # JSON response body bytes sent
+        self.bytes_sent = 0
+
+        # Artificial latency per request (seconds), e.g. to force client timeouts
+        self.latency = 0.0
+        self.requests: list[tuple[str, str]] = []
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeBackendServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self) -> FakeBackendState:
+        return self.server.state
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        with self.state.lock:
+            self.state.bytes_sent += len(payload)
+
+    def _send_json_conditional(self, body: dict):
+        """200 with an ETag, or a bodiless 304 when If-None-Match still matches."""
+        payload = json.dumps(body).encode("utf-8")
+        etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            with self.state.lock:
+                self.state.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+        with self.state.lock:
+            self.state.bytes_sent += len(payload)
+
+    def _begin(self) -> bool:
+        with self.state.lock:
+            self.state.requests.append((self.command, self.path))
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        public = self.path.startswith("/api/agent/users") or self.path.startswith("/pages/")
+        if not self.headers.get("X-User-ID") and not public:
+            self._send_json(401, {"error": "Unauthorized"})
+            return False
+        return True
+
+    def do_GET(self):
+        if not self._begin():
+            return
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path.startswith("/pages/"):
+            self._send_page(url.path[len("/pages/"):], float(params.get("delay", "0")))
+        elif url.path == "/api/agent/users":
+            if not self.headers.get("x-agent-secret"):
+                self._send_json(401, {"error": "Unauthorized"})
+                return
+            users = [{"id": u, "connected": self.state.connected} for u in self.state.users]
+            self._send_json(200, {"users": users})
+        elif url.path == "/api/auth/status":
+            self._send_json(200, {"connected": self.state.connected})
+        elif url.path == "/api/gmail":
+            limit = min(int(params.get("limit", "10")), 20)
+            offset = int(params.get("cursor", "0"))
+            ids = [i for i in params.get("ids", "").split(",") if i][:20]
+            if ids:
+                messages = [m for m in self.state.emails if m["id"] in ids]
+                next_cursor = None
+            else:
+                messages = self.state.emails[offset:offset + limit]
+                next_offset = offset + limit
+                next_cursor = str(next_offset) if next_offset < len(self.state.emails) else None
+            if params.get("full") != "true":
+                messages = [{k: v for k, v in m.items() if k != "body"} for m in messages]
+            events = [
+                {"id": m["id"], "actor": m["from"], "title": m["subject"], "date": m["date"], "unread": m["unread"]}
+                for m in messages
+            ]
+            self._send_json_conditional({"messages": messages, "events": events, "nextCursor": next_cursor, "connected": True})
+        elif url.path == "/api/calendar":
+            self._send_json_conditional({"events": self.state.calendar, "connected": True})
+        elif url.path == "/api/calendar/freebusy":
+            attendees = [a for a in params.get("attendees", "").split(",") if a]
+            busy = {"primary": self.state.busy.get("primary", [])}
+            for attendee in attendees:
+                busy[attendee] = self.state.busy.get(attendee, [])
+            self._send_json(200, {"busy": busy, "unavailable": [], "connected": True})
+        elif url.path == "/api/github" and params.get("action") == "repos":
+            names = sorted({e["repo"] for e in self.state.github})
+            repos = [{"name": n.split("/")[-1], "fullName": n} for n in names]
+            self._send_json_conditional({"repos": repos, "connected": True})
+        elif url.path == "/api/github":
+            events = self.state.github
+            repo = params.get("repo")
+            if repo:
+                events = [e for e in events if e["repo"].split("/")[-1] == repo.split("/")[-1]]
+            self._send_json_conditional({"events": events[:20], "connected": True})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def _send_page(self, name: str, delay: float):
+        """A fixture page, or huge.html (about 2 MB of text) to test byte limits."""
+        if name == "huge.html":
+            paragraph = "<p>This filler paragraph only exists to make the page very large for budget tests.</p>\n"
+            payload = ("<html><head><title>Huge page</title></head><body>" + paragraph * 24000 + "</body></html>").encode()
+        else:
+            path = os.path.join(PAGES_DIR, os.path.basename(name))
+            if not os.path.isfile(path):
+                self._send_json(404, {"error": "Not found"})
+                return
+            with open(path, "rb") as f:
+                payload = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            for i in range(0, len(payload), PAGE_CHUNK):
+                if delay and i:
+                    time.sleep(delay)
+                self.wfile.write(payload[i:i + PAGE_CHUNK])
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading - expected once it hits its budget
+
+    def do_POST(self):
+        if not self._begin():
+            return
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", "0"))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if url.path not in ("/api/gmail/send", "/api/calendar"):
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        key = self.headers.get(IDEMPOTENCY_HEADER)
+        with self.state.lock:
+            if key and key in self.state.idempotent_responses:
+                # Same key seen before - replay the original response, don't write again
+                self.state.replayed_writes += 1
+                status, response = self.state.idempotent_responses[key]
+                replayed = True
+            else:
+                status, response = self._write(url.path, body)
+                if key and status < 500:
+                    self.state.idempotent_responses[key] = (status, response)
+                replayed = False
+
+        self._send_json(status, response, {"Idempotent-Replayed": "true"} if replayed else None)
+
+    def _write(self, path: str, body: dict) -> tuple[int, dict]:
+        if path == "/api/gmail/send":
+            recipients = body.get("to") if isinstance(body.get("to"), list) else [body.get("to")]
+            recipients = [r for r in recipients if r]
+            if not recipients or not body.get("subject") or not body.get("body"):
+                return 400, {"error": "Missing required fields: to, subject, body"}
+            invalid = [r for r in recipients if r in self.state.rejected_recipients]
+            if invalid:
+                return 400, {"error": "Invalid recipient address", "invalid": invalid}
+            message_id = f"sent-{uuid.uuid4().hex[:8]}"
+            self.state.sent_emails.append({**body, "id": message_id})
+            return 201, {"success": True, "messageId": message_id}
+
+        if not body.get("title") or not body.get("date") or not body.get("time"):
+            return 400, {"error": "Missing required fields: title, date, time"}
+        event_id = f"evt-{uuid.uuid4().hex[:8]}"
+        start = f"{body['date']}T{body['time']}:00"
+        self.state.created_events.append({**body, "id": event_id})
+        end = datetime.fromisoformat(start) + timedelta(minutes=int(body.get("duration", 60)))
+        self.state.calendar.append({
+            "id": event_id, "title": body["title"], "start": start, "end": end.isoformat(),
+            "recurrence": None, "recurringEventId": None, "originalStart": None,
+            "status": "confirmed", "location": None,
+        })
+        return 201, {"success": True, "event": {"id": event_id, "title": body["title"], "start": start}}
+
+
+class FakeBackendServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], state: FakeBackendState):
+        super().__init__(address, _Handler)
+        self.state = state
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_fake_backend(port: int = 0, state: Optional[FakeBackendState] = None) -> FakeBackendServer:
+    """
+    Start the fake backend on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        state: Optional pre-populated state
+
+    Returns:
+        The running server; use `server.url` as API_URL and `server.shutdown()` to stop
+    """
+    server = FakeBackendServer(("127.0.0.1", port), state or FakeBackendState())
+    thread = threading.Thread(target=server.serve_forever, name="otto-fake-backend", daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 3001
+    server = FakeBackendServer(("127.0.0.1", port), FakeBackendState())
+    print(f"🧪 Fake backend listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
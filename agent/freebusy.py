@@ -0,0 +1,171 @@
+"""
+Otto Voice Agent - Free/Busy Slot Finder
+Indexes busy intervals (the user's and attendees') and finds free
+meeting slots inside working hours.
+
+Busy intervals are merged once into sorted start/end arrays, so every
+availability query is a binary search plus a walk over the intervals
+that actually overlap the window.
+"""
+
+import os
+from bisect import bisect_right
+from datetime import datetime, time, timedelta, tzinfo
+from typing import Iterable, Iterator, Optional
+from zoneinfo import ZoneInfo
+
+
+def _host_zone_name() -> Optional[str]:
+    """IANA name of the host's zone, from TZ or the /etc/localtime link."""
+    name = os.getenv("TZ", "").lstrip(":")
+    if name:
+        return name
+    try:
+        target = os.path.realpath("/etc/localtime")
+    except OSError:
+        return None
+    marker = "zoneinfo" + os.sep
+    return target.split(marker, 1)[1] if marker in target else None
+
+
+def get_user_timezone() -> tzinfo:
+    """
+    User's time zone from OTTO_TIMEZONE, falling back to the host's named
+    zone (so DST changes apply) and only then to its current fixed offset.
+    """
+    for name in (os.getenv("OTTO_TIMEZONE"), _host_zone_name()):
+        if name:
+            try:
+                return ZoneInfo(name)
+            except Exception:
+                pass
+    return datetime.now().astimezone().tzinfo
+
+
+def parse_busy(busy: dict[str, list[dict]]) -> list[tuple[float, float]]:
+    """
+    Flatten the /api/calendar/freebusy `busy` map into epoch-second intervals.
+
+    Args:
+        busy: Calendar ID -> list of {"start": iso, "end": iso}
+    """
+    intervals = []
+    for periods in busy.values():
+        for period in periods:
+            try:
+                start = datetime.fromisoformat(period["start"]).timestamp()
+                end = datetime.fromisoformat(period["end"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            intervals.append((start, end))
+    return intervals
+
+
+class BusyIndex:
+    """Merged, sorted busy intervals with O(log n) overlap lookups."""
+
+    def __init__(self, intervals: Iterable[tuple[float, float]]):
+        merged: list[list[float]] = []
+        for start, end in sorted(i for i in intervals if i[1] > i[0]):
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        self.starts = [s for s, _ in merged]
+        self.ends = [e for _, e in merged]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def is_free(self, start: float, end: float) -> bool:
+        """True if [start, end) overlaps no busy interval."""
+        i = bisect_right(self.ends, start)
+        return i == len(self.starts) or self.starts[i] >= end
+
+    def free_gaps(self, window_start: float, window_end: float) -> Iterator[tuple[float, float]]:
+        """Yield the free gaps inside [window_start, window_end)."""
+        i = bisect_right(self.ends, window_start)
+        cursor = window_start
+        while i < len(self.starts) and self.starts[i] < window_end:
+            if self.starts[i] > cursor:
+                yield cursor, self.starts[i]
+            cursor = max(cursor, self.ends[i])
+            i += 1
+        if cursor < window_end:
+            yield cursor, window_end
+
+
+def working_windows(
+    range_start: datetime,
+    range_end: datetime,
+    tz: tzinfo,
+    work_start: time,
+    work_end: time,
+    weekdays_only: bool = True,
+) -> Iterator[tuple[float, float]]:
+    """Yield each day's working hours in `tz`, clipped to the range, as epoch seconds."""
+    lower, upper = range_start.timestamp(), range_end.timestamp()
+    day = range_start.astimezone(tz).date()
+    last_day = range_end.astimezone(tz).date()
+    while day <= last_day:
+        if not weekdays_only or day.weekday() < 5:
+            start = max(datetime.combine(day, work_start, tz).timestamp(), lower)
+            end = min(datetime.combine(day, work_end, tz).timestamp(), upper)
+            if end > start:
+                yield start, end
+        day += timedelta(days=1)
+
+
+def find_free_slots(
+    index: BusyIndex,
+    range_start: datetime,
+    range_end: datetime,
+    duration_minutes: int,
+    tz: Optional[tzinfo] = None,
+    work_start: time = time(9),
+    work_end: time = time(17),
+    weekdays_only: bool = True,
+    max_results: int = 5,
+    per_day: int = 2,
+    step_minutes: int = 15,
+) -> list[tuple[datetime, datetime]]:
+    """
+    Find the best free slots of a given length.
+
+    Slots start on `step_minutes` boundaries. Earlier slots rank first, with
+    at most `per_day` slots per day (each from a different gap) so the
+    suggestions spread across the range.
+
+    Returns:
+        List of (start, end) datetimes in `tz`
+    """
+    tz = tz or get_user_timezone()
+    duration = duration_minutes * 60
+    step = step_minutes * 60
+    slots = []
+
+    for window_start, window_end in working_windows(
+        range_start, range_end, tz, work_start, work_end, weekdays_only
+    ):
+        day_count = 0
+        for gap_start, gap_end in index.free_gaps(window_start, window_end):
+            start = -(-gap_start // step) * step  # round up to the step boundary
+            if start + duration > gap_end:
+                continue
+            slots.append((
+                datetime.fromtimestamp(start, tz),
+                datetime.fromtimestamp(start + duration, tz),
+            ))
+            if len(slots) >= max_results:
+                return slots
+            day_count += 1
+            if day_count >= per_day:
+                break
+
+    return slots
+
+
+def format_slot(start: datetime) -> str:
+    """Spoken form of a slot start, e.g. "Tuesday, Oct 20 at 9:30 AM"."""
+    return f"{start.strftime('%A, %b')} {start.day} at {start.strftime('%I:%M %p').lstrip('0')}"
@@ -0,0 +1,127 @@
+"""
+Otto Voice Agent - Conditional GET Cache
+Keeps the last response validator (ETag) and parsed JSON per user and
+endpoint, sends If-None-Match on repeat requests and reuses the stored
+parsed result when the backend answers 304 Not Modified.
+
+Entries are also written to the host-wide shared cache, so a new worker
+process revalidates what another process fetched instead of starting cold.
+
+A transform can reduce the parsed JSON to what the caller needs (e.g.
+compact Events) before it is kept; the shared cache still gets the JSON.
+"""
+
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import httpx
+
+from shared_cache import get_shared_cache
+
+# Number of (user, endpoint, params) entries kept before evicting the oldest
+MAX_ENTRIES = 256
+
+
+class RevalidationCache:
+    """LRU of (etag, parsed JSON) keyed by user, URL and query params."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[str, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(url: str, params: Optional[dict], headers: dict) -> tuple:
+        items = tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+        return headers.get("X-User-ID"), url, items
+
+    async def get_json(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: float = 10.0,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ) -> tuple[httpx.Response, Optional[Any]]:
+        """
+        GET a JSON endpoint, revalidating against the stored copy.
+
+        Args:
+            transform: Applied to the parsed body before it is stored and
+                returned; use the same one for every call to a URL
+
+        Returns:
+            (response, data) - data is the parsed body for 200, the stored
+            body for 304, and None for any other status. Treat it as
+            read-only; it may be shared with later calls.
+        """
+        headers = dict(headers or {})
+        key = self._key(url, params, headers)
+        entry = self._entries.get(key)
+        shared_key = json.dumps(key)
+        if entry is None:
+            shared = await get_shared_cache().aget("http", shared_key)
+            if shared:
+                entry = (shared[0], transform(shared[1]) if transform else shared[1])
+                self._entries[key] = entry
+        if entry:
+            headers["If-None-Match"] = entry[0]
+
+        response = await client.get(url, params=params, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return response, entry[1]
+
+        if response.status_code != 200:
+            return response, None
+
+        self.misses += 1
+        raw = response.json()
+        data = transform(raw) if transform else raw
+        etag = response.headers.get("ETag")
+        if etag:
+            self._entries[key] = (etag, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            await get_shared_cache().aset("http", shared_key, [etag, raw])
+        else:
+            self._entries.pop(key, None)
+        return response, data
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+_cache = RevalidationCache()
+
+
+def get_revalidation_cache() -> RevalidationCache:
+    """Get the shared conditional GET cache."""
+    return _cache
+
+
+async def get_json(
+    client: httpx.AsyncClient,
+    url: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    timeout: float = 10.0,
+    transform: Optional[Callable[[Any], Any]] = None,
+) -> tuple[httpx.Response, Optional[Any]]:
+    """Conditional GET through the shared cache (see RevalidationCache.get_json)."""
+    return await _cache.get_json(client, url, params, headers, timeout, transform)
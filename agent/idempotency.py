@@ -0,0 +1,124 @@
+"""
+Otto Voice Agent - Idempotent Writes
+Derives idempotency keys for write tools and keeps a short-lived ledger
+so duplicate tool invocations from the model are suppressed.
+
+The same key is sent to the backend as the Idempotency-Key header. The
+fake backend replays on it, but the Next.js write routes don't, so writes
+are only retried when the connection itself failed.
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Optional
+
+# How long a completed write suppresses identical calls (seconds)
+LEDGER_TTL = 600.0
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def make_idempotency_key(session_id: Optional[str], tool_name: str, **args: Any) -> str:
+    """
+    Derive a stable key from the session, tool and normalized arguments.
+
+    Args:
+        session_id: Identity of the current session (room or job)
+        tool_name: Name of the write tool
+        **args: The resolved arguments that define the write
+    """
+    normalized = {
+        k: v.strip() if isinstance(v, str) else v
+        for k, v in args.items()
+    }
+    canonical = json.dumps(
+        [session_id or "", tool_name, normalized],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class WriteLedger:
+    """
+    Short-lived record of write tool invocations keyed by idempotency key.
+
+    Concurrent calls with the same key share one in-flight write; a
+    successful result is remembered for `ttl` seconds. Failed writes are
+    forgotten so the user can try again.
+    """
+
+    def __init__(self, ttl: float = LEDGER_TTL):
+        self.ttl = ttl
+        self._done: dict[str, tuple[float, str]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._done) + len(self._inflight)
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        expired = [k for k, (ts, _) in self._done.items() if now - ts > self.ttl]
+        for k in expired:
+            del self._done[k]
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Get the remembered result for a completed write, if still fresh."""
+        self._prune()
+        entry = self._done.get(key)
+        return entry[1] if entry else None
+
+    async def run(
+        self,
+        key: str,
+        write: Callable[[], Awaitable[tuple[bool, str]]],
+    ) -> tuple[bool, str]:
+        """
+        Run a write at most once per key.
+
+        Args:
+            key: Idempotency key for this write
+            write: Coroutine factory returning (succeeded, result)
+
+        Returns:
+            (duplicate, result) - duplicate is True when the write was
+            suppressed and `result` comes from the earlier invocation
+        """
+        done = self.lookup(key)
+        if done is not None:
+            return True, done
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return True, await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            succeeded, result = await write()
+            if succeeded:
+                self._done[key] = (time.monotonic(), result)
+            future.set_result(result)
+            return False, result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be awaiting - don't warn about an unretrieved exception
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+
+# Process-wide ledger; keys already include the session identity
+_ledger = WriteLedger()
+
+
+def get_write_ledger() -> WriteLedger:
+    """Get the shared write ledger."""
+    return _ledger
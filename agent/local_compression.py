@@ -0,0 +1,145 @@
+"""
+Otto Voice Agent - Local Extractive Compression
+Pure-Python fallback for bear-1: removes duplicate lines and sentences,
+strips boilerplate (footers, signatures, bare links) and keeps the
+highest-scoring sentences that fit a length budget, in original order.
+"""
+
+import re
+from collections import Counter
+
+# Lines that carry no information for a spoken answer
+_BOILERPLATE = re.compile(
+    r"(unsubscribe|view (this email )?in (your )?browser|sent from my \w+|"
+    r"all rights reserved|privacy policy|terms of (service|use)|"
+    r"manage (your )?(preferences|notifications)|do not reply|"
+    r"you are receiving this|click here|^\s*(©|\(c\)|copyright\b))",
+    re.IGNORECASE,
+)
+_URL_ONLY = re.compile(r"^\s*(<?https?://\S+>?|www\.\S+)\s*$", re.IGNORECASE)
+_SIGNATURE = re.compile(r"^\s*(--|__)\s*$")
+# Sentence ends, but not list markers like "3. " or decimals
+_SENTENCE_SPLIT = re.compile(r"(?<=[^\d\s][.!?])\s+(?=[A-Z0-9\"'(])")
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Lines that structure a tool result (headers, list items) are always kept
+_STRUCTURAL = re.compile(r"^\s*(\d+\.|-|\*|•)\s|:\s*$")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i if in into is it its "
+    "me my no not of on or our she so than that the their them then there these they "
+    "this to was we were what when which who will with you your".split()
+)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def strip_boilerplate(text: str) -> list[str]:
+    """Split into lines, dropping boilerplate, bare links, signatures and duplicates."""
+    lines = []
+    seen = set()
+    for raw in text.splitlines():
+        if _SIGNATURE.match(raw):
+            break  # everything after a signature delimiter is signature
+        stripped = raw.lstrip()
+        line = raw[:len(raw) - len(stripped)] + re.sub(r"[ \t]+", " ", stripped).rstrip()
+        if not line.strip() or _URL_ONLY.match(line) or _BOILERPLATE.search(line):
+            continue
+        key = _normalize(line)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def local_compress(text: str, aggressiveness: float = 0.7) -> str:
+    """
+    Compress text locally without any network call.
+
+    Args:
+        text: The text to compress
+        aggressiveness: 0.0-1.0; at 1.0 roughly half the cleaned text is kept
+
+    Returns:
+        Compressed text (never longer than the input)
+    """
+    lines = strip_boilerplate(text)
+    if not lines:
+        return text.strip()
+
+    # Units are sentences within lines; the head of a structural line is mandatory
+    units: list[tuple[int, str, bool]] = []  # (line index, text, mandatory)
+    leads = set()  # first sentence of each prose line
+    indents = []
+    seen = set()
+    for i, line in enumerate(lines):
+        stripped = line.lstrip()
+        indents.append(line[:len(line) - len(stripped)])
+        structural = bool(_STRUCTURAL.search(line))
+        for n, sentence in enumerate(_SENTENCE_SPLIT.split(stripped)):
+            key = _normalize(sentence)
+            if structural and n == 0:
+                units.append((i, sentence, True))
+            elif key and key not in seen:
+                seen.add(key)
+                if n == 0:
+                    leads.add(len(units))
+                units.append((i, sentence, False))
+
+    cleaned_len = sum(len(u[1]) + 1 for u in units)
+    budget = int(cleaned_len * (1.0 - 0.5 * max(0.0, min(aggressiveness, 1.0))))
+
+    # Score prose by content-word frequency, favouring earlier sentences and specifics
+    freq = Counter(
+        w for _, unit, mandatory in units if not mandatory
+        for w in _WORD.findall(unit.lower()) if w not in _STOPWORDS
+    )
+    scored = []
+    for order, (_, unit, mandatory) in enumerate(units):
+        if mandatory:
+            score = float("inf")
+        else:
+            words = [w for w in _WORD.findall(unit.lower()) if w not in _STOPWORDS]
+            if not words:
+                continue
+            score = sum(freq[w] for w in words) / len(words) ** 0.5
+            score *= 1.0 + 0.5 / (1 + order)
+            if order in leads:
+                score *= 1.5
+            if any(c.isdigit() for c in unit):
+                score *= 1.2
+        scored.append((score, order))
+
+    # Mandatory heads are always kept; prose gets what is left of the budget,
+    # but never less than 30% of itself so list-heavy output keeps its summary
+    keep = {order for score, order in scored if score == float("inf")}
+    mandatory_len = sum(len(units[order][1]) + 1 for order in keep)
+    prose_len = cleaned_len - mandatory_len
+    prose_budget = max(budget - mandatory_len, int(prose_len * 0.3))
+    used = 0
+    for score, order in sorted(scored, key=lambda s: (-s[0], s[1])):
+        if order in keep:
+            continue
+        length = len(units[order][1]) + 1
+        if used + length > prose_budget and used:
+            continue
+        keep.add(order)
+        used += length
+
+    # Reassemble in original order, rejoining sentences that shared a line
+    out_lines: list[str] = []
+    current_line = None
+    for order, (line_index, unit, _) in enumerate(units):
+        if order not in keep:
+            continue
+        if line_index == current_line:
+            out_lines[-1] += " " + unit
+        else:
+            out_lines.append(indents[line_index] + unit)
+            current_line = line_index
+
+    result = "\n".join(out_lines)
+    return result if len(result) < len(text) else text
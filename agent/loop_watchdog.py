@@ -0,0 +1,178 @@
+"""
+Otto Voice Agent - Event Loop Watchdog
+Measures event-loop lag continuously and pinpoints blocking calls.
+
+A heartbeat coroutine ticks on the loop while a monitor thread watches it.
+Lag is how late a heartbeat wakes up, measured the same way by both: when
+it passes the threshold, the monitor captures the stack of the loop thread
+and logs it while the stall is still going on, and the heartbeat counts
+the stall against the tool that was running once the loop is back, so
+synchronous work in tools.py shows up in the logs. The tool is the one
+whose task (or a task it started) holds the loop - see tool_context.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import Counter
+from typing import Optional
+
+from tool_context import running_tool
+
+logger = logging.getLogger("otto.watchdog")
+
+# Stall threshold and heartbeat interval (milliseconds)
+LAG_THRESHOLD_MS = float(os.getenv("OTTO_LOOP_LAG_THRESHOLD_MS", "100"))
+HEARTBEAT_INTERVAL_MS = float(os.getenv("OTTO_LOOP_HEARTBEAT_MS", "20"))
+WATCHDOG_ENABLED = os.getenv("OTTO_LOOP_WATCHDOG", "1") != "0"
+
+_AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class LoopWatchdog:
+    """Detects event-loop stalls and attributes them to the running tool."""
+
+    def __init__(self, threshold_ms: float = LAG_THRESHOLD_MS,
+                 interval_ms: float = HEARTBEAT_INTERVAL_MS):
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+
+        # Lag statistics (seconds)
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.samples = 0
+
+        # Stall statistics, keyed by tool name ("other" outside tools.py)
+        self.stall_counts: Counter = Counter()
+        self.stall_seconds: Counter = Counter()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # When the current heartbeat should wake up (time.monotonic())
+        self._due = time.monotonic()
+        self._reported_due: Optional[float] = None
+        # (heartbeat due time, tool) of the stall the monitor last saw
+        self._stall: Optional[tuple[float, str]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None and not self._heartbeat_task.done()
+
+    def start(self) -> None:
+        """Start watching the running event loop."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._due = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._monitor_thread = threading.Thread(
+            target=self._monitor, name="otto-loop-watchdog", daemon=True
+        )
+        self._monitor_thread.start()
+
+    def stop(self) -> None:
+        """Stop the heartbeat and monitor thread."""
+        self._stop.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        if self._monitor_thread and self._monitor_thread is not threading.current_thread():
+            self._monitor_thread.join(timeout=1.0)
+        self._monitor_thread = None
+
+    def stats(self) -> dict:
+        """Snapshot of lag and per-tool stall counters."""
+        return {
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "samples": self.samples,
+            "stalls": dict(self.stall_counts),
+            "stall_ms": {k: round(v * 1000, 1) for k, v in self.stall_seconds.items()},
+        }
+
+    async def _heartbeat(self) -> None:
+        while not self._stop.is_set():
+            self._due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._record_lag(max(0.0, time.monotonic() - self._due))
+
+    def _record_lag(self, lag: float) -> None:
+        self.samples += 1
+        self.last_lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if lag >= self.threshold:
+            # Count the stall, with its full duration, against the tool the
+            # monitor saw during this heartbeat
+            stall = self._stall
+            tool = stall[1] if stall and stall[0] == self._due else "other"
+            self.stall_counts[tool] += 1
+            self.stall_seconds[tool] += lag
+
+    def _monitor(self) -> None:
+        while not self._stop.is_set():
+            due = self._due
+            # Wake just as this heartbeat would pass the threshold, so a stall
+            # that only just crosses it is still caught on the stack
+            wait = due + self.threshold - time.monotonic()
+            if wait > 0 or self._reported_due == due:
+                self._stop.wait(min(wait, self.interval) if wait > 0 else self.interval)
+                continue
+            # Report each stall once, while the offending code is still on the stack
+            self._reported_due = due
+            self._report_stall(due, time.monotonic() - due)
+
+    def _report_stall(self, due: float, lag: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)
+        del frame
+
+        tool = running_tool(self._loop) or "other"
+        self._stall = (due, tool)
+
+        logger.warning(
+            f"Event loop blocked for {lag * 1000:.0f}ms+ in {tool} at "
+            f"{_find_location(stack)}\n{''.join(traceback.format_list(stack[-8:]))}"
+        )
+
+
+def _find_location(stack: traceback.StackSummary) -> str:
+    """Innermost agent frame, i.e. the line in our code that made the blocking call."""
+    for entry in reversed(stack):
+        if entry.filename.startswith(_AGENT_DIR) and entry.filename != __file__:
+            return f"{os.path.basename(entry.filename)}:{entry.lineno} ({entry.name})"
+    entry = stack[-1]
+    return f"{entry.filename}:{entry.lineno} ({entry.name})"
+
+
+# One watchdog per process - all sessions in a worker share the same loop
+_watchdog: Optional[LoopWatchdog] = None
+
+
+def start_loop_watchdog() -> Optional[LoopWatchdog]:
+    """Start the process-wide watchdog on the running loop (idempotent)."""
+    global _watchdog
+    if not WATCHDOG_ENABLED:
+        return None
+    if _watchdog is None:
+        _watchdog = LoopWatchdog()
+    if not _watchdog.running:
+        _watchdog.start()
+        print(f"\033[1;33m🐶 Loop watchdog started (threshold {LAG_THRESHOLD_MS:.0f}ms)\033[0m")
+    return _watchdog
+
+
+def get_loop_watchdog() -> Optional[LoopWatchdog]:
+    """Get the process-wide watchdog, if started."""
+    return _watchdog
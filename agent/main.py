@@ -5,7 +5,9 @@ Using Google Gemini Live Realtime API
 
 import os
 import json
+import logging
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
 from livekit.agents import (
@@ -18,17 +20,35 @@ from livekit.agents import (
 from livekit.plugins import silero
 from livekit.plugins import google
 
-from prompts import AGENT_INSTRUCTION, SESSION_INSTRUCTION
+from prompts import build_agent_instruction, build_session_instruction
 from tools import (
     get_github_activity,
     get_unread_emails,
+    get_email_summary,
     get_calendar_events,
     create_calendar_event,
+    find_free_time,
     send_email,
     search_web,
     lookup_contact,
     set_current_user_id,
+    set_current_session_id,
+    session_scope,
+    close_session,
+    get_connected_integrations,
+    warm_calendar_view,
 )
+from loop_watchdog import start_loop_watchdog
+from compression_controller import get_compression_controller
+from session_memo import get_session_memo
+from shared_cache import get_shared_cache
+from scheduler import Priority, get_scheduler, run_in_background
+from search_enrichment import get_enrichment_stats
+from profiler import setup_session_profiling, stop_profiling
+from memory_accounting import setup_session_memory
+from briefing_batch import load_briefing
+
+logger = logging.getLogger("otto.session")
 
 # Load .env.local from project root (parent of agent directory)
 project_root = Path(__file__).parent.parent
@@ -39,21 +59,41 @@ else:
     load_dotenv()
 
 
+# Tools that need a connected integration, keyed by provider
+INTEGRATION_TOOLS = {
+    "github": ("GitHub", [get_github_activity]),
+    "google": ("Gmail and Google Calendar", [
+        get_unread_emails,
+        get_email_summary,
+        get_calendar_events,
+        create_calendar_event,
+        find_free_time,
+        send_email,
+    ]),
+}
+
+# Tools that work without any integration
+COMMON_TOOLS = [search_web, lookup_contact]
+
+
 class OttoAgent(Agent):
     """Otto - Voice-first situational awareness agent with data access"""
 
-    def __init__(self) -> None:
+    def __init__(self, connected: Optional[frozenset] = None) -> None:
+        # Only expose tools for connected integrations (all if unknown),
+        # so the model never pays for schemas it can't use
+        tools = []
+        unavailable = []
+        for provider, (label, provider_tools) in INTEGRATION_TOOLS.items():
+            if connected is None or provider in connected:
+                tools.extend(provider_tools)
+            else:
+                unavailable.append(label)
+        tools.extend(COMMON_TOOLS)
+
         super().__init__(
-            instructions=AGENT_INSTRUCTION,
-            tools=[
-                get_github_activity,
-                get_unread_emails,
-                get_calendar_events,
-                create_calendar_event,
-                send_email,
-                search_web,
-                lookup_contact,
-            ],
+            instructions=build_agent_instruction(unavailable),
+            tools=tools,
         )
 
 
@@ -61,6 +101,9 @@ async def entrypoint(ctx: JobContext):
     """Main entrypoint for the agent"""
     await ctx.connect()
 
+    # Watch the event loop for blocking calls (shared by all sessions in this process)
+    watchdog = start_loop_watchdog()
+
     # Get the user who connected (for API authentication)
     user_id = None
     for participant in ctx.room.remote_participants.values():
@@ -78,12 +121,53 @@ async def entrypoint(ctx: JobContext):
                 pass
         break
 
+    # Scope idempotency keys for write tools to this job
+    set_current_session_id(ctx.job.id)
+
+    # CPU profile a sample of sessions (OTTO_PROFILE=1), or on SIGUSR2
+    setup_session_profiling(ctx.job.id)
+
+    # Memory cost of this session (SIGUSR1 for a report mid-session)
+    session_memory = setup_session_memory(ctx.job.id)
+
     # Set the user ID for tools to use
     if user_id:
         set_current_user_id(user_id)
     else:
         print("⚠️ No user ID found - APIs will require login")
 
+    # When the job ends: forget this session's held-over tool details, memo
+    # and inbox walk, write its profile, and log one record of its stats
+    scope = session_scope()
+
+    async def on_shutdown():
+        memo_stats = get_session_memo(scope).stats()
+        close_session(scope)
+        profile = stop_profiling()
+        stats = {
+            "session_id": ctx.job.id,
+            "loop": watchdog.stats() if watchdog else None,
+            "compression": get_compression_controller().metrics(),
+            "tool_memo": memo_stats,
+            "shared_cache": get_shared_cache().stats(),
+            "scheduler": get_scheduler().stats(),
+            "search_enrichment": get_enrichment_stats(),
+            "memory": session_memory.report(),
+            "profile": str(profile) if profile else None,
+        }
+        logger.info("session stats", extra={"stats": stats})
+
+    ctx.add_shutdown_callback(on_shutdown)
+
+    # Build the tool list from the user's connected integrations
+    connected = await get_connected_integrations(user_id)
+    print(f"🔌 Connected integrations: {sorted(connected) if connected is not None else 'unknown (all tools)'}")
+
+    # Serve the briefing precomputed off-peak, if there is a fresh one
+    briefing = load_briefing(user_id) if user_id else None
+    if briefing:
+        print(f"📰 Precomputed briefing: {len(briefing)} chars")
+
     # Use Google Gemini Realtime API
     session = AgentSession(
         llm=google.realtime.RealtimeModel(
@@ -94,14 +178,18 @@ async def entrypoint(ctx: JobContext):
 
     await session.start(
         room=ctx.room,
-        agent=OttoAgent(),
+        agent=OttoAgent(connected),
     )
 
     # Greet the user
     await session.generate_reply(
-        instructions=SESSION_INSTRUCTION,
+        instructions=build_session_instruction(briefing),
     )
 
+    # Fetch the week's calendar while the greeting plays; waits behind any tool call
+    if user_id and (connected is None or "google" in connected):
+        run_in_background(lambda: warm_calendar_view(user_id), Priority.BACKGROUND, name="calendar warm-up")
+
 
 if __name__ == "__main__":
     cli.run_app(
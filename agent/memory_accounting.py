@@ -0,0 +1,173 @@
+"""
+Otto Voice Agent - Memory Accounting
+What does one session cost? Reports resident memory, the size of each
+process-wide cache, and - when tracing - tracemalloc allocations since the
+session started, grouped by file.
+
+Tracing is off by default (it slows allocation down). OTTO_MEMORY_TRACE=1
+starts it at session start; SIGUSR1 logs a report on demand, starting
+tracing first if it wasn't on so the next report has a baseline.
+"""
+
+import os
+import sys
+import signal
+import asyncio
+import logging
+import tracemalloc
+import types
+from typing import Any, Optional
+
+from http_cache import get_revalidation_cache
+from idempotency import get_write_ledger
+from session_memo import session_memos
+from compression_controller import get_compression_controller
+from ttc_compression import chunk_cache_stats
+
+try:
+    import psutil
+except ImportError:  # psutil comes with livekit-agents, but don't require it
+    psutil = None
+
+logger = logging.getLogger("otto.memory")
+
+MEMORY_TRACE = os.getenv("OTTO_MEMORY_TRACE", "0").lower() in ("1", "true", "yes", "on")
+TRACE_FRAMES = int(os.getenv("OTTO_MEMORY_TRACE_FRAMES", "1"))
+REPORT_TOP = 10
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        # Peak rather than current, in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+# Shared code and runtime objects, not data held by a cache
+_NOT_DATA = (type, types.ModuleType, types.FunctionType, types.MethodType, asyncio.AbstractEventLoop)
+
+
+def deep_sizeof(obj: Any, limit: int = 200_000) -> int:
+    """Approximate bytes reachable from obj through containers and attributes."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < limit:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _NOT_DATA):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o, 0)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif hasattr(o, "__dict__"):
+            stack.append(vars(o))
+        elif hasattr(o, "__slots__"):
+            stack.extend(getattr(o, s) for s in o.__slots__ if hasattr(o, s))
+    return total
+
+
+def cache_sizes() -> dict:
+    """Entries and approximate bytes held by each process-wide cache."""
+    http = get_revalidation_cache()
+    ledger = get_write_ledger()
+    memos = session_memos()
+    controller = get_compression_controller()
+    chunks = chunk_cache_stats()
+    return {
+        "http_cache": {"entries": len(http), "bytes": deep_sizeof(http)},
+        "chunk_cache": {"entries": chunks["entries"], "bytes": chunks["chars"]},
+        "write_ledger": {"entries": len(ledger), "bytes": deep_sizeof(ledger)},
+        "tool_memo": {"entries": sum(m.stats()["entries"] for m in memos), "bytes": deep_sizeof(memos)},
+        "compression_stats": {"entries": len(controller.tools), "bytes": deep_sizeof(controller)},
+    }
+
+
+class SessionMemory:
+    """Memory baseline for one session; report() shows what it has added since."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.rss_start = rss_bytes()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        if tracemalloc.is_tracing():
+            self._baseline = _snapshot()
+
+    def start_tracing(self) -> None:
+        """Start tracemalloc (if needed) and take the baseline from now."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        self._baseline = _snapshot()
+
+    def report(self, top: int = REPORT_TOP) -> dict:
+        """RSS, cache sizes and, when tracing, the files that allocated the most since the baseline."""
+        rss = rss_bytes()
+        report = {
+            "session_id": self.session_id,
+            "rss_mb": round(rss / 2**20, 1),
+            "rss_delta_mb": round((rss - self.rss_start) / 2**20, 1),
+            "caches": cache_sizes(),
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            report["traced_mb"] = round(current / 2**20, 2)
+            report["traced_peak_mb"] = round(peak / 2**20, 2)
+            if self._baseline is not None:
+                diff = _snapshot().compare_to(self._baseline, "filename")
+                report["top_allocations"] = [
+                    {"file": stat.traceback[0].filename, "kb": round(stat.size_diff / 1024, 1), "blocks": stat.count_diff}
+                    for stat in diff[:top] if stat.size_diff > 0
+                ]
+        return report
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    # Don't count tracemalloc's own bookkeeping
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+
+
+# Memory baseline of the session running in this process
+_session: Optional[SessionMemory] = None
+
+
+def get_session_memory() -> Optional[SessionMemory]:
+    """Get the current session's memory accounting, if set up."""
+    return _session
+
+
+def setup_session_memory(session_id: str) -> SessionMemory:
+    """
+    Take the session's memory baseline and let SIGUSR1 report on demand.
+
+    Call from the event loop thread at session start.
+    """
+    global _session
+    if MEMORY_TRACE and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+    _session = SessionMemory(session_id)
+
+    def on_signal():
+        if not tracemalloc.is_tracing():
+            _session.start_tracing()
+            logger.warning(f"tracemalloc started for {session_id}; signal again for a report")
+        else:
+            logger.warning(f"Memory report: {_session.report()}")
+
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, on_signal)
+    except (NotImplementedError, AttributeError, RuntimeError, ValueError):
+        pass  # no signals on this platform or not on the main thread
+    return _session
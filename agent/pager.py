@@ -0,0 +1,71 @@
+"""
+Otto Voice Agent - Cursor Pager
+Walks a cursor-paginated API one page at a time, prefetching the next
+page in the background while the current one is being spoken.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from scheduler import Priority, ScheduledJob, run_in_background
+
+# fetch(cursor) -> (items, next_cursor); next_cursor is None on the last page
+PageFetcher = Callable[[Optional[str]], Awaitable[tuple[list[Any], Optional[str]]]]
+
+
+class CursorPager:
+    """Sequential pages from a cursor API with one page of read-ahead."""
+
+    def __init__(self, fetch: PageFetcher):
+        self._fetch = fetch
+        self._cursor: Optional[str] = None
+        self._prefetch: Optional[ScheduledJob] = None
+        self.exhausted = False
+        self.pages_read = 0
+        self.items_read = 0
+
+    @property
+    def has_more(self) -> bool:
+        return not self.exhausted
+
+    async def next_page(self) -> list[Any]:
+        """Return the next page, using the prefetched one when it is ready."""
+        if self.exhausted:
+            return []
+
+        items, next_cursor = None, None
+        if self._prefetch is not None:
+            job, self._prefetch = self._prefetch, None
+            try:
+                # Starts it now if the scheduler was still holding it back
+                items, next_cursor = await job.result()
+            except asyncio.CancelledError:
+                if not job.cancelled():
+                    raise
+                # Dropped from a full background queue - fetch in the foreground
+                items = None
+            except Exception as e:
+                # Read-ahead failed in the background - fetch again in the foreground
+                logging.warning(f"Page prefetch failed, refetching: {e}")
+                items = None
+
+        if items is None:
+            items, next_cursor = await self._fetch(self._cursor)
+
+        self.pages_read += 1
+        self.items_read += len(items)
+        self._cursor = next_cursor
+        if next_cursor:
+            self._prefetch = run_in_background(
+                lambda: self._fetch(next_cursor), Priority.PREFETCH, name="page read-ahead"
+            )
+        else:
+            self.exhausted = True
+        return items
+
+    def close(self) -> None:
+        """Cancel any read-ahead in flight."""
+        if self._prefetch is not None:
+            self._prefetch.cancel()
+            self._prefetch = None
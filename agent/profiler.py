@@ -0,0 +1,302 @@
+"""
+Otto Voice Agent - Sampling Profiler
+Opt-in, low-overhead CPU profiles of live sessions.
+
+A sampler thread periodically captures the Python stacks of the event loop
+thread and the executor threads (where compression runs), skipping threads
+that are idle in select/wait. Samples taken while the loop runs a tool's
+task, or a task the tool started, are rooted under a "[tool:<name>]" frame and the start and end of every tool call are
+marked on a timeline, so a profile shows what each tool call cost.
+Marks hold argument names and a keyed hash of their values (the key is
+per profile and never written), never the values: arguments carry email
+addresses, message text and search queries.
+
+Each profiled session writes two files to OTTO_PROFILE_DIR:
+  <session>.collapsed  folded stacks for flamegraph.pl, speedscope or inferno
+  <session>.json       timeline of tool calls and per-tool sample counts
+
+Enable with OTTO_PROFILE=1 (profiles OTTO_PROFILE_SAMPLE_RATE of sessions),
+or send SIGUSR2 to a worker to start/stop profiling its current session.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import hmac
+import hashlib
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from tool_context import running_tool
+
+logger = logging.getLogger("otto.profiler")
+
+PROFILE_ENABLED = os.getenv("OTTO_PROFILE", "0").lower() in ("1", "true", "yes", "on")
+# Fraction of sessions profiled when enabled (chosen by session ID, so it's stable)
+PROFILE_SAMPLE_RATE = float(os.getenv("OTTO_PROFILE_SAMPLE_RATE", "0.1"))
+PROFILE_INTERVAL_MS = float(os.getenv("OTTO_PROFILE_INTERVAL_MS", "10"))
+PROFILE_DIR = Path(os.getenv("OTTO_PROFILE_DIR", Path(__file__).parent / "profiles"))
+# Stop sampling after this long so a forgotten profile can't run all day
+PROFILE_MAX_SECONDS = float(os.getenv("OTTO_PROFILE_MAX_SECONDS", "900"))
+
+# Overhead bounds: sampler CPU share before it backs off, stack depth, distinct stacks
+MAX_OVERHEAD = 0.02
+MAX_INTERVAL_MS = 100.0
+MAX_DEPTH = 64
+MAX_STACKS = 20000
+
+# A thread whose innermost frame is in one of these is waiting, not using CPU
+_IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+
+
+def _is_idle(frame) -> bool:
+    return os.path.basename(frame.f_code.co_filename) in _IDLE_FILES
+
+
+def _frame_name(code) -> str:
+    name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return name.replace(";", ":")
+
+
+class SessionProfiler:
+    """Samples the loop and executor threads for one session."""
+
+    def __init__(self, session_id: str, interval_ms: float = PROFILE_INTERVAL_MS,
+                 out_dir: Path = PROFILE_DIR, max_seconds: float = PROFILE_MAX_SECONDS):
+        self.session_id = session_id
+        self.interval = interval_ms / 1000.0
+        self.out_dir = Path(out_dir)
+        self.max_seconds = max_seconds
+
+        # (root label, code objects outermost first) -> sample count
+        self.stacks: Counter = Counter()
+        self.tool_samples: Counter = Counter()
+        self.samples = 0
+        self.idle = 0
+        self.dropped = 0
+        self.marks: list[dict] = []
+        # Keys the argument hashes: tells repeat calls apart without being reversible offline
+        self._args_key = os.urandom(16)
+
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.sampler_seconds = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start sampling; call from the event loop thread."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="otto-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        if self.stopped_at is None:
+            self.stopped_at = time.time()
+
+    def mark(self, tool: str, **args) -> None:
+        """Record the start of a tool call on the timeline (argument names and hash only)."""
+        if self.started_at is None or self.stopped_at is not None:
+            return
+        values = repr(sorted(args.items())).encode("utf-8")
+        self.marks.append({
+            "t": round(time.time() - self.started_at, 4),
+            "tool": tool,
+            "event": "start",
+            "args": sorted(args),
+            "args_hash": hmac.new(self._args_key, values, hashlib.sha256).hexdigest()[:16],
+            "samples_before": self.samples,
+        })
+
+    def mark_end(self, tool: str, outcome: str = "ok") -> None:
+        """Record the end of a tool call ("ok", "error" or "cancelled")."""
+        if self.started_at is None or self.stopped_at is not None:
+            return
+        self.marks.append({
+            "t": round(time.time() - self.started_at, 4),
+            "tool": tool,
+            "event": "end",
+            "outcome": outcome,
+            "samples_before": self.samples,
+        })
+
+    def _sample_loop(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        window_start, window_cpu, window_samples = time.monotonic(), 0.0, 0
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            if now > deadline:
+                logger.warning(f"Profile of {self.session_id} hit {self.max_seconds:.0f}s limit, stopping")
+                break
+            # Thread CPU time, not wall time: waiting for the GIL costs the loop nothing
+            t0 = time.thread_time()
+            self._sample()
+            spent = time.thread_time() - t0
+            self.sampler_seconds += spent
+            window_cpu += spent
+            window_samples += 1
+
+            # Keep the sampler's share of CPU bounded by sampling less often
+            if window_samples >= 50:
+                if window_cpu > (now - window_start) * MAX_OVERHEAD:
+                    self.interval = min(self.interval * 2, MAX_INTERVAL_MS / 1000.0)
+                window_start, window_cpu, window_samples = now, 0.0, 0
+        if self.stopped_at is None:
+            self.stopped_at = time.time()
+
+    def _sample(self) -> None:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._loop_thread_id:
+                tool = running_tool(self._loop)
+                root = f"[tool:{tool}]" if tool else "[loop]"
+            elif names.get(thread_id, "").startswith("asyncio_"):
+                tool, root = None, "[executor]"
+            else:
+                continue
+            if _is_idle(frame):
+                self.idle += 1
+                continue
+            if tool:
+                self.tool_samples[tool] += 1
+
+            codes = []
+            while frame is not None and len(codes) < MAX_DEPTH:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            codes.reverse()
+            del frame
+
+            key = (root, tuple(codes))
+            if key not in self.stacks and len(self.stacks) >= MAX_STACKS:
+                self.dropped += 1
+                key = (root, ())
+            self.stacks[key] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Folded stacks, one "frame;frame;frame count" line per distinct stack."""
+        folded: Counter = Counter()
+        for (root, codes), count in self.stacks.items():
+            folded[";".join([root] + [_frame_name(c) for c in codes])] += count
+        return "\n".join(f"{stack} {count}" for stack, count in folded.most_common()) + "\n"
+
+    def stats(self) -> dict:
+        duration = (self.stopped_at or time.time()) - (self.started_at or time.time())
+        return {
+            "session_id": self.session_id,
+            "duration_s": round(duration, 2),
+            "interval_ms": round(self.interval * 1000, 1),
+            "samples": self.samples,
+            "idle_samples": self.idle,
+            "dropped_stacks": self.dropped,
+            "tool_samples": dict(self.tool_samples),
+            "overhead_pct": round(100 * self.sampler_seconds / duration, 2) if duration > 0 else 0.0,
+        }
+
+    def write(self) -> Path:
+        """Write the .collapsed and .json files; returns the .collapsed path."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        name = "".join(c if c.isalnum() or c in "-_" else "_" for c in self.session_id)
+        collapsed_path = self.out_dir / f"{name}.collapsed"
+        collapsed_path.write_text(self.collapsed())
+        (self.out_dir / f"{name}.json").write_text(
+            json.dumps({**self.stats(), "tool_calls": self.marks}, indent=2)
+        )
+        return collapsed_path
+
+
+def should_profile(session_id: str, rate: float = PROFILE_SAMPLE_RATE) -> bool:
+    """Stable per-session coin flip: the same session ID always gets the same answer."""
+    digest = hashlib.sha1(session_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") / 2 ** 32 < rate
+
+
+# The profile of the session running in this process, if any
+_profiler: Optional[SessionProfiler] = None
+
+
+def get_session_profiler() -> Optional[SessionProfiler]:
+    """Get the current session's profiler, if profiling."""
+    return _profiler
+
+
+def mark_tool_call(tool: str, **args) -> None:
+    """Annotate the start of a tool call on the current profile (no-op when not profiling)."""
+    if _profiler is not None:
+        _profiler.mark(tool, **args)
+
+
+def mark_tool_end(tool: str, outcome: str = "ok") -> None:
+    """Annotate the end of a tool call on the current profile (no-op when not profiling)."""
+    if _profiler is not None:
+        _profiler.mark_end(tool, outcome)
+
+
+def start_profiling(session_id: str) -> SessionProfiler:
+    """Start profiling the current session (replacing any earlier profile)."""
+    global _profiler
+    if _profiler is not None and _profiler.running:
+        stop_profiling()
+    _profiler = SessionProfiler(session_id)
+    _profiler.start()
+    print(f"\033[1;33m🔬 Profiling session {session_id} every {PROFILE_INTERVAL_MS:.0f}ms\033[0m")
+    return _profiler
+
+
+def stop_profiling() -> Optional[Path]:
+    """Stop profiling and write the output; returns the .collapsed path."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is None:
+        return None
+    profiler.stop()
+    path = profiler.write()
+    print(f"\033[1;33m🔬 Profile written to {path} ({profiler.stats()})\033[0m")
+    return path
+
+
+def setup_session_profiling(session_id: str) -> Optional[SessionProfiler]:
+    """
+    Profile this session if enabled and sampled, and let SIGUSR2 toggle it.
+
+    Call from the event loop thread at session start; call stop_profiling()
+    when the session ends.
+    """
+    def toggle():
+        if _profiler is not None:
+            stop_profiling()
+        else:
+            start_profiling(session_id)
+
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, toggle)
+    except (NotImplementedError, AttributeError, RuntimeError, ValueError):
+        pass  # no signals on this platform or not on the main thread
+
+    if PROFILE_ENABLED and should_profile(session_id):
+        return start_profiling(session_id)
+    return None
@@ -0,0 +1,318 @@
+"""
+Otto Voice Agent - Background Scheduler
+One place to run work nobody is waiting on (read-ahead, cache warm-ups,
+refreshes) without it competing with the user's live tool calls.
+
+Jobs are queued by priority class and started by a dispatcher, at most
+OTTO_SCHEDULER_MAX_RUNNING at a time. BACKGROUND jobs wait while any tool
+call is in flight (tools are wrapped with @interactive) or the event loop
+lags past OTTO_SCHEDULER_LAG_PAUSE_MS; PREFETCH jobs run alongside tool
+calls and only wait for twice that lag. A queued job someone starts
+waiting on is promoted and run at once, so read-ahead can never delay the
+answer it was meant to speed up.
+
+Per-class counters (queued, running, done, failed, dropped, wait and run
+times, pauses) are available from stats().
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import functools
+import itertools
+import logging
+from collections import Counter
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Optional
+
+from loop_watchdog import get_loop_watchdog
+from profiler import mark_tool_end
+from tool_context import enter_tool, exit_tool
+
+logger = logging.getLogger("otto.scheduler")
+
+# Background jobs running at once
+MAX_RUNNING = int(os.getenv("OTTO_SCHEDULER_MAX_RUNNING", "2"))
+# Loop lag above which background jobs wait (prefetch waits at twice this)
+LAG_PAUSE_MS = float(os.getenv("OTTO_SCHEDULER_LAG_PAUSE_MS", "50"))
+# Queued jobs kept per class; the oldest is dropped beyond this
+MAX_QUEUED = 100
+# How often a paused dispatcher re-checks lag
+POLL_INTERVAL = 0.05
+
+
+class Priority(IntEnum):
+    """Priority classes, most urgent first."""
+    INTERACTIVE = 0   # tool calls the user is waiting on (run directly, tracked only)
+    PREFETCH = 1      # read-ahead for something the user is likely to ask next
+    BACKGROUND = 2    # maintenance: warm-ups, refreshes, shipping logs
+
+
+class ScheduledJob:
+    """A queued or running background job."""
+
+    def __init__(self, scheduler: "Scheduler", factory: Callable[[], Awaitable[Any]],
+                 priority: Priority, name: str):
+        self.name = name
+        self.priority = priority
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+        self.started = False
+        self._scheduler = scheduler
+        self._factory = factory
+        self._task: Optional[asyncio.Task] = None
+
+    async def result(self) -> Any:
+        """Wait for the job, starting it now if it is still queued."""
+        if not self.started and not self.future.done():
+            self._scheduler._promote(self)
+        return await asyncio.shield(self.future)
+
+    def cancel(self) -> None:
+        """Drop the job if queued, or cancel it if running."""
+        if self._task is not None:
+            self._task.cancel()
+        elif not self.future.done():
+            self.future.cancel()
+
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+
+class Scheduler:
+    """Priority queue of background jobs, throttled by tool calls and loop lag."""
+
+    def __init__(self, max_running: int = MAX_RUNNING, lag_pause_ms: float = LAG_PAUSE_MS):
+        self.max_running = max_running
+        self.lag_pause = lag_pause_ms / 1000.0
+        self.interactive_in_flight = 0
+        self._queue: list[tuple[int, int, ScheduledJob]] = []
+        self._order = itertools.count()
+        self._running: set[ScheduledJob] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lag = 0.0
+
+        self.queued: Counter = Counter()
+        self.completed: Counter = Counter()
+        self.failed: Counter = Counter()
+        self.dropped: Counter = Counter()
+        self.promoted: Counter = Counter()
+        self.pauses: Counter = Counter()
+        self.wait_seconds: Counter = Counter()
+        self.run_seconds: Counter = Counter()
+        self.max_wait: dict[str, float] = {}
+
+    # --- submitting ---
+
+    def submit(self, factory: Callable[[], Awaitable[Any]], priority: Priority = Priority.BACKGROUND,
+               name: Optional[str] = None) -> ScheduledJob:
+        """
+        Queue a job; factory is called when it starts (so nothing runs while queued).
+
+        Args:
+            factory: No-argument callable returning the coroutine to run
+            priority: PREFETCH or BACKGROUND
+            name: Label for logs
+        """
+        if priority == Priority.INTERACTIVE:
+            raise ValueError("Interactive work runs directly; wrap tools with @interactive instead")
+        job = ScheduledJob(self, factory, priority, name or getattr(factory, "__name__", "job"))
+        label = priority.name.lower()
+        if sum(1 for _, _, j in self._queue if j.priority == priority) >= MAX_QUEUED:
+            oldest = min((entry for entry in self._queue if entry[2].priority == priority), key=lambda e: e[1])
+            self._queue.remove(oldest)
+            heapq.heapify(self._queue)
+            oldest[2].future.cancel()
+            self.dropped[label] += 1
+            logger.warning(f"Background queue full, dropped {oldest[2].name}")
+        heapq.heappush(self._queue, (int(priority), next(self._order), job))
+        self.queued[label] += 1
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        return job
+
+    # --- interactive tracking ---
+
+    def interactive_started(self) -> None:
+        self.interactive_in_flight += 1
+
+    def interactive_finished(self) -> None:
+        self.interactive_in_flight = max(0, self.interactive_in_flight - 1)
+        if self._wakeup is not None and self._loop is _current_loop():
+            self._wakeup.set()
+
+    # --- dispatching ---
+
+    def loop_lag(self) -> float:
+        """Latest loop lag in seconds, from the watchdog if it runs, else our own probe."""
+        watchdog = get_loop_watchdog()
+        if watchdog is not None and watchdog.running:
+            return max(watchdog.last_lag, self._lag)
+        return self._lag
+
+    def _blocked(self, priority: Priority) -> Optional[str]:
+        """Why a job of this class can't start now, or None if it can."""
+        if len(self._running) >= self.max_running:
+            return "busy"
+        if priority == Priority.BACKGROUND and self.interactive_in_flight:
+            return "interactive"
+        limit = self.lag_pause * (2 if priority == Priority.PREFETCH else 1)
+        if self.loop_lag() > limit:
+            return "lag"
+        return None
+
+    def _ensure_dispatcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A new event loop (e.g. a new asyncio.run()) - jobs of the old one can't run here
+            self._loop = loop
+            self._queue = [entry for entry in self._queue if entry[2].future.get_loop() is loop]
+            heapq.heapify(self._queue)
+            self._running = {j for j in self._running if j.future.get_loop() is loop}
+            self._wakeup = asyncio.Event()
+            self._dispatcher = None
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Skip jobs cancelled or promoted while queued
+            while self._queue and (self._queue[0][2].started or self._queue[0][2].future.done()):
+                heapq.heappop(self._queue)
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # One yield to the loop measures how long the callbacks ahead of us take
+            before = loop.time()
+            await asyncio.sleep(0)
+            self._lag = loop.time() - before
+            if not self._queue or self._queue[0][2].started or self._queue[0][2].future.done():
+                continue
+
+            job = self._queue[0][2]
+            reason = self._blocked(job.priority)
+            if reason is None:
+                heapq.heappop(self._queue)
+                self._start(job)
+                continue
+
+            self.pauses[f"{job.priority.name.lower()}:{reason}"] += 1
+            self._wakeup.clear()
+            try:
+                # Woken by a finished job or tool call, else re-check after a poll interval
+                await asyncio.wait_for(self._wakeup.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def _promote(self, job: ScheduledJob) -> None:
+        self.promoted[job.priority.name.lower()] += 1
+        self._start(job)
+
+    def _start(self, job: ScheduledJob) -> None:
+        job.started = True
+        label = job.priority.name.lower()
+        waited = time.monotonic() - job.queued_at
+        self.wait_seconds[label] += waited
+        self.max_wait[label] = max(self.max_wait.get(label, 0.0), waited)
+        self._running.add(job)
+        job._task = asyncio.get_running_loop().create_task(self._run(job))
+
+    async def _run(self, job: ScheduledJob) -> None:
+        label = job.priority.name.lower()
+        t0 = time.monotonic()
+        try:
+            result = await job._factory()
+        except asyncio.CancelledError:
+            job.future.cancel()
+        except Exception as e:
+            self.failed[label] += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+            # Retrieved here so an unawaited failure isn't reported as never retrieved
+            job.future.exception()
+        else:
+            self.completed[label] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self.run_seconds[label] += time.monotonic() - t0
+            self._running.discard(job)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def stats(self) -> dict:
+        """Per-class queue metrics and the current throttling inputs."""
+        classes = {}
+        for priority in (Priority.PREFETCH, Priority.BACKGROUND):
+            label = priority.name.lower()
+            started = self.completed[label] + self.failed[label] + sum(
+                1 for j in self._running if j.priority == priority)
+            classes[label] = {
+                "queued_now": sum(1 for _, _, j in self._queue
+                                  if j.priority == priority and not j.started and not j.future.done()),
+                "running_now": sum(1 for j in self._running if j.priority == priority),
+                "submitted": self.queued[label],
+                "completed": self.completed[label],
+                "failed": self.failed[label],
+                "dropped": self.dropped[label],
+                "promoted": self.promoted[label],
+                "avg_wait_ms": round(1000 * self.wait_seconds[label] / started, 1) if started else 0.0,
+                "max_wait_ms": round(1000 * self.max_wait.get(label, 0.0), 1),
+                "run_ms": round(1000 * self.run_seconds[label], 1),
+            }
+        return {
+            "interactive_in_flight": self.interactive_in_flight,
+            "loop_lag_ms": round(self.loop_lag() * 1000, 1),
+            "pauses": dict(self.pauses),
+            **classes,
+        }
+
+
+def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# One scheduler per process - all sessions in a worker share the same loop
+_scheduler = Scheduler()
+
+
+def get_scheduler() -> Scheduler:
+    """Get the process-wide background scheduler."""
+    return _scheduler
+
+
+def run_in_background(factory: Callable[[], Awaitable[Any]], priority: Priority = Priority.BACKGROUND,
+                      name: Optional[str] = None) -> ScheduledJob:
+    """Queue a job on the process-wide scheduler (see Scheduler.submit)."""
+    return _scheduler.submit(factory, priority, name)
+
+
+def interactive(fn):
+    """Mark a tool as interactive: background jobs hold back while it runs (and its end is profiled)."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        _scheduler.interactive_started()
+        # Work the tool's task and its child tasks do is attributed to the tool
+        tool_state = enter_tool(fn.__name__)
+        outcome = "error"
+        try:
+            result = await fn(*args, **kwargs)
+            outcome = "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            exit_tool(tool_state)
+            _scheduler.interactive_finished()
+            mark_tool_end(fn.__name__, outcome)
+    return wrapper
@@ -0,0 +1,382 @@
+"""
+Otto Voice Agent - Search Enrichment
+DuckDuckGo snippets are cut at ~200 characters and often stop just short
+of the answer. When search_web is asked to read the pages (the model opts
+in per call, for questions the snippets won't answer - it costs up to
+OTTO_SEARCH_ENRICH_MS), the top result pages are fetched concurrently,
+their main text is extracted as it streams in, and the few sentences that
+best match the query are spoken instead of the snippet. OTTO_SEARCH_ENRICH=0
+turns page reading off altogether.
+
+Fetching is bounded: OTTO_SEARCH_ENRICH_MS for the whole batch and
+OTTO_SEARCH_PAGE_BYTES per page. A page still loading when time runs out
+answers from the text read so far, but only fully read pages are cached
+(by URL, in process and in the shared cache tier); a page with nothing
+useful falls back to its snippet.
+
+Result URLs come from the web, so only http(s) is fetched, redirects are
+followed by hand, and every hop's host must resolve to public addresses
+only - a result or redirect can't point Otto at loopback, private or
+link-local services (cloud metadata, the Next.js app, Redis). Each hop
+connects to the address that was checked, not a fresh lookup.
+"""
+
+import os
+import re
+import time
+import codecs
+import socket
+import asyncio
+import logging
+import ipaddress
+from collections import Counter, OrderedDict
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+from shared_cache import get_shared_cache
+
+# Whether search_web may read result pages when asked to (never by default)
+ENRICH_ENABLED = os.getenv("OTTO_SEARCH_ENRICH", "1").lower() not in ("0", "false", "no", "off")
+# Time for all page fetches together
+ENRICH_BUDGET = float(os.getenv("OTTO_SEARCH_ENRICH_MS", "1500")) / 1000.0
+# Bytes read per page before it is cut off
+PAGE_MAX_BYTES = int(os.getenv("OTTO_SEARCH_PAGE_BYTES", "262144"))
+# Redirect hops followed per page
+MAX_REDIRECTS = 5
+# Only for local testing against the fake backend - never in production
+ALLOW_PRIVATE_HOSTS = False
+# Enough main text to find an answer in; reading stops once a page has this much
+PAGE_TEXT_CHARS = 8000
+# Extracted pages kept in process, and how long they are trusted
+PAGE_CACHE_MAX = 256
+PAGE_CACHE_TTL = 3600
+# What is said per result
+ANSWER_SENTENCES = 2
+ANSWER_MAX_CHARS = 320
+# Shorter blocks are menus, buttons and link lists rather than text
+MIN_BLOCK_CHARS = 40
+
+USER_AGENT = "Mozilla/5.0 (compatible; OttoVoiceAgent/1.0)"
+
+_WORD = re.compile(r"[a-z0-9']+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[^\d\s][.!?])\s+(?=[A-Z0-9\"'(])")
+_CHARSET = re.compile(r"charset=[\"']?([\w.-]+)", re.IGNORECASE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it of on or the "
+    "to was what when where which who why will with".split()
+)
+
+
+class MainTextParser(HTMLParser):
+    """
+    Incremental HTML-to-text: feed() it chunks as they arrive and read
+    text() at any point. Scripts, navigation, headers, footers and forms are
+    skipped, and short blocks (menus, captions) are dropped.
+    """
+
+    SKIP = frozenset({
+        "script", "style", "noscript", "template", "svg", "iframe",
+        "nav", "header", "footer", "aside", "form", "button", "select",
+    })
+    BLOCK = frozenset({
+        "p", "div", "li", "ul", "ol", "br", "tr", "td", "th", "dd", "dt", "pre",
+        "blockquote", "article", "section", "main", "h1", "h2", "h3", "h4", "h5", "h6",
+    })
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.blocks: list[str] = []
+        self.chars = 0
+        self._skip_depth = 0
+        self._in_title = False
+        self._current: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in self.BLOCK:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in self.BLOCK:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.title = " ".join(f"{self.title} {data}".split())
+        else:
+            self._current.append(data)
+
+    def _flush(self) -> None:
+        text = " ".join("".join(self._current).split())
+        self._current = []
+        if len(text) >= MIN_BLOCK_CHARS:
+            self.blocks.append(text)
+            self.chars += len(text)
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+    def text(self) -> str:
+        return "\n".join(self.blocks)
+
+
+def answer_from_text(query: str, text: str, sentences: int = ANSWER_SENTENCES,
+                     max_chars: int = ANSWER_MAX_CHARS) -> str:
+    """
+    The sentences of a page that best match the query, in page order.
+
+    Sentences are scored by how many distinct query words they contain,
+    earlier ones winning ties. Returns "" if no sentence mentions the query.
+    """
+    terms = {w for w in _WORD.findall(query.lower()) if w not in _STOPWORDS}
+    if not terms:
+        return ""
+    scored = []
+    seen = set()
+    for position, sentence in enumerate(s.strip() for block in text.splitlines() for s in _SENTENCE_SPLIT.split(block)):
+        words = set(_WORD.findall(sentence.lower()))
+        score = len(terms & words)
+        if score and sentence not in seen:
+            seen.add(sentence)
+            scored.append((-score, position, sentence))
+    best = sorted(sorted(scored)[:sentences], key=lambda s: s[1])
+    answer = ""
+    for _, _, sentence in best:
+        if answer and len(answer) + len(sentence) + 1 > max_chars:
+            break
+        answer = f"{answer} {sentence}".strip()
+    if len(answer) > max_chars:
+        answer = answer[:max_chars - 3].rstrip() + "..."
+    return answer
+
+
+class PageCache:
+    """Extracted page text by URL, least recently used dropped first."""
+
+    def __init__(self, max_entries: int = PAGE_CACHE_MAX, ttl: float = PAGE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._pages: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, url: str) -> Optional[str]:
+        entry = self._pages.get(url)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            self._pages.move_to_end(url)
+            return entry[1]
+        self._pages.pop(url, None)
+        # Another worker may have read it already
+        text = await get_shared_cache().aget("page", url)
+        if text is not None:
+            self._remember(url, text)
+        return text
+
+    async def put(self, url: str, text: str) -> None:
+        self._remember(url, text)
+        await get_shared_cache().aset("page", url, text, ttl=self.ttl)
+
+    def _remember(self, url: str, text: str) -> None:
+        self._pages[url] = (time.monotonic(), text)
+        self._pages.move_to_end(url)
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+async def resolve_host(host: str, port: int) -> list[str]:
+    """Addresses a host name resolves to (IP literals resolve to themselves)."""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def check_public_url(url: str) -> str:
+    """
+    The address to connect to for url, after checking it.
+
+    Raises ValueError unless url is http(s) on a host whose addresses are
+    all public. Connect to the returned address rather than resolving the
+    name again, or DNS rebinding could swap in a private one.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"not an http(s) URL: {url[:100]}")
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    addresses = [ipaddress.ip_address(a.split("%")[0]) for a in await resolve_host(parsed.hostname, port)]
+    if not addresses:
+        raise ValueError(f"{parsed.hostname} did not resolve")
+    for address in addresses:
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not ALLOW_PRIVATE_HOSTS and (not address.is_global or address.is_multicast):
+            raise ValueError(f"{parsed.hostname} resolves to a non-public address ({address})")
+    return str(addresses[0])
+
+
+def _pinned_request(client: httpx.AsyncClient, url: str, address: str) -> httpx.Request:
+    """A GET for url sent to address, with url's Host header and TLS server name."""
+    parsed = urlparse(url)
+    host = f"[{address}]" if ":" in address else address
+    netloc = f"{host}:{parsed.port}" if parsed.port else host
+    return client.build_request(
+        "GET",
+        parsed._replace(netloc=netloc).geturl(),
+        headers={"User-Agent": USER_AGENT, "Host": parsed.netloc.rpartition("@")[2]},
+        # Certificates are checked against the name, not the address
+        extensions={"sni_hostname": parsed.hostname},
+    )
+
+
+async def read_page(client: httpx.AsyncClient, url: str, parser: MainTextParser,
+                    max_bytes: int = PAGE_MAX_BYTES) -> int:
+    """
+    Stream a page into parser, stopping at max_bytes or once it has enough text.
+
+    Redirects are followed here (not by httpx) so that every hop passes
+    check_public_url, and each hop connects to the address that was checked.
+    Returns the number of bytes read; raises on HTTP errors, non-text pages,
+    non-public hosts and redirect loops.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        address = await check_public_url(url)
+        response = await client.send(_pinned_request(client, url, address), stream=True)
+        try:
+            if response.is_redirect:
+                url = urljoin(url, response.headers["location"])
+                continue
+            return await _read_body(response, parser, max_bytes)
+        finally:
+            await response.aclose()
+    raise ValueError(f"more than {MAX_REDIRECTS} redirects")
+
+
+async def _read_body(response: httpx.Response, parser: MainTextParser, max_bytes: int) -> int:
+    response.raise_for_status()
+    content_type = response.headers.get("content-type", "")
+    if "html" not in content_type and "text/plain" not in content_type:
+        raise ValueError(f"not a text page ({content_type or 'no content type'})")
+    charset = _CHARSET.search(content_type)
+    try:
+        decoder = codecs.getincrementaldecoder(charset.group(1) if charset else "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    received = 0
+    async for chunk in response.aiter_bytes():
+        chunk = chunk[:max_bytes - received]
+        received += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if received >= max_bytes or parser.chars >= PAGE_TEXT_CHARS:
+            _stats["truncated"] += 1
+            break
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return received
+
+
+async def enrich_results(
+    query: str,
+    results: list[dict],
+    budget: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+) -> list[Optional[str]]:
+    """
+    Answer text for each search result, read from its page.
+
+    Args:
+        query: The search query, to pick the sentences that answer it
+        results: DuckDuckGo results (dicts with "href")
+        budget: Seconds for all fetches (default OTTO_SEARCH_ENRICH_MS)
+        max_bytes: Bytes read per page (default OTTO_SEARCH_PAGE_BYTES)
+
+    Returns:
+        One entry per result: the answer sentences, or None to use the snippet
+    """
+    budget = ENRICH_BUDGET if budget is None else budget
+    max_bytes = PAGE_MAX_BYTES if max_bytes is None else max_bytes
+    cache = get_page_cache()
+    texts: dict[int, str] = {}
+    parsers: dict[int, MainTextParser] = {}
+    tasks: dict[asyncio.Task, int] = {}
+    t0 = time.perf_counter()
+
+    urls: dict[int, str] = {}
+    for i, result in enumerate(results):
+        url = result.get("href") or ""
+        if urlparse(url).scheme not in ("http", "https"):
+            continue
+        cached = await cache.get(url)
+        if cached is not None:
+            _stats["cache_hits"] += 1
+            texts[i] = cached
+        else:
+            urls[i] = url
+
+    if urls:
+        async with httpx.AsyncClient(timeout=budget) as client:
+            for i, url in urls.items():
+                parsers[i] = MainTextParser()
+                tasks[asyncio.create_task(read_page(client, url, parsers[i], max_bytes))] = i
+            # The budget covers setting up the client too
+            remaining = max(0.0, budget - (time.perf_counter() - t0))
+            done, pending = await asyncio.wait(tasks, timeout=remaining)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+        for task, i in tasks.items():
+            if task in pending:
+                # Out of time - answer from whatever arrived, but don't cache
+                # it: the rest of the page may hold the answer next time
+                _stats["timed_out"] += 1
+                texts[i] = parsers[i].text()
+            elif task.exception() is not None:
+                _stats["failed"] += 1
+                logging.info(f"Couldn't read {urls[i]}: {task.exception()}")
+            else:
+                _stats["fetched"] += 1
+                _stats["bytes"] += task.result()
+                texts[i] = parsers[i].text()
+                await cache.put(urls[i], texts[i])
+
+    answers = [(answer_from_text(query, texts[i]) if i in texts else "") or None for i in range(len(results))]
+    logging.info(
+        f"Search enrichment: {sum(a is not None for a in answers)}/{len(results)} pages answered "
+        f"in {(time.perf_counter() - t0) * 1000:.0f}ms"
+    )
+    return answers
+
+
+_stats: Counter = Counter()
+_page_cache: Optional[PageCache] = None
+
+
+def get_page_cache() -> PageCache:
+    """Get the process-wide page cache."""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = PageCache()
+    return _page_cache
+
+
+def get_enrichment_stats() -> dict:
+    """Pages fetched, cache hits, timeouts, failures and bytes read so far."""
+    return {
+        **{k: _stats[k] for k in ("fetched", "cache_hits", "timed_out", "truncated", "failed", "bytes")},
+        "cached_pages": len(get_page_cache()),
+    }
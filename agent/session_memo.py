@@ -0,0 +1,167 @@
+"""
+Otto Voice Agent - Session Tool Memo
+Remembers what each read tool last told the model in this session, keyed
+by tool name and arguments. Sessions in one worker each get their own
+memo, by session scope (session and user), dropped when the session ends. A repeat call inside the tool's freshness
+window is answered with a short reference; after it, the tool refetches
+and only what changed (or "no changes") goes back into the context.
+"""
+
+import os
+import json
+import time
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+# Seconds a result is considered current, per tool (tools not listed are never memoized)
+MEMO_TTL = {
+    "get_calendar_events": 60,
+    "get_github_activity": 120,
+    "find_free_time": 30,
+    "search_web": 300,
+}
+MEMO_ENABLED = os.getenv("OTTO_TOOL_MEMO", "1").lower() not in ("0", "false", "no", "off")
+
+# Send a delta only when it is clearly shorter than the full result
+DELTA_MAX_RATIO = 0.6
+
+
+@dataclass
+class MemoEntry:
+    """What the model was last told for one (tool, arguments) pair."""
+    digest: str
+    lines: list[str]
+    length: int
+    checked_at: float
+    expired: bool = False
+
+
+def _args_key(tool: str, args: dict) -> str:
+    return tool + ":" + json.dumps(args, sort_keys=True, default=str)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _ago(seconds: float) -> str:
+    if seconds < 10:
+        return "a moment ago"
+    if seconds < 90:
+        return f"{int(seconds)} seconds ago"
+    return f"{int(seconds // 60)} minutes ago"
+
+
+class SessionMemo:
+    """Per-session memo of read tool results."""
+
+    def __init__(self, session_id: Optional[str] = None, ttl: Optional[dict] = None):
+        self.session_id = session_id
+        self.ttl = MEMO_TTL if ttl is None else ttl
+        self._entries: dict[str, MemoEntry] = {}
+        self.reused = 0       # answered from the memo without fetching
+        self.unchanged = 0    # refetched, nothing changed
+        self.deltas = 0       # refetched, sent only the changes
+        self.chars_saved = 0
+
+    def recall(self, tool: str, **args) -> Optional[str]:
+        """
+        Short reference to the last result if it is still fresh, else None.
+
+        Call before fetching; a non-None answer means skip the fetch.
+        """
+        if not MEMO_ENABLED or tool not in self.ttl:
+            return None
+        entry = self._entries.get(_args_key(tool, args))
+        if entry is None or entry.expired:
+            return None
+        age = time.time() - entry.checked_at
+        if age > self.ttl[tool]:
+            return None
+        self.reused += 1
+        self.chars_saved += entry.length
+        return f"Same as when I checked {_ago(age)} - nothing new since then."
+
+    def update(self, tool: str, result: str, **args) -> Optional[str]:
+        """
+        Remember a freshly fetched result and say what changed.
+
+        Returns:
+            "No changes" or a delta to send instead of the result, or None
+            to send the full result (first call, or the delta isn't shorter)
+        """
+        if not MEMO_ENABLED or tool not in self.ttl:
+            return None
+        key = _args_key(tool, args)
+        previous = self._entries.get(key)
+        lines = [line for line in result.splitlines() if line.strip()]
+        now = time.time()
+        self._entries[key] = MemoEntry(_digest(result), lines, len(result), now)
+        if previous is None:
+            return None
+
+        since = f"since I checked {_ago(now - previous.checked_at)}"
+        if previous.digest == self._entries[key].digest:
+            self.unchanged += 1
+            self.chars_saved += len(result)
+            return f"No changes {since}."
+
+        before = set(previous.lines)
+        after = set(lines)
+        added = [line for line in lines if line not in before]
+        removed = [line for line in previous.lines if line not in after]
+        delta = [f"Changes {since}:"]
+        if added:
+            delta.append("New:")
+            delta.extend(f"  {line.strip()}" for line in added)
+        if removed:
+            delta.append("No longer there:")
+            delta.extend(f"  {line.strip()}" for line in removed)
+        delta_text = "\n".join(delta)
+        if len(delta_text) > len(result) * DELTA_MAX_RATIO:
+            return None
+        self.deltas += 1
+        self.chars_saved += len(result) - len(delta_text)
+        return delta_text
+
+    def expire(self, *tools: str) -> None:
+        """
+        Make the next call to these tools refetch, e.g. after a write changed
+        their data. The last result is kept so only the change is reported.
+        """
+        prefixes = tuple(f"{tool}:" for tool in tools)
+        for key, entry in self._entries.items():
+            if key.startswith(prefixes):
+                entry.expired = True
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "reused": self.reused,
+            "unchanged": self.unchanged,
+            "deltas": self.deltas,
+            "chars_saved": self.chars_saved,
+        }
+
+
+# One memo per session scope ("<session id>/<user id>")
+_memos: dict[str, SessionMemo] = {}
+
+
+def get_session_memo(scope: str) -> SessionMemo:
+    """Get a session's tool memo (created on first use)."""
+    memo = _memos.get(scope)
+    if memo is None:
+        memo = _memos[scope] = SessionMemo(scope)
+    return memo
+
+
+def drop_session_memo(scope: str) -> None:
+    """Forget a session's memo (its session ended)."""
+    _memos.pop(scope, None)
+
+
+def session_memos() -> list[SessionMemo]:
+    """Memos of every live session in this process."""
+    return list(_memos.values())
@@ -0,0 +1,251 @@
+"""
+Otto Voice Agent - Shared Cache
+A cache tier shared by every worker process on a host, so a new job
+starts warm instead of cold: ETag-validated tool responses, compressed
+chunks and connected integrations written by one process are read by all.
+
+Backends (OTTO_SHARED_CACHE):
+  sqlite (default)  WAL-mode SQLite file on tmpfs (/dev/shm) - shared
+                    memory, with cross-process locking handled by SQLite
+  redis             any Redis-compatible server (Redis, Valkey, KeyDB) at
+                    OTTO_SHARED_CACHE_URL; needs the redis package
+  off               no shared tier
+
+Values are stored as bytes behind a one-byte tag: text as raw UTF-8 (no
+escaping), anything else as compact JSON. Each value is encoded once when
+written and decoded once per process - the in-process caches in front of
+this tier keep the decoded object for repeat reads.
+
+Tools call aget()/aset(), which run the backend call in a worker thread:
+a locked SQLite file or a slow Redis server then delays only that lookup,
+never the event loop every session in the process shares.
+
+Trust boundary: whatever can write the cache can put words in any user's
+tool results, so it is only as trusted as the host user the workers run
+as. The SQLite file is created owner-only (0600) and refused if it belongs
+to another user or is a symlink (/dev/shm is world-writable); a Redis
+server must be private to the host's workers (bind, ACL or password in
+OTTO_SHARED_CACHE_URL).
+
+Failures never break a tool: errors are logged once and read as misses.
+"""
+
+import os
+import json
+import stat
+import asyncio
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Optional
+
+try:
+    import redis
+except ImportError:  # only needed for the redis backend
+    redis = None
+
+SHARED_CACHE_BACKEND = os.getenv("OTTO_SHARED_CACHE", "sqlite").lower()
+SHARED_CACHE_URL = os.getenv("OTTO_SHARED_CACHE_URL", "redis://localhost:6379/0")
+SHARED_CACHE_PATH = os.getenv(
+    "OTTO_SHARED_CACHE_PATH",
+    "/dev/shm/otto-cache.db" if os.path.isdir("/dev/shm") else os.path.join(os.path.dirname(__file__), ".otto-cache.db"),
+)
+
+# Rows kept before the oldest writes are evicted, and how often to check
+MAX_ROWS = 20000
+# How long a lookup waits for another process's write before it is a miss
+BUSY_TIMEOUT = 0.05
+PRUNE_EVERY = 500
+DEFAULT_TTL = 24 * 3600
+
+_TEXT = b"s"
+_JSON = b"j"
+
+
+def encode(value: Any) -> bytes:
+    """Tagged bytes for a value: raw UTF-8 for text, compact JSON otherwise."""
+    if isinstance(value, str):
+        return _TEXT + value.encode("utf-8")
+    return _JSON + json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def decode(blob: bytes) -> Any:
+    tag, body = blob[:1], memoryview(blob)[1:]
+    if tag == _TEXT:
+        return str(body, "utf-8")
+    return json.loads(bytes(body))
+
+
+def _full_key(namespace: str, key: str) -> str:
+    if len(key) > 200:
+        key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return f"otto:{namespace}:{key}"
+
+
+class SharedCache:
+    """Host-wide key/value tier with per-namespace hit counters."""
+
+    backend = "off"
+
+    def __init__(self):
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.errors = 0
+        self._warned = False
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Cached value, or None on a miss (or any error)."""
+        try:
+            blob = self._get(_full_key(namespace, key))
+        except Exception as e:
+            self._error(e)
+            blob = None
+        if blob is None:
+            self.misses[namespace] += 1
+            return None
+        self.hits[namespace] += 1
+        return decode(blob)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = DEFAULT_TTL) -> None:
+        """Store a value for all processes; ttl in seconds."""
+        try:
+            self._set(_full_key(namespace, key), encode(value), ttl)
+        except Exception as e:
+            self._error(e)
+
+    async def aget(self, namespace: str, key: str) -> Optional[Any]:
+        """get() without blocking the event loop."""
+        if self.backend == "off":
+            return self.get(namespace, key)
+        return await asyncio.to_thread(self.get, namespace, key)
+
+    async def aset(self, namespace: str, key: str, value: Any, ttl: Optional[float] = DEFAULT_TTL) -> None:
+        """set() without blocking the event loop."""
+        if self.backend == "off":
+            return
+        await asyncio.to_thread(self.set, namespace, key, value, ttl)
+
+    def _error(self, e: Exception) -> None:
+        self.errors += 1
+        if not self._warned:
+            self._warned = True
+            logging.warning(f"Shared cache ({self.backend}) unavailable, continuing without it: {e}")
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def _set(self, key: str, blob: bytes, ttl: Optional[float]) -> None:
+        pass
+
+    def stats(self) -> dict:
+        namespaces = set(self.hits) | set(self.misses)
+        return {
+            "backend": self.backend,
+            "errors": self.errors,
+            **{
+                ns: {
+                    "hits": self.hits[ns],
+                    "misses": self.misses[ns],
+                    "hit_rate": round(self.hits[ns] / (self.hits[ns] + self.misses[ns]), 3),
+                }
+                for ns in sorted(namespaces)
+            },
+        }
+
+
+class SQLiteSharedCache(SharedCache):
+    """SQLite in WAL mode: many readers and one writer across processes."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.path = path or SHARED_CACHE_PATH
+        self._lock = threading.Lock()
+        self._writes = 0
+        _create_private(self.path)
+        self._db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")  # a cache - losing it on power loss is fine
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)"
+        )
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def _set(self, key: str, blob: bytes, ttl: Optional[float]) -> None:
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            # REPLACE gives the row a new rowid, so rowid order is write order
+            self._db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (key, sqlite3.Binary(blob), expires))
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._prune()
+
+    def _prune(self) -> None:
+        self._db.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires < ?", (time.time(),))
+        self._db.execute(
+            "DELETE FROM cache WHERE rowid <= (SELECT MAX(rowid) FROM cache) - ?", (MAX_ROWS,)
+        )
+
+
+def _create_private(path: str) -> None:
+    """Create the cache file owner-only, or check an existing one is ours and private."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    try:
+        info = os.fstat(fd)
+        if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid():
+            raise PermissionError(f"{path} is not a file owned by this user")
+        if info.st_mode & 0o077:
+            os.fchmod(fd, 0o600)
+    finally:
+        os.close(fd)
+
+
+class RedisSharedCache(SharedCache):
+    """Any Redis-compatible server; short timeouts so a slow server reads as a miss."""
+
+    backend = "redis"
+
+    def __init__(self, url: Optional[str] = None):
+        super().__init__()
+        if redis is None:
+            raise RuntimeError("OTTO_SHARED_CACHE=redis needs the redis package (pip install redis)")
+        self._client = redis.Redis.from_url(url or SHARED_CACHE_URL, socket_timeout=0.05, socket_connect_timeout=0.1)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def _set(self, key: str, blob: bytes, ttl: Optional[float]) -> None:
+        self._client.set(key, blob, ex=int(ttl) if ttl else None)
+
+
+_shared_cache: Optional[SharedCache] = None
+_shared_cache_pid: Optional[int] = None
+
+
+def get_shared_cache() -> SharedCache:
+    """Get this process's handle on the shared tier (created on first use)."""
+    global _shared_cache, _shared_cache_pid
+    # Connections must not be shared with a forked job process
+    if _shared_cache is None or _shared_cache_pid != os.getpid():
+        _shared_cache_pid = os.getpid()
+        try:
+            if SHARED_CACHE_BACKEND == "redis":
+                _shared_cache = RedisSharedCache()
+            elif SHARED_CACHE_BACKEND == "sqlite":
+                _shared_cache = SQLiteSharedCache()
+            else:
+                _shared_cache = SharedCache()
+        except Exception as e:
+            logging.warning(f"Shared cache ({SHARED_CACHE_BACKEND}) disabled: {e}")
+            _shared_cache = SharedCache()
+    return _shared_cache
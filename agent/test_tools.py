@@ -1,6 +1,7 @@
 """
 Otto Tools Test Script
 Run this to test all 6 tools and save output to test_results.txt
+Add --record <cassette> to capture the run, --replay <cassette> to repeat it offline
 """
 
 import asyncio
@@ -232,4 +233,21 @@ async def test_all_tools():
     print(f"\n📄 Results saved to: {output_file}")
 
 if __name__ == "__main__":
-    asyncio.run(test_all_tools())
+    import argparse
+    from contextlib import nullcontext
+    from cassette import use_cassette
+
+    parser = argparse.ArgumentParser(description="Test Otto's tools")
+    parser.add_argument("--record", metavar="CASSETTE", help="Record backend, search and compression calls")
+    parser.add_argument("--replay", metavar="CASSETTE", help="Replay a recorded cassette (no network)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on replayed latencies (default: 1)")
+    args = parser.parse_args()
+
+    if args.record:
+        cassette = use_cassette(args.record, "record")
+    elif args.replay:
+        cassette = use_cassette(args.replay, "replay", args.latency_scale)
+    else:
+        cassette = nullcontext()
+    with cassette:
+        asyncio.run(test_all_tools())
@@ -0,0 +1,78 @@
+"""
+Otto Voice Agent - Tool Context
+Which tool a piece of work on the event loop belongs to. Tools fan out
+into helper tasks (streamed results, per-repo fetches, page reads), so the
+function on the stack says little; the tool that started the work does.
+
+@interactive sets current_tool for the tool's task. Tasks created under it
+inherit it (contextvars are copied into new tasks), and a task factory on
+the loop records each task's tool so that threads watching the loop - the
+stall watchdog and the sampling profiler - can ask running_tool().
+"""
+
+import asyncio
+import contextvars
+from typing import Optional
+
+# The tool this code runs on behalf of (None outside tools)
+current_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("otto_current_tool", default=None)
+
+# Tool of each live task started by (or under) a tool call
+_task_tools: dict[asyncio.Task, str] = {}
+
+
+def _register(task: asyncio.Task, tool: str) -> None:
+    _task_tools[task] = tool
+    task.add_done_callback(lambda t: _task_tools.pop(t, None))
+
+
+def _install_factory(loop: asyncio.AbstractEventLoop) -> None:
+    previous = loop.get_task_factory()
+    if getattr(previous, "_otto_tool_factory", False):
+        return
+
+    def factory(loop, coro, **kwargs):
+        if previous is not None:
+            task = previous(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        # The new task sees the creator's context (or the one passed in)
+        context = kwargs.get("context")
+        tool = context.run(current_tool.get) if context is not None else current_tool.get()
+        if tool is not None:
+            _register(task, tool)
+        return task
+
+    factory._otto_tool_factory = True
+    loop.set_task_factory(factory)
+
+
+def enter_tool(tool: str) -> tuple[contextvars.Token, Optional[str]]:
+    """Attribute the current task, and tasks it creates, to tool; pass the result to exit_tool()."""
+    task = asyncio.current_task()
+    _install_factory(task.get_loop())
+    previous = _task_tools.get(task)
+    _task_tools[task] = tool
+    return current_tool.set(tool), previous
+
+
+def exit_tool(state: tuple[contextvars.Token, Optional[str]]) -> None:
+    token, previous = state
+    current_tool.reset(token)
+    task = asyncio.current_task()
+    if previous is None:
+        _task_tools.pop(task, None)
+    else:
+        _task_tools[task] = previous
+
+
+def running_tool(loop: Optional[asyncio.AbstractEventLoop]) -> Optional[str]:
+    """
+    The tool whose work the loop is running right now, if any.
+
+    Safe to call from another thread: it only reads which task is current.
+    """
+    if loop is None:
+        return None
+    task = asyncio.current_task(loop)
+    return _task_tools.get(task) if task is not None else None
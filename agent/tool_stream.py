@@ -0,0 +1,139 @@
+"""
+Otto Voice Agent - Streamed Tool Results
+Lets a slow tool answer in two parts: a short headline built from whatever
+has arrived so far ("You have 8 recent emails, 3 from Sarah"), spoken right
+away, then the full result once it is ready.
+
+A tool hands its work to stream_result() together with a headline function.
+If the work finishes within OTTO_STREAM_HEADLINE_MS the tool returns the full
+result as usual. Otherwise it returns the headline, and the details follow
+as a new reply once Otto has finished speaking. If the user is talking by
+then, the details are held and returned by the tool's next call instead.
+
+Held details belong to one session and user (the scope the tool passes),
+since sessions share a worker; drop_pending() forgets them at shutdown.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+STREAM_ENABLED = os.getenv("OTTO_STREAM_RESULTS", "1").lower() not in ("0", "false", "no", "off")
+# How long a tool may take before it answers with a headline first
+HEADLINE_AFTER = float(os.getenv("OTTO_STREAM_HEADLINE_MS", "800")) / 1000.0
+# Give up on a follow-up the user never left room for
+FOLLOW_UP_MAX_WAIT = 30.0
+# Let the reply to the headline start before waiting for it to finish
+FOLLOW_UP_SETTLE = 0.3
+
+HEADLINE_NOTE = "(Say this now - the details are still loading and will follow in a moment.)"
+FOLLOW_UP_INSTRUCTIONS = (
+    "The details you said would follow are ready. Continue from the headline "
+    "you already gave, without repeating it or greeting again:\n{details}"
+)
+
+# Details the user talked over, per scope then (tool, arguments); handed out
+# on the next same call in the same scope
+_pending: dict[str, dict[str, str]] = {}
+# Follow-up tasks, kept referenced until they finish
+_follow_ups: set[asyncio.Task] = set()
+
+
+def _args_key(tool: str, args: dict) -> str:
+    return tool + ":" + json.dumps(args, sort_keys=True, default=str)
+
+
+def take_pending(tool: str, scope: str, **args) -> Optional[str]:
+    """Details from an earlier streamed call in this scope with these arguments that were never spoken."""
+    held = _pending.get(scope)
+    if not held:
+        return None
+    details = held.pop(_args_key(tool, args), None)
+    if not held:
+        _pending.pop(scope, None)
+    return details
+
+
+def drop_pending(scope: str) -> None:
+    """Forget every held detail of a scope (its session ended)."""
+    _pending.pop(scope, None)
+
+
+async def stream_result(
+    context,
+    tool: str,
+    work: Awaitable[str],
+    headline: Callable[[], Optional[str]],
+    scope: str,
+    **args,
+) -> str:
+    """
+    Return the full result if it is quick, else a headline now and the rest later.
+
+    Args:
+        context: The tool's RunContext (streaming needs its session)
+        tool: Tool name, for logging and held-over details
+        work: Coroutine producing the full result
+        headline: Builds a headline from the partial data gathered so far,
+            or returns None if there isn't enough yet (keeps waiting)
+        scope: Session and user the details belong to, if they are held over
+        **args: The tool's arguments, to match held-over details to a repeat call
+    """
+    task = asyncio.ensure_future(work)
+    session = getattr(context, "session", None)
+    if not STREAM_ENABLED or session is None:
+        return await task
+
+    t0 = time.perf_counter()
+    text = None
+    while not task.done():
+        await asyncio.wait({task}, timeout=HEADLINE_AFTER)
+        if task.done():
+            break
+        text = headline()
+        if text:
+            break
+    if task.done():
+        return task.result()
+
+    logging.info(f"{tool}: headline after {(time.perf_counter() - t0) * 1000:.0f}ms, details to follow")
+    follow_up = asyncio.create_task(_follow_up(session, tool, scope, _args_key(tool, args), task))
+    _follow_ups.add(follow_up)
+    follow_up.add_done_callback(_follow_ups.discard)
+    return f"{text}\n{HEADLINE_NOTE}"
+
+
+async def _follow_up(session, tool: str, scope: str, key: str, task: asyncio.Future) -> None:
+    try:
+        details = await task
+    except Exception as e:
+        # The user was promised more, so say it didn't come
+        logging.error(f"{tool}: details failed after headline: {e}")
+        details = "I couldn't load the rest of that right now."
+
+    # Don't talk over the reply to the headline, or over the user
+    await asyncio.sleep(FOLLOW_UP_SETTLE)
+    deadline = time.monotonic() + FOLLOW_UP_MAX_WAIT
+    quiet = False
+    while time.monotonic() < deadline:
+        speech = session.current_speech
+        if speech is not None and not speech.done():
+            await speech
+        elif speech is not None or session.user_state == "speaking":
+            await asyncio.sleep(FOLLOW_UP_SETTLE)
+        else:
+            quiet = True
+            break
+
+    if not quiet:
+        logging.info(f"{tool}: no pause to speak in, holding details for the next call")
+        _pending.setdefault(scope, {})[key] = details
+        return
+    try:
+        session.generate_reply(instructions=FOLLOW_UP_INSTRUCTIONS.format(details=details))
+    except Exception as e:
+        logging.error(f"{tool}: couldn't deliver details: {e}")
+        _pending.setdefault(scope, {})[key] = details
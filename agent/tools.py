@@ -4,14 +4,39 @@ These tools connect to the Next.js API to fetch user data
 """
 
 import os
+import time
+import re
+import asyncio
 import logging
 import httpx
-from datetime import datetime, timedelta
+from datetime import date, datetime, time as dt_time, timedelta
 from typing import Optional
 from livekit.agents import function_tool, RunContext
 from duckduckgo_search import DDGS
-from ttc_compression import compress_text
+from compression_controller import compress_for_tool
 from contacts import resolve_contact
+from freebusy import BusyIndex, parse_busy, find_free_slots, format_slot, get_user_timezone
+from idempotency import IDEMPOTENCY_HEADER, make_idempotency_key, get_write_ledger
+from pager import CursorPager
+from scheduler import interactive
+from http_cache import get_json
+from events import Event, compact_events
+from shared_cache import get_shared_cache
+from session_memo import drop_session_memo, get_session_memo
+from profiler import mark_tool_call
+from tool_stream import drop_pending, stream_result, take_pending
+from email_summaries import get_summaries
+from search_enrichment import ENRICH_ENABLED, enrich_results
+from calendar_view import (
+    CALENDAR_FETCH_DAYS,
+    CALENDAR_MAX_DAYS,
+    CalendarView,
+    format_calendar_view,
+    get_cached_view,
+    invalidate_calendar_view,
+    parse_day,
+    store_view,
+)
 
 # Configure logging for console output
 logging.basicConfig(
@@ -25,6 +50,7 @@ def log_tool_call(tool_name: str, **kwargs):
     """Log tool calls with formatted output"""
     args_str = ", ".join(f"{k}={v!r}" for k, v in kwargs.items() if v is not None)
     print(f"\n\033[1;35m🔧 TOOL CALL:\033[0m \033[1;32m{tool_name}\033[0m({args_str})")
+    mark_tool_call(tool_name, **kwargs)
 
 def log_tool_result(tool_name: str, result: str):
     """Log tool results with formatted output"""
@@ -38,6 +64,15 @@ API_URL = os.getenv("API_URL", "http://localhost:3000")
 # Current user ID (set by main.py when participant connects)
 _current_user_id: Optional[str] = None
 
+# Current session ID (set by main.py per job) - scopes idempotency keys
+_current_session_id: Optional[str] = None
+
+# Extra attempts for write tools when the connection couldn't be made. Only
+# then is the request known not to have reached the backend: the Next.js
+# write routes don't dedupe on the idempotency key, so retrying after a
+# read timeout could send the email or create the event twice
+WRITE_RETRIES = 1
+
 
 def set_current_user_id(user_id: str):
     """Set the current user ID for API calls"""
@@ -46,15 +81,237 @@ def set_current_user_id(user_id: str):
     print(f"\033[1;33m🔐 User context set: {user_id}\033[0m")
 
 
-def get_api_headers() -> dict:
-    """Get headers for API calls, including user authentication"""
+def set_current_session_id(session_id: str):
+    """Set the current session ID used to scope idempotency keys and the tool memo"""
+    global _current_session_id
+    _current_session_id = session_id
+
+
+def session_scope() -> str:
+    """Key for state that must not outlive the current session and user."""
+    return f"{_current_session_id or ''}/{_current_user_id or ''}"
+
+
+def close_session(scope: Optional[str] = None) -> None:
+    """Drop a session's held-over details, tool memo and inbox walk (call at shutdown)."""
+    scope = scope or session_scope()
+    drop_pending(scope)
+    drop_session_memo(scope)
+    pager = _inbox_pagers.pop(scope, None)
+    if pager is not None:
+        pager.close()
+
+
+def get_api_headers(user_id: Optional[str] = None) -> dict:
+    """Get headers for API calls, authenticated as user_id or the current user"""
     headers = {"Content-Type": "application/json"}
-    if _current_user_id:
-        headers["X-User-ID"] = _current_user_id
+    user_id = user_id or _current_user_id
+    if user_id:
+        headers["X-User-ID"] = user_id
     return headers
 
 
+# Connected integrations per user: user_id -> (fetched_at, providers)
+INTEGRATIONS_TTL = 300.0
+_integrations_cache: dict[str, tuple[float, frozenset]] = {}
+
+
+async def get_connected_integrations(user_id: Optional[str]) -> Optional[frozenset]:
+    """
+    Providers the user has connected (e.g. {"google", "github"}), cached per user.
+    Returns None if they can't be determined, so callers can fall back to all tools.
+    """
+    if not user_id:
+        return None
+    cached = _integrations_cache.get(user_id)
+    if cached and time.monotonic() - cached[0] < INTEGRATIONS_TTL:
+        return cached[1]
+    shared = await get_shared_cache().aget("integrations", user_id)
+    if shared is not None:
+        providers = frozenset(shared)
+        _integrations_cache[user_id] = (time.monotonic(), providers)
+        return providers
+    try:
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{API_URL}/api/auth/status",
+                headers=get_api_headers(user_id),
+                timeout=5.0
+            )
+        data = response.json() if response.status_code == 200 else {}
+        if response.status_code != 200 or data.get("error"):
+            logging.error(f"Integration status error: {response.status_code} {data.get('error', '')}")
+            return None
+    except Exception as e:
+        logging.error(f"Error fetching integration status: {e}")
+        return None
+
+    providers = frozenset(data.get("connected", []))
+    _integrations_cache[user_id] = (time.monotonic(), providers)
+    await get_shared_cache().aset("integrations", user_id, sorted(providers), ttl=INTEGRATIONS_TTL)
+    return providers
+
+
+async def post_write(client: httpx.AsyncClient, path: str, payload: dict, idempotency_key: str) -> httpx.Response:
+    """POST a write with its idempotency key, retrying if the connection failed"""
+    headers = get_api_headers()
+    headers[IDEMPOTENCY_HEADER] = idempotency_key
+    for attempt in range(WRITE_RETRIES + 1):
+        try:
+            return await client.post(
+                f"{API_URL}{path}",
+                json=payload,
+                headers=headers,
+                timeout=10.0
+            )
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            if attempt == WRITE_RETRIES:
+                raise
+            logging.warning(f"Retrying {path} after {type(e).__name__} (key {idempotency_key[:8]})")
+
+
+# Multi-repo GitHub fetches: cap on repos per call and parallel requests
+GITHUB_MAX_REPOS = 10
+GITHUB_MAX_CONCURRENCY = 4
+
+# Relative weight of event types when ranking activity
+GITHUB_EVENT_WEIGHTS = {"pull_request": 3.0, "issue": 2.0, "commit": 1.0}
+
+
+def rank_github_events(events: list[Event]) -> list[Event]:
+    """Order events by importance, decayed by age (a day-old PR ties a fresh commit)"""
+    now = datetime.now().astimezone()
+
+    def score(event: Event) -> float:
+        weight = GITHUB_EVENT_WEIGHTS.get(event.event_type, 1.0)
+        try:
+            when = datetime.fromisoformat(event.time.replace("Z", "+00:00"))
+            if when.tzinfo is None:
+                when = when.astimezone()
+            hours = max(0.0, (now - when).total_seconds() / 3600)
+        except ValueError:
+            hours = 24.0
+        return weight / (1 + hours / 12)
+
+    return sorted(events, key=score, reverse=True)
+
+
+async def fetch_github_repos(client: httpx.AsyncClient, user_id: Optional[str] = None) -> list[str]:
+    """Full names of the user's most recently updated repos; raises on HTTP errors"""
+    response, data = await get_json(
+        client,
+        f"{API_URL}/api/github",
+        params={"action": "repos"},
+        headers=get_api_headers(user_id),
+        timeout=10.0
+    )
+    if data is None:
+        response.raise_for_status()
+    return [r["fullName"] for r in data.get("repos", []) if r.get("fullName")]
+
+
+async def fetch_github_events(
+    client: httpx.AsyncClient,
+    repo: Optional[str],
+    days_back: int,
+    semaphore: asyncio.Semaphore,
+    user_id: Optional[str] = None
+) -> list[Event]:
+    """Fetch events for one repo (or the default repos); raises on HTTP errors"""
+    params = {"action": "events"}  # Use events endpoint
+    if repo:
+        params["repo"] = repo
+    if days_back:
+        params["days"] = days_back
+    async with semaphore:
+        response, data = await get_json(
+            client,
+            f"{API_URL}/api/github",
+            params=params,
+            headers=get_api_headers(user_id),
+            timeout=10.0,
+            transform=compact_events("commit")
+        )
+    if data is None:
+        response.raise_for_status()
+    return data["events"]
+
+
+def format_github_activity(events: list[Event], failed: Optional[list[str]] = None) -> str:
+    """Format GitHub events for voice: per-repo counts and the most notable events"""
+    # The same repo can be named twice (e.g. "otto" and "me/otto")
+    seen = set()
+    unique = []
+    for e in events:
+        key = (e.repo, e.event_type, e.title, e.time)
+        if key not in seen:
+            seen.add(key)
+            unique.append(e)
+    events = rank_github_events(unique)
+
+    if not events:
+        return "No GitHub activity found for the specified period."
+
+    # Format for voice
+    summaries = []
+    repo_counts: dict[str, dict[str, int]] = {}
+    for e in events:
+        counts = repo_counts.setdefault(e.repo or "unknown", {})
+        counts[e.event_type] = counts.get(e.event_type, 0) + 1
+    multi_repo = len(repo_counts) > 1
+
+    if multi_repo:
+        parts = []
+        for repo, counts in repo_counts.items():
+            short = repo.split("/")[-1]
+            kinds = [f"{n} {kind.replace('_', ' ')}{'s' if n != 1 else ''}" for kind, n in counts.items()]
+            parts.append(f"{short} ({', '.join(kinds)})")
+        summaries.append(f"Activity across {len(repo_counts)} repos: " + "; ".join(parts))
+        summaries.append("Most notable:")
+        for e in events[:8]:
+            short = (e.repo or "").split("/")[-1]
+            actor = e.actor or "Someone"
+            title = e.title or "made changes"
+            kind = " opened PR" if e.event_type == "pull_request" else ""
+            summaries.append(f"  - [{short}] {actor}{kind}: {title}")
+    else:
+        commits = [e for e in events if e.event_type == "commit"]
+        prs = [e for e in events if e.event_type == "pull_request"]
+
+        if commits:
+            summaries.append(f"{len(commits)} commits")
+            for c in commits[:5]:
+                actor = c.actor or "Someone"
+                title = c.title or "made changes"
+                summaries.append(f"  - {actor}: {title}")
+
+        if prs:
+            summaries.append(f"{len(prs)} open pull requests")
+            for pr in prs[:3]:
+                actor = pr.actor or "Someone"
+                title = pr.title or "opened a PR"
+                summaries.append(f"  - {actor}: {title}")
+
+    if failed:
+        summaries.append(f"I couldn't reach {', '.join(failed)}.")
+
+    return "\n".join(summaries)
+
+
+def github_headline(events: list[Event], repos_done: int, repos_total: int) -> Optional[str]:
+    """Counts from the repos fetched so far, said while the rest load"""
+    if not events:
+        return None
+    counts: dict[str, int] = {}
+    for e in events:
+        counts[e.event_type] = counts.get(e.event_type, 0) + 1
+    kinds = [f"{n} {kind.replace('_', ' ')}{'s' if n != 1 else ''}" for kind, n in counts.items()]
+    scope = f" in {repos_done} of {repos_total} repos" if repos_total > 1 else ""
+    return f"So far, {join_names(kinds)}{scope}."
+
+
 @function_tool()
+@interactive
 async def get_github_activity(
     context: RunContext,
     repo_name: Optional[str] = None,
@@ -62,167 +319,405 @@ async def get_github_activity(
 ) -> str:
     """
     Get recent GitHub activity including commits, pull requests, and issues.
+    Can cover several repositories in one call.
     
     Args:
-        repo_name: Optional repository name (e.g., "otto"). If not provided, uses default repo.
+        repo_name: Optional repository name (e.g., "otto"), several comma-separated
+            names (e.g., "otto, website"), or "all" for all of the user's repos.
+            If not provided, uses the user's recent repos.
         days_back: Number of days to look back (default: 1 for yesterday)
     """
     log_tool_call("get_github_activity", repo_name=repo_name, days_back=days_back)
-    try:
+    # Details the user talked over were never heard, so they aren't "the same as before"
+    scope = session_scope()
+    pending = take_pending("get_github_activity", scope, repo_name=repo_name, days_back=days_back)
+    if pending:
+        log_tool_result("get_github_activity", pending)
+        return pending
+    memo = get_session_memo(session_scope())
+    recalled = memo.recall("get_github_activity", repo_name=repo_name, days_back=days_back)
+    if recalled:
+        log_tool_result("get_github_activity", recalled)
+        return recalled
+
+    # Filled in as repos answer, for the headline
+    progress = {"events": [], "done": 0, "total": 1}
+
+    async def fetch_repo(client, repo, semaphore):
+        events = await fetch_github_events(client, repo, days_back, semaphore)
+        progress["events"].extend(events)
+        progress["done"] += 1
+        return events
+
+    async def gather_activity() -> str:
         async with httpx.AsyncClient() as client:
-            params = {"action": "events"}  # Use events endpoint
-            if repo_name:
-                params["repo"] = repo_name
-            if days_back:
-                params["days"] = days_back
-                
-            response = await client.get(
-                f"{API_URL}/api/github",
-                params=params,
-                headers=get_api_headers(),
-                timeout=10.0
+            if repo_name and repo_name.strip().lower() in ("all", "all repos", "all my repos", "*"):
+                repos = (await fetch_github_repos(client))[:GITHUB_MAX_REPOS]
+            elif repo_name:
+                repos = [r.strip() for r in repo_name.split(",") if r.strip()][:GITHUB_MAX_REPOS]
+            else:
+                repos = [None]
+            progress["total"] = len(repos)
+
+            semaphore = asyncio.Semaphore(GITHUB_MAX_CONCURRENCY)
+            results = await asyncio.gather(
+                *(fetch_repo(client, repo, semaphore) for repo in repos),
+                return_exceptions=True
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                events = data.get("events", [])
-                
-                if not events:
-                    return "No GitHub activity found for the specified period."
-                
-                # Format for voice
-                summaries = []
-                commits = [e for e in events if e.get("event_type") == "commit"]
-                prs = [e for e in events if e.get("event_type") == "pull_request"]
-                
-                if commits:
-                    summaries.append(f"{len(commits)} commits")
-                    for c in commits[:5]:
-                        actor = c.get("actor", "Someone")
-                        title = c.get("title", "made changes")
-                        summaries.append(f"  - {actor}: {title}")
-                        
-                if prs:
-                    summaries.append(f"{len(prs)} open pull requests")
-                    for pr in prs[:3]:
-                        actor = pr.get("actor", "Someone")
-                        title = pr.get("title", "opened a PR")
-                        summaries.append(f"  - {actor}: {title}")
-                
-                result = "\n".join(summaries)
-                # Compress if large
-                final_result = await compress_text(result) if len(result) > 500 else result
-                log_tool_result("get_github_activity", final_result)
-                return final_result
+
+        events, failed = [], []
+        for repo, outcome in zip(repos, results):
+            if isinstance(outcome, BaseException):
+                if isinstance(outcome, httpx.HTTPStatusError) and outcome.response.status_code == 401:
+                    return "GitHub is not connected. Please connect it in your dashboard."
+                logging.error(f"GitHub API error for {repo or 'default repos'}: {outcome}")
+                failed.append(repo or "your repos")
             else:
-                logging.error(f"GitHub API error: {response.status_code}")
-                result = "I couldn't fetch GitHub activity right now."
-                log_tool_result("get_github_activity", result)
-                return result
-                
+                events.extend(outcome)
+
+        if failed and not events:
+            result = "I couldn't fetch GitHub activity right now."
+            log_tool_result("get_github_activity", result)
+            return result
+
+        result = format_github_activity(events, failed)
+        # Only say what changed if this was already fetched this session
+        final_result = memo.update("get_github_activity", result, repo_name=repo_name, days_back=days_back)
+        if final_result is None:
+            # Compress if it pays off for this tool
+            final_result = await compress_for_tool("get_github_activity", result)
+        log_tool_result("get_github_activity", final_result)
+        return final_result
+
+    try:
+        # Slow multi-repo fetches say the counts so far first
+        return await stream_result(
+            context,
+            "get_github_activity",
+            gather_activity(),
+            lambda: github_headline(progress["events"], progress["done"], progress["total"]),
+            scope,
+            repo_name=repo_name,
+            days_back=days_back,
+        )
+
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 401:
+            return "GitHub is not connected. Please connect it in your dashboard."
+        logging.error(f"GitHub API error: {e.response.status_code}")
+        return "I couldn't fetch GitHub activity right now."
     except Exception as e:
         logging.error(f"Error fetching GitHub activity: {e}")
         return "There was an error connecting to GitHub."
 
 
+async def fetch_email_page(
+    limit: int,
+    cursor: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> tuple[list[Event], Optional[str]]:
+    """Fetch one page of inbox events from /api/gmail; raises on HTTP errors"""
+    params = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    async with httpx.AsyncClient() as client:
+        response, data = await get_json(
+            client,
+            f"{API_URL}/api/gmail",
+            params=params,
+            headers=get_api_headers(user_id),
+            timeout=10.0,
+            transform=compact_events("email")
+        )
+    if data is None:
+        response.raise_for_status()
+    return data["events"], data.get("nextCursor")
+
+
+def format_email_page(emails: list[Event], first_number: int = 1, has_more: bool = False) -> str:
+    """Format one page of inbox events for voice, numbered from first_number"""
+    if first_number == 1:
+        summaries = [f"You have {len(emails)} recent emails:" if not has_more
+                     else f"Here are your {len(emails)} most recent emails:"]
+    else:
+        summaries = [f"Here are the next {len(emails)} emails:" if len(emails) > 1
+                     else "Here's the next email:"]
+    for i, email in enumerate(emails, first_number):
+        sender = email.actor or "Unknown sender"
+        subject = email.title or "No subject"
+        # Clean up sender name
+        if "<" in sender:
+            sender = sender.split("<")[0].strip()
+        summaries.append(f"  {i}. From {sender}: {subject}")
+    if has_more:
+        summaries.append("There are more emails - ask me to keep going.")
+    return "\n".join(summaries)
+
+
+def email_headline(emails: list[Event]) -> str:
+    """Count and busiest sender of a page of inbox events, said before the details"""
+    senders: dict[str, int] = {}
+    for email in emails:
+        sender = (email.actor or "Unknown sender").split("<")[0].strip()
+        senders[sender] = senders.get(sender, 0) + 1
+    top, count = max(senders.items(), key=lambda item: item[1])
+    headline = f"You have {len(emails)} recent email{'s' if len(emails) != 1 else ''}"
+    if count > 1:
+        headline += f", {count} from {top}"
+    return headline + "."
+
+
+# Inbox walks in progress (with read-ahead of the next page), per session scope
+_inbox_pagers: dict[str, CursorPager] = {}
+
+
 @function_tool()
+@interactive
 async def get_unread_emails(
     context: RunContext,
-    max_count: int = 5
+    max_count: int = 5,
+    continue_reading: bool = False
 ) -> str:
     """
-    Get recent unread or important emails from Gmail.
+    Get recent unread or important emails from Gmail, one page at a time.
     
     Args:
-        max_count: Maximum number of emails to return (default: 5)
+        max_count: Number of emails per page (default: 5)
+        continue_reading: True to read the next page after the last one read,
+            e.g. when the user says "keep going" or "what else"
     """
-    log_tool_call("get_unread_emails", max_count=max_count)
+    log_tool_call("get_unread_emails", max_count=max_count, continue_reading=continue_reading)
+    scope = session_scope()
+    # A page whose details the user talked over comes before the next one
+    pending = take_pending("get_unread_emails", scope)
+    if pending:
+        log_tool_result("get_unread_emails", pending)
+        return pending
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_URL}/api/gmail",
-                params={"limit": max_count},
-                headers=get_api_headers(),
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                emails = data.get("events", [])
-                
-                if not emails:
+        pager = _inbox_pagers.get(scope)
+        if not continue_reading or pager is None:
+            if pager is not None:
+                pager.close()
+            page_size = max(1, min(max_count, 20))
+            # Bound to this user, so read-ahead never fetches someone else's inbox
+            user_id = _current_user_id
+            pager = _inbox_pagers[scope] = CursorPager(lambda cursor: fetch_email_page(page_size, cursor, user_id))
+        elif not pager.has_more:
+            return "That's everything - there are no more emails in your inbox."
+
+        first_number = pager.items_read + 1
+        # The page as soon as it arrives, for the headline
+        page: list[Event] = []
+
+        async def read_page() -> str:
+            emails = await pager.next_page()
+            page.extend(emails)
+
+            if not emails:
+                if first_number == 1:
                     return "No unread emails found. Your inbox is clear!"
-                
-                # Format for voice
-                summaries = [f"You have {len(emails)} recent emails:"]
-                for i, email in enumerate(emails[:max_count], 1):
-                    sender = email.get("actor", "Unknown sender")
-                    subject = email.get("title", "No subject")
-                    # Clean up sender name
-                    if "<" in sender:
-                        sender = sender.split("<")[0].strip()
-                    summaries.append(f"  {i}. From {sender}: {subject}")
-                
-                return "\n".join(summaries)
-            elif response.status_code == 401:
-                return "Gmail is not connected. Please connect it in your dashboard."
-            else:
-                logging.error(f"Gmail API error: {response.status_code}")
-                return "I couldn't fetch emails right now."
-                
+                return "That's everything - there are no more emails in your inbox."
+
+            result = format_email_page(emails, first_number, pager.has_more)
+            # Compress if it pays off for this tool
+            final_result = await compress_for_tool("get_unread_emails", result)
+            log_tool_result("get_unread_emails", final_result)
+            return final_result
+
+        # Counts first if compressing the page is slow
+        return await stream_result(
+            context,
+            "get_unread_emails",
+            read_page(),
+            lambda: email_headline(page) if page and first_number == 1 else None,
+            scope,
+        )
+
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 401:
+            return "Gmail is not connected. Please connect it in your dashboard."
+        logging.error(f"Gmail API error: {e.response.status_code}")
+        return "I couldn't fetch emails right now."
     except Exception as e:
         logging.error(f"Error fetching emails: {e}")
         return "There was an error connecting to Gmail."
 
 
+# Inbox messages searched when asked about a sender or subject
+EMAIL_SEARCH_DEPTH = 20
+
+
 @function_tool()
+@interactive
+async def get_email_summary(
+    context: RunContext,
+    sender: Optional[str] = None,
+    subject: Optional[str] = None,
+    max_count: int = 3
+) -> str:
+    """
+    Summarize what recent emails actually say, e.g. "what did Sarah say?"
+    or "what's in the email about the API docs?".
+
+    Args:
+        sender: Name (or part of it) of the person who sent the email
+        subject: Words from the subject line
+        max_count: Most emails to summarize (default: 3)
+    """
+    log_tool_call("get_email_summary", sender=sender, subject=subject, max_count=max_count)
+    try:
+        emails, _ = await fetch_email_page(EMAIL_SEARCH_DEPTH)
+        matches = [
+            e for e in emails
+            if e.id
+            and (not sender or sender.lower() in e.actor.lower())
+            and (not subject or subject.lower() in e.title.lower())
+        ][:max(1, min(max_count, 10))]
+        if not matches:
+            about = " and ".join(filter(None, [sender and f"from {sender}", subject and f"about {subject}"]))
+            return f"I couldn't find a recent email {about or 'to summarize'}."
+
+        summaries = await get_summaries(
+            _current_user_id or "",
+            API_URL,
+            get_api_headers(),
+            [e.id for e in matches],
+        )
+        lines = []
+        for summary in summaries:
+            name = summary.sender.split("<")[0].strip()
+            lines.append(f"{name} - {summary.subject}: {summary.summary}")
+        result = "\n".join(lines) if lines else "I couldn't load those emails right now."
+        log_tool_result("get_email_summary", result)
+        return result
+
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 401:
+            return "Gmail is not connected. Please connect it in your dashboard."
+        logging.error(f"Gmail API error: {e.response.status_code}")
+        return "I couldn't fetch that email right now."
+    except Exception as e:
+        logging.error(f"Error summarizing emails: {e}")
+        return "There was an error connecting to Gmail."
+
+
+async def fetch_calendar_events(
+    client: httpx.AsyncClient,
+    days_ahead: int,
+    user_id: Optional[str] = None
+) -> list[dict]:
+    """Fetch upcoming events from /api/calendar; raises on HTTP errors"""
+    response, data = await get_json(
+        client,
+        f"{API_URL}/api/calendar",
+        params={"days": days_ahead},
+        headers=get_api_headers(user_id),
+        timeout=10.0
+    )
+    if data is None:
+        response.raise_for_status()
+    return data.get("events", [])
+
+
+def format_calendar_events(events: list[dict], days: int = 1) -> str:
+    """Format /api/calendar events for voice: the next `days` days from today"""
+    tz = get_user_timezone()
+    today = datetime.now(tz).date()
+    last_day = today + timedelta(days=days - 1)
+    view = CalendarView(_current_user_id or "", today, last_day, tz, events)
+    return format_calendar_view(view.occurrences(today, last_day), today)
+
+
+async def fetch_calendar_view(
+    client: httpx.AsyncClient,
+    first_day: date,
+    last_day: date,
+    user_id: Optional[str] = None
+) -> CalendarView:
+    """
+    The user's calendar indexed by day, covering first_day through last_day.
+
+    Served from the last fetched range when it covers these days; otherwise
+    fetches at least CALENDAR_FETCH_DAYS from today so follow-ups hit the cache.
+    """
+    user_id = user_id or _current_user_id or ""
+    view = get_cached_view(user_id, first_day, last_day)
+    if view is not None:
+        return view
+    tz = get_user_timezone()
+    today = datetime.now(tz).date()
+    # The view only claims the days the API actually returns (it caps the range)
+    days = min(max(CALENDAR_FETCH_DAYS, (last_day - today).days + 1), CALENDAR_MAX_DAYS)
+    events = await fetch_calendar_events(client, days, user_id)
+    view = CalendarView(user_id, today, today + timedelta(days=days - 1), tz, events)
+    store_view(view)
+    return view
+
+
+async def warm_calendar_view(user_id: str) -> None:
+    """Fetch the user's calendar range before they ask (run as a background job)."""
+    today = datetime.now(get_user_timezone()).date()
+    async with httpx.AsyncClient() as client:
+        await fetch_calendar_view(client, today, today, user_id)
+
+
+@function_tool()
+@interactive
 async def get_calendar_events(
     context: RunContext,
-    days_ahead: int = 1
+    days_ahead: int = 1,
+    start_date: Optional[str] = None
 ) -> str:
     """
-    Get upcoming calendar events/meetings.
+    Get calendar events/meetings for one day or several, grouped by day.
     
     Args:
-        days_ahead: Number of days ahead to look (default: 1 for today)
+        days_ahead: Number of days to cover (default: 1 for a single day)
+        start_date: First day: "today" (default), "tomorrow", a weekday name
+            like "thursday", or "YYYY-MM-DD"
     """
-    log_tool_call("get_calendar_events", days_ahead=days_ahead)
+    log_tool_call("get_calendar_events", days_ahead=days_ahead, start_date=start_date)
+    today = datetime.now(get_user_timezone()).date()
+    first_day = max(parse_day(start_date, today), today)
+    last_day = first_day + timedelta(days=max(1, min(days_ahead, CALENDAR_MAX_DAYS)) - 1)
+    # The calendar API serves at most CALENDAR_MAX_DAYS from today
+    horizon = today + timedelta(days=CALENDAR_MAX_DAYS - 1)
+    if first_day > horizon:
+        return f"I can only see your calendar {CALENDAR_MAX_DAYS} days ahead, through {horizon:%A %B} {horizon.day}."
+    cut_off = None
+    if last_day > horizon:
+        last_day = cut_off = horizon
+    memo = get_session_memo(session_scope())
+    recalled = memo.recall("get_calendar_events", first_day=first_day, last_day=last_day)
+    if recalled:
+        log_tool_result("get_calendar_events", recalled)
+        return recalled
     try:
         async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_URL}/api/calendar",
-                params={"days": days_ahead},
-                headers=get_api_headers(),
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                events = data.get("events", [])
-                
-                if not events:
-                    return "No meetings scheduled for today. Your calendar is clear!"
-                
-                # Format for voice
-                summaries = [f"You have {len(events)} meetings today:"]
-                for event in events:
-                    title = event.get("title", "Untitled meeting")
-                    time = event.get("time", "")
-                    summaries.append(f"  - {title} at {time}")
-                
-                return "\n".join(summaries)
-            elif response.status_code == 401:
-                return "Google Calendar is not connected. Please connect it in your dashboard."
-            else:
-                logging.error(f"Calendar API error: {response.status_code}")
-                return "I couldn't fetch your calendar right now."
-                
+            view = await fetch_calendar_view(client, first_day, last_day)
+
+        result = format_calendar_view(view.occurrences(first_day, last_day), today)
+        if cut_off:
+            result += f"\n(I can only see through {cut_off:%A %B} {cut_off.day}, {CALENDAR_MAX_DAYS} days ahead.)"
+        # Only say what changed if this was already fetched this session
+        changes = memo.update("get_calendar_events", result, first_day=first_day, last_day=last_day)
+        if changes is not None:
+            return changes
+        # Compress if it pays off for this tool
+        return await compress_for_tool("get_calendar_events", result)
+
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 401:
+            return "Google Calendar is not connected. Please connect it in your dashboard."
+        logging.error(f"Calendar API error: {e.response.status_code}")
+        return "I couldn't fetch your calendar right now."
     except Exception as e:
         logging.error(f"Error fetching calendar: {e}")
         return "There was an error connecting to Google Calendar."
 
 
 @function_tool()
+@interactive
 async def create_calendar_event(
     context: RunContext,
     title: str,
@@ -321,132 +816,336 @@ async def create_calendar_event(
                 except ValueError:
                     continue
         
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "title": title,
-                "date": event_date,
-                "time": event_time,
-                "duration": duration_minutes,
-            }
-            if attendees:
-                payload["attendees"] = [a.strip() for a in attendees.split(",")]
-            
-            response = await client.post(
-                f"{API_URL}/api/calendar",
-                json=payload,
-                headers=get_api_headers(),
-                timeout=10.0
-            )
-            
+        payload = {
+            "title": title,
+            "date": event_date,
+            "time": event_time,
+            "duration": duration_minutes,
+        }
+        if attendees:
+            payload["attendees"] = [a.strip() for a in attendees.split(",")]
+
+        key = make_idempotency_key(_current_session_id, "create_calendar_event", **payload)
+
+        async def write() -> tuple[bool, str]:
+            async with httpx.AsyncClient() as client:
+                response = await post_write(client, "/api/calendar", payload, key)
+
             if response.status_code in [200, 201]:
-                result = f"Done! I've scheduled '{title}' for {event_date} at {event_time}."
-                log_tool_result("create_calendar_event", result)
-                return result
+                return True, f"Done! I've scheduled '{title}' for {event_date} at {event_time}."
             elif response.status_code == 401:
-                return "Google Calendar is not connected. Please connect it in your dashboard."
+                return False, "Google Calendar is not connected. Please connect it in your dashboard."
             else:
                 logging.error(f"Calendar create error: {response.status_code}")
-                return "I couldn't create the event right now."
-                
+                return False, "I couldn't create the event right now."
+
+        ledger = get_write_ledger()
+        duplicate, result = await ledger.run(key, write)
+        if ledger.lookup(key) is not None:
+            # The calendar changed - don't answer the next check from the memo
+            get_session_memo(session_scope()).expire("get_calendar_events", "find_free_time")
+            invalidate_calendar_view(_current_user_id or "")
+        if duplicate and ledger.lookup(key) is not None:
+            result = f"'{title}' on {event_date} at {event_time} is already scheduled, so I didn't create it again."
+        log_tool_result("create_calendar_event", result)
+        return result
+
     except Exception as e:
         logging.error(f"Error creating calendar event: {e}")
         return "There was an error creating the calendar event."
 
 
 @function_tool()
+@interactive
+async def find_free_time(
+    context: RunContext,
+    duration_minutes: int = 30,
+    days_ahead: int = 5,
+    attendees: Optional[str] = None,
+    work_start_hour: int = 9,
+    work_end_hour: int = 17
+) -> str:
+    """
+    Find free time slots for a meeting, checking the user's calendar and
+    optionally the attendees' calendars. Use this before create_calendar_event
+    when the user hasn't picked a time.
+    
+    Args:
+        duration_minutes: Length of the meeting in minutes (default: 30)
+        days_ahead: Number of days ahead to search (default: 5)
+        attendees: Comma-separated attendee emails or known contact names (optional)
+        work_start_hour: Start of working hours, 24-hour (default: 9)
+        work_end_hour: End of working hours, 24-hour (default: 17)
+    """
+    log_tool_call("find_free_time", duration_minutes=duration_minutes, days_ahead=days_ahead, attendees=attendees)
+
+    # Resolve contact names so their calendars can be checked too
+    emails = []
+    for attendee in (attendees.split(",") if attendees else []):
+        attendee = attendee.strip()
+        if not attendee:
+            continue
+        email = attendee if "@" in attendee else resolve_contact(attendee)
+        if not email:
+            return f"I don't have a saved email for '{attendee}'. Could you give me their email address?"
+        emails.append(email)
+
+    memo_args = dict(
+        duration_minutes=duration_minutes, days_ahead=days_ahead, attendees=emails,
+        work_start_hour=work_start_hour, work_end_hour=work_end_hour
+    )
+    memo = get_session_memo(session_scope())
+    recalled = memo.recall("find_free_time", **memo_args)
+    if recalled:
+        log_tool_result("find_free_time", recalled)
+        return recalled
+
+    try:
+        async with httpx.AsyncClient() as client:
+            params = {"days": days_ahead}
+            if emails:
+                params["attendees"] = ",".join(emails)
+
+            response = await client.get(
+                f"{API_URL}/api/calendar/freebusy",
+                params=params,
+                headers=get_api_headers(),
+                timeout=10.0
+            )
+
+        if response.status_code == 401:
+            return "Google Calendar is not connected. Please connect it in your dashboard."
+        if response.status_code != 200:
+            logging.error(f"FreeBusy API error: {response.status_code}")
+            return "I couldn't check your availability right now."
+
+        data = response.json()
+        index = BusyIndex(parse_busy(data.get("busy", {})))
+        now = datetime.now().astimezone()
+        slots = find_free_slots(
+            index,
+            now,
+            now + timedelta(days=days_ahead),
+            duration_minutes,
+            tz=get_user_timezone(),
+            work_start=dt_time(min(max(work_start_hour, 0), 23)),
+            work_end=dt_time(23, 59) if work_end_hour >= 24 else dt_time(min(max(work_end_hour, 1), 23)),
+        )
+
+        if not slots:
+            result = f"I couldn't find a free {duration_minutes} minute slot in the next {days_ahead} days."
+        else:
+            who = " and ".join(["you"] + emails) if emails else "your calendar"
+            summaries = [f"Best times for a {duration_minutes} minute meeting (checked {who}):"]
+            for i, (start, _) in enumerate(slots, 1):
+                summaries.append(f"  {i}. {format_slot(start)}")
+            result = "\n".join(summaries)
+
+        unavailable = data.get("unavailable", [])
+        if unavailable:
+            result += f"\nI couldn't see the calendar for {', '.join(unavailable)}, so check with them."
+
+        result = memo.update("find_free_time", result, **memo_args) or result
+        log_tool_result("find_free_time", result)
+        return result
+
+    except Exception as e:
+        logging.error(f"Error finding free time: {e}")
+        return "There was an error checking your availability."
+
+
+# Separate copies are sent at most this many at a time
+EMAIL_SEND_CONCURRENCY = 4
+
+
+def join_names(names: list[str]) -> str:
+    """"a", "a and b", "a, b and c" """
+    if len(names) <= 1:
+        return "".join(names)
+    return ", ".join(names[:-1]) + " and " + names[-1]
+
+
+def resolve_recipients(to: str) -> tuple[list[str], list[str]]:
+    """
+    Split a recipient list and resolve contact names in one pass.
+
+    Args:
+        to: Addresses and/or contact names separated by commas, semicolons or "and"
+
+    Returns:
+        (email addresses without duplicates, names that couldn't be resolved)
+    """
+    emails, unknown = [], []
+    for part in re.split(r"[,;]|\s+and\s+|\s+&\s+", to or ""):
+        part = part.strip()
+        if not part:
+            continue
+        email = part if "@" in part else resolve_contact(part)
+        if not email:
+            unknown.append(part)
+        elif email.lower() not in (e.lower() for e in emails):
+            if email != part:
+                print(f"\033[1;33m📇 Contact resolved: '{part}' → {email}\033[0m")
+            emails.append(email)
+    return emails, unknown
+
+
+@function_tool()
+@interactive
 async def send_email(
     context: RunContext,
     to: str,
     subject: str,
-    body: str
+    body: str,
+    separately: bool = False
 ) -> str:
     """
-    Send an email via Gmail.
-    If the recipient is a known contact name (e.g. "Abdullah"), it will be
-    automatically resolved to their saved email address.
+    Send an email via Gmail to one or more people.
+    Recipients can be email addresses or known contact names (e.g. "Abdullah"),
+    which are automatically resolved to their saved email addresses.
     
     Args:
-        to: Recipient email address or known contact name
+        to: Recipient email address or known contact name, or several separated
+            by commas or "and" (e.g. "Sarah, Alex and jordan@example.com")
         subject: Email subject line
         body: Email body content
+        separately: True to send each recipient their own copy instead of one
+            email addressed to everyone (default: False)
     """
     # Safety-net: resolve contact names that aren't email addresses
-    resolved_to = to
-    if "@" not in to:
-        resolved_email = resolve_contact(to)
-        if resolved_email:
-            print(f"\033[1;33m📇 Contact resolved: '{to}' → {resolved_email}\033[0m")
-            resolved_to = resolved_email
-        else:
-            return f"I don't have a saved email for '{to}'. Could you give me their email address?"
+    recipients, unknown = resolve_recipients(to)
+    if unknown:
+        return f"I don't have a saved email for {join_names([repr(n) for n in unknown])}. Could you give me their email address?"
+    if not recipients:
+        return "Who should I send the email to?"
+
+    log_tool_call("send_email", to=recipients, subject=subject, body=body[:50]+"..." if len(body) > 50 else body, separately=separately)
+
+    # One email to everyone, or one per recipient
+    groups = [[r] for r in recipients] if separately else [recipients]
+    semaphore = asyncio.Semaphore(EMAIL_SEND_CONCURRENCY)
+    ledger = get_write_ledger()
+
+    async def send(group: list[str]) -> tuple[str, str]:
+        """("sent" | "duplicate" | "failed", message) for one email"""
+        payload = {
+            "to": group[0] if len(group) == 1 else group,
+            "subject": subject,
+            "body": body
+        }
+        key = make_idempotency_key(
+            _current_session_id, "send_email", to=sorted(e.lower() for e in group), subject=subject, body=body
+        )
+
+        async def write() -> tuple[bool, str]:
+            async with semaphore, httpx.AsyncClient() as client:
+                response = await post_write(client, "/api/gmail/send", payload, key)
 
-    log_tool_call("send_email", to=resolved_to, subject=subject, body=body[:50]+"..." if len(body) > 50 else body)
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{API_URL}/api/gmail/send",
-                json={
-                    "to": resolved_to,
-                    "subject": subject,
-                    "body": body
-                },
-                headers=get_api_headers(),
-                timeout=10.0
-            )
-            
             if response.status_code in [200, 201]:
-                result = f"Done! Email sent to {resolved_to}."
-                log_tool_result("send_email", result)
-                return result
+                return True, "sent"
             elif response.status_code == 401:
-                return "Gmail is not connected. Please connect it in your dashboard."
+                return False, "Gmail is not connected. Please connect it in your dashboard."
             else:
-                logging.error(f"Gmail send error: {response.status_code}")
-                return "I couldn't send the email right now."
-                
-    except Exception as e:
-        logging.error(f"Error sending email: {e}")
-        return "There was an error sending the email."
+                logging.error(f"Gmail send error for {join_names(group)}: {response.status_code}")
+                return False, "I couldn't send the email right now."
+
+        try:
+            duplicate, result = await ledger.run(key, write)
+        except Exception as e:
+            logging.error(f"Error sending email to {join_names(group)}: {e}")
+            return "failed", "There was an error sending the email."
+        if ledger.lookup(key) is None:
+            return "failed", result
+        return ("duplicate" if duplicate else "sent"), result
+
+    outcomes = await asyncio.gather(*(send(group) for group in groups))
+
+    sent = [r for group, (status, _) in zip(groups, outcomes) if status == "sent" for r in group]
+    duplicate = [r for group, (status, _) in zip(groups, outcomes) if status == "duplicate" for r in group]
+    failed = [(group, message) for group, (status, message) in zip(groups, outcomes) if status == "failed"]
+
+    if failed and not sent and not duplicate:
+        # Nothing went out - one reason covers it
+        result = failed[0][1]
+    else:
+        parts = []
+        if sent:
+            parts.append(f"Done! Email sent to {join_names(sent)}.")
+        if duplicate:
+            parts.append(f"That email was already sent to {join_names(duplicate)}, so I didn't send it again.")
+        if failed:
+            failed_names = join_names([r for group, _ in failed for r in group])
+            parts.append(f"I couldn't send it to {failed_names}.")
+        result = " ".join(parts)
+
+    log_tool_result("send_email", result)
+    return result
+
 
 
+def search_results(query: str, max_results: int = 3) -> list[dict]:
+    """DuckDuckGo text results (title, href, body); blocking, so run it in a thread"""
+    with DDGS() as ddgs:
+        return list(ddgs.text(query, max_results=max_results))
+
 
 @function_tool()
+@interactive
 async def search_web(
     context: RunContext,
-    query: str
+    query: str,
+    read_pages: bool = False
 ) -> str:
     """
     Search the web using DuckDuckGo for general questions.
     
     Args:
         query: The search query
+        read_pages: Also read the top result pages for the exact answer (takes
+            up to a couple of seconds longer). Only for specific facts such as
+            dates, numbers or figures that short snippets are likely to cut off.
     """
-    log_tool_call("search_web", query=query)
+    log_tool_call("search_web", query=query, read_pages=read_pages)
+    memo = get_session_memo(session_scope())
+    recalled = memo.recall("search_web", query=query, read_pages=read_pages)
+    if recalled:
+        log_tool_result("search_web", recalled)
+        return recalled
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=3))
-            
-            if not results:
-                return "I couldn't find any results for that query."
-            
-            summaries = ["Here's what I found:"]
-            for i, r in enumerate(results, 1):
-                title = r.get("title", "")
-                body = r.get("body", "")[:200]
-                summaries.append(f"  {i}. {title}: {body}")
-            
-            result = "\n".join(summaries)
-            # Compress if large
-            final_result = await compress_text(result) if len(result) > 500 else result
-            log_tool_result("search_web", final_result)
-            return final_result
-            
+        # DDGS is synchronous - keep it off the event loop
+        results = await asyncio.to_thread(search_results, query)
+
+        if not results:
+            return "I couldn't find any results for that query."
+
+        # Read the result pages for the sentences that answer the query, if asked
+        if read_pages and ENRICH_ENABLED:
+            answers = await enrich_results(query, results)
+        else:
+            answers = [None] * len(results)
+
+        summaries = ["Here's what I found:"]
+        for i, (r, answer) in enumerate(zip(results, answers), 1):
+            title = r.get("title", "")
+            body = answer or r.get("body", "")[:200]
+            summaries.append(f"  {i}. {title}: {body}")
+
+        result = "\n".join(summaries)
+        # Only say what changed if this was already searched this session
+        final_result = memo.update("search_web", result, query=query, read_pages=read_pages)
+        if final_result is None:
+            # Compress if it pays off for this tool
+            final_result = await compress_for_tool("search_web", result)
+        log_tool_result("search_web", final_result)
+        return final_result
+
     except Exception as e:
         logging.error(f"Error searching web: {e}")
         return "There was an error searching the web."
 
 
 @function_tool()
+@interactive
 async def lookup_contact(
     context: RunContext,
     name: str
@@ -1,11 +1,19 @@
 """
 Otto Voice Agent - Token Company Compression
 Uses bear-1 model to compress context before LLM processing
-Optional dependency - works without tokenc installed
+Optional dependency - falls back to local extractive compression
+when tokenc is not installed, not configured, or the call fails
 """
 
 import os
+import re
+import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
+
+from local_compression import local_compress
+from shared_cache import get_shared_cache
 
 # Try to import tokenc, but make it optional
 try:
@@ -19,6 +27,21 @@ except ImportError:
 TTC_API_KEY = os.getenv("TTC_API_KEY")
 _client = None
 
+# "auto": bear-1 with local fallback, "local": local only,
+# "hybrid": local first pass (dedup, boilerplate) then bear-1
+TTC_MODE = os.getenv("TTC_MODE", "auto").lower()
+
+# Large inputs are split into chunks of about this many characters and
+# compressed concurrently, at most TTC_CONCURRENCY requests at a time
+TTC_CHUNK_CHARS = int(os.getenv("TTC_CHUNK_CHARS", "2000"))
+TTC_CONCURRENCY = int(os.getenv("TTC_CONCURRENCY", "4"))
+
+# Compressed chunks by content hash, so unchanged chunks are never resent
+CHUNK_CACHE_SIZE = 512
+_chunk_cache: OrderedDict[str, str] = OrderedDict()
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
 
 def get_client():
     """Get or create Token Company client."""
@@ -30,45 +53,151 @@ def get_client():
     return _client
 
 
-async def compress_text(text: str, aggressiveness: float = 0.7) -> str:
+async def compress_remote(text: str, aggressiveness: float = 0.7) -> str:
+    """
+    Compress text with bear-1, off the event loop.
+
+    Raises if tokenc is unavailable or the call fails.
+    """
+    client = get_client()
+    if not client:
+        raise RuntimeError("Token Company client not configured")
+    # compress_input is a blocking HTTP call - keep it off the event loop
+    result = await asyncio.to_thread(
+        client.compress_input,
+        input=text,
+        aggressiveness=aggressiveness
+    )
+    return result.output
+
+
+def split_chunks(text: str, max_chars: int = TTC_CHUNK_CHARS) -> list[str]:
+    """
+    Split text on semantic boundaries into chunks of at most ~max_chars.
+
+    Prefers paragraph breaks, then line breaks, then sentence ends; a single
+    sentence longer than max_chars becomes its own chunk.
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    def pieces(block: str, separators: list) -> list[str]:
+        if len(block) <= max_chars or not separators:
+            return [block]
+        sep, rest = separators[0], separators[1:]
+        parts = sep.split(block) if isinstance(sep, re.Pattern) else block.split(sep)
+        out = []
+        for part in parts:
+            out.extend(pieces(part, rest))
+        return out
+
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces(text, ["\n\n", "\n", _SENTENCE_END]):
+        if not piece.strip():
+            continue
+        if current and len(current) + len(piece) + 1 > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _compress_chunk(chunk: str, aggressiveness: float, semaphore: asyncio.Semaphore) -> str:
+    key = hashlib.sha1(f"{aggressiveness}:{chunk}".encode("utf-8")).hexdigest()
+    cached = _chunk_cache.get(key)
+    if cached is not None:
+        _chunk_cache.move_to_end(key)
+        return cached
+    # Another worker process may have compressed it already
+    cached = await get_shared_cache().aget("chunk", key)
+    if cached is not None:
+        _remember_chunk(key, cached)
+        return cached
+
+    try:
+        async with semaphore:
+            compressed = await compress_remote(chunk, aggressiveness)
+    except Exception as e:
+        # Only this chunk falls back; the rest still get bear-1
+        logging.warning(f"Token Company chunk compression failed, compressing locally: {e}")
+        return local_compress(chunk, aggressiveness)
+
+    _remember_chunk(key, compressed)
+    await get_shared_cache().aset("chunk", key, compressed)
+    return compressed
+
+
+def _remember_chunk(key: str, compressed: str) -> None:
+    _chunk_cache[key] = compressed
+    if len(_chunk_cache) > CHUNK_CACHE_SIZE:
+        _chunk_cache.popitem(last=False)
+
+
+async def compress_chunked(text: str, aggressiveness: float = 0.7) -> str:
+    """
+    Compress text with bear-1 chunk by chunk, concurrently and in order.
+
+    Chunks are cached by content, so a payload that only changed in one
+    place costs one request.
+    """
+    chunks = split_chunks(text)
+    semaphore = asyncio.Semaphore(TTC_CONCURRENCY)
+    compressed = await asyncio.gather(
+        *(_compress_chunk(chunk, aggressiveness, semaphore) for chunk in chunks)
+    )
+    if len(chunks) > 1:
+        logging.info(f"Compressed {len(chunks)} chunks (concurrency {TTC_CONCURRENCY})")
+    return "\n".join(compressed)
+
+
+async def compress_text(text: str, aggressiveness: float = 0.7, min_chars: int = 500) -> str:
     """
     Compress text using Token Company's bear-1 model.
     
     Args:
         text: The text to compress
         aggressiveness: Compression level 0.0-1.0 (higher = more compression)
+        min_chars: Text shorter than this is returned unchanged
     
     Returns:
-        Compressed text, or original if compression fails/unavailable
+        Compressed text; locally compressed if bear-1 is unavailable/fails
     """
-    client = get_client()
-    
-    if not client:
-        # tokenc not installed or not configured - just return original
-        return text
-    
     # Skip short text
-    if len(text) < 500:
+    if len(text) < min_chars:
         return text
-    
+
+    if TTC_MODE == "local" or not get_client():
+        # tokenc not installed or not configured - compress locally
+        compressed = local_compress(text, aggressiveness)
+        _log_ratio("Locally compressed", text, compressed)
+        return compressed
+
+    source = local_compress(text, aggressiveness=0.0) if TTC_MODE == "hybrid" else text
+
     try:
-        result = client.compress_input(
-            input=text,
-            aggressiveness=aggressiveness
-        )
-        
-        compressed = result.output
-        ratio = len(text) / len(compressed) if compressed else 1.0
-        logging.info(f"Compressed {len(text)} -> {len(compressed)} chars ({ratio:.1f}x)")
-        
+        compressed = await compress_chunked(source, aggressiveness)
+        _log_ratio("Compressed", text, compressed)
         return compressed
         
     except Exception as e:
-        logging.warning(f"Token Company compression failed: {e}")
-        return text
+        logging.warning(f"Token Company compression failed, compressing locally: {e}")
+        return local_compress(text, aggressiveness)
+
+
+def chunk_cache_stats() -> dict:
+    """Entries and characters held by the compressed chunk cache."""
+    return {"entries": len(_chunk_cache), "chars": sum(len(v) for v in _chunk_cache.values())}
+
+
+def _log_ratio(label: str, text: str, compressed: str) -> None:
+    ratio = len(text) / len(compressed) if compressed else 1.0
+    logging.info(f"{label} {len(text)} -> {len(compressed)} chars ({ratio:.1f}x)")
 
 
 def compress_text_sync(text: str, aggressiveness: float = 0.7) -> str:
     """Synchronous version for non-async contexts."""
-    import asyncio
     return asyncio.run(compress_text(text, aggressiveness))
@@ -0,0 +1,49 @@
+import { timingSafeEqual } from 'crypto'
+import { NextRequest, NextResponse } from 'next/server'
+import { createClient } from '@supabase/supabase-js'
+
+// Admin client for DB operations
+const supabaseAdmin = createClient(
+    process.env.NEXT_PUBLIC_SUPABASE_URL!,
+    process.env.SUPABASE_SERVICE_ROLE_KEY!
+)
+
+// Constant-time comparison, so the secret can't be guessed byte by byte from timings
+function secretMatches(given: string | null, secret: string): boolean {
+    if (!given) return false
+    const a = Buffer.from(given)
+    const b = Buffer.from(secret)
+    return a.length === b.length && timingSafeEqual(a, b)
+}
+
+// Users with at least one connected integration - the briefing batch job's work list.
+// Every agent-facing route trusts X-User-ID, so this list must never be public:
+// without AGENT_SECRET configured the route refuses to answer at all.
+export async function GET(request: NextRequest) {
+    const secret = process.env.AGENT_SECRET
+    if (!secret) {
+        console.error('AGENT_SECRET is not set - refusing to list users')
+        return NextResponse.json({ error: 'Agent secret not configured' }, { status: 500 })
+    }
+    if (!secretMatches(request.headers.get('x-agent-secret'), secret)) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+    }
+
+    const { data, error } = await supabaseAdmin
+        .from('user_integrations')
+        .select('user_id, provider')
+
+    if (error) {
+        console.error('Error listing users:', error)
+        return NextResponse.json({ error: 'Failed to list users' }, { status: 500 })
+    }
+
+    const users: Record<string, string[]> = {}
+    for (const row of data || []) {
+        (users[row.user_id] ||= []).push(row.provider)
+    }
+
+    return NextResponse.json({
+        users: Object.entries(users).map(([id, connected]) => ({ id, connected }))
+    })
+}
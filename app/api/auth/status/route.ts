@@ -1,4 +1,4 @@
-import { NextResponse } from 'next/server'
+import { NextRequest, NextResponse } from 'next/server'
 import { createClient } from '@supabase/supabase-js'
 import { createServerClient } from '@supabase/ssr'
 import { cookies } from 'next/headers'
@@ -36,22 +36,23 @@ async function getAuthUser() {
     return user
 }
 
-export async function GET() {
-    // Get real user from session
+export async function GET(request: NextRequest) {
+    // Get real user from session, or X-User-ID header (used by voice agent)
     const user = await getAuthUser()
+    const userId = user?.id || request.headers.get('X-User-ID')
 
-    if (!user) {
+    if (!userId) {
         return NextResponse.json({ connected: [] })
     }
 
     const { data, error } = await supabaseAdmin
         .from('user_integrations')
         .select('provider')
-        .eq('user_id', user.id)
+        .eq('user_id', userId)
 
     if (error) {
         console.error('Error fetching integrations:', error)
-        return NextResponse.json({ connected: [] })
+        return NextResponse.json({ connected: [], error: 'Failed to fetch integrations' })
     }
 
     const connectedProviders = data?.map((row) => row.provider) || []
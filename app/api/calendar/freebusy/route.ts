@@ -0,0 +1,103 @@
+import { createClient } from '@/lib/supabase/server'
+import { NextRequest, NextResponse } from 'next/server'
+import { getValidGoogleToken } from '@/lib/google-auth'
+
+// GET - Busy intervals for the user (and optional attendees) over a range
+export async function GET(request: NextRequest) {
+    const supabase = await createClient()
+
+    // Get query params
+    const { searchParams } = new URL(request.url)
+    const days = Math.min(Math.max(parseInt(searchParams.get('days') || '7'), 1), 60)
+    const attendees = (searchParams.get('attendees') || '')
+        .split(',')
+        .map((a) => a.trim())
+        .filter(Boolean)
+        .slice(0, 20)
+
+    // Get user - either from session cookie OR from X-User-ID header (for agent)
+    let userId: string | null = null
+
+    const { data: { user } } = await supabase.auth.getUser()
+    if (user) {
+        userId = user.id
+    } else {
+        // Fallback to X-User-ID header (used by voice agent)
+        userId = request.headers.get('X-User-ID')
+    }
+
+    if (!userId) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+    }
+
+    // Get valid Google token (auto-refreshes if expired)
+    const providerToken = await getValidGoogleToken(userId)
+
+    if (!providerToken) {
+        return NextResponse.json({
+            error: 'Google Calendar not connected or token expired. Please reconnect Google.',
+            connected: false
+        }, { status: 401 })
+    }
+
+    try {
+        const now = new Date()
+        const timeMin = now.toISOString()
+        const timeMax = new Date(now.getTime() + days * 24 * 60 * 60 * 1000).toISOString()
+
+        // One freeBusy query covers the user's calendar and every attendee
+        const response = await fetch('https://www.googleapis.com/calendar/v3/freeBusy', {
+            method: 'POST',
+            headers: {
+                Authorization: `Bearer ${providerToken}`,
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                timeMin,
+                timeMax,
+                items: [{ id: 'primary' }, ...attendees.map((id) => ({ id }))],
+            }),
+        })
+
+        if (!response.ok) {
+            const errorData = await response.json()
+
+            if (response.status === 401) {
+                return NextResponse.json({
+                    error: 'Google token expired. Please reconnect.',
+                    connected: false
+                }, { status: 401 })
+            }
+
+            return NextResponse.json({
+                error: 'Google API error',
+                details: errorData
+            }, { status: response.status })
+        }
+
+        const data = await response.json()
+        const calendars = data.calendars || {}
+
+        // Busy intervals per calendar; calendars we can't see are reported separately
+        const busy: Record<string, { start: string, end: string }[]> = {}
+        const unavailable: string[] = []
+        for (const [id, calendar] of Object.entries<any>(calendars)) {
+            if (calendar.errors?.length) {
+                unavailable.push(id)
+                continue
+            }
+            busy[id] = calendar.busy || []
+        }
+
+        return NextResponse.json({
+            timeMin,
+            timeMax,
+            busy,
+            unavailable,
+            connected: true
+        })
+    } catch (err) {
+        console.error('Calendar FreeBusy Error:', err)
+        return NextResponse.json({ error: 'Internal Server Error' }, { status: 500 })
+    }
+}
@@ -1,6 +1,7 @@
 import { createClient } from '@/lib/supabase/server'
 import { NextRequest, NextResponse } from 'next/server'
 import { getValidGoogleToken } from '@/lib/google-auth'
+import { jsonWithETag } from '@/lib/etag'
 
 export async function GET(request: NextRequest) {
     const supabase = await createClient()
@@ -8,6 +9,9 @@ export async function GET(request: NextRequest) {
     // Get timeframe from query params
     const { searchParams } = new URL(request.url)
     const timeframe = searchParams.get('timeframe') || 'week'
+    // Voice agent range query: N days from the start of today, recurring
+    // series unexpanded (the agent expands and indexes them itself)
+    const daysParam = searchParams.get('days')
 
     // Get user - either from session cookie OR from X-User-ID header (for agent)
     let userId: string | null = null
@@ -34,6 +38,10 @@ export async function GET(request: NextRequest) {
         }, { status: 401 })
     }
 
+    if (daysParam) {
+        return getAgentRange(request, providerToken, daysParam)
+    }
+
     try {
         // Calculate time range based on timeframe
         const now = new Date()
@@ -114,7 +122,7 @@ export async function GET(request: NextRequest) {
             isToday: isToday(item.start?.dateTime || item.start?.date),
         })) || []
 
-        return NextResponse.json({
+        return jsonWithETag(request, {
             events,
             connected: true
         })
@@ -124,6 +132,66 @@ export async function GET(request: NextRequest) {
     }
 }
 
+async function getAgentRange(request: NextRequest, providerToken: string, daysParam: string) {
+    const days = Math.min(Math.max(parseInt(daysParam) || 1, 1), 31)
+    const start = new Date()
+    start.setHours(0, 0, 0, 0)
+    // A day of slack either side, since the agent's time zone may differ from ours
+    const timeMin = new Date(start.getTime() - 24 * 60 * 60 * 1000).toISOString()
+    const timeMax = new Date(start.getTime() + (days + 1) * 24 * 60 * 60 * 1000).toISOString()
+
+    try {
+        const items: any[] = []
+        let pageToken: string | null = null
+        do {
+            const pageParam: string = pageToken ? `&pageToken=${encodeURIComponent(pageToken)}` : ''
+            const response = await fetch(
+                `https://www.googleapis.com/calendar/v3/calendars/primary/events?` +
+                `timeMin=${timeMin}&timeMax=${timeMax}&singleEvents=false&showDeleted=true&maxResults=250${pageParam}`,
+                {
+                    headers: {
+                        Authorization: `Bearer ${providerToken}`,
+                    },
+                }
+            )
+
+            if (!response.ok) {
+                const errorData = await response.json()
+                return NextResponse.json({
+                    error: response.status === 401 ? 'Google token expired. Please reconnect.' : 'Google API error',
+                    details: errorData,
+                    connected: response.status !== 401
+                }, { status: response.status })
+            }
+
+            const data = await response.json()
+            items.push(...(data.items || []))
+            pageToken = data.nextPageToken || null
+        } while (pageToken)
+
+        const events = items.map((item: any) => ({
+            id: item.id,
+            title: item.summary || 'Untitled Event',
+            start: item.start?.dateTime || item.start?.date || null,
+            end: item.end?.dateTime || item.end?.date || null,
+            timeZone: item.start?.timeZone || null,
+            recurrence: item.recurrence || null,
+            recurringEventId: item.recurringEventId || null,
+            originalStart: item.originalStartTime?.dateTime || item.originalStartTime?.date || null,
+            status: item.status || 'confirmed',
+            location: item.location || null,
+        }))
+
+        return jsonWithETag(request, {
+            events,
+            connected: true
+        })
+    } catch (err) {
+        console.error('Calendar Range Fetch Error:', err)
+        return NextResponse.json({ error: 'Internal Server Error' }, { status: 500 })
+    }
+}
+
 function isToday(dateString: string): boolean {
     const date = new Date(dateString)
     const today = new Date()
@@ -1,6 +1,7 @@
 import { createClient } from '@/lib/supabase/server'
 import { NextRequest, NextResponse } from 'next/server'
 import { getValidGithubToken } from '@/lib/github-auth'
+import { jsonWithETag } from '@/lib/etag'
 
 export async function GET(request: NextRequest) {
     const searchParams = request.nextUrl.searchParams
@@ -142,7 +143,7 @@ export async function GET(request: NextRequest) {
             // Sort by date descending
             allEvents.sort((a, b) => new Date(b.date).getTime() - new Date(a.date).getTime())
 
-            return NextResponse.json({
+            return jsonWithETag(request, {
                 events: allEvents.slice(0, 20),
                 connected: true
             })
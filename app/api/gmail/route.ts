@@ -1,6 +1,7 @@
 import { createClient } from '@/lib/supabase/server'
 import { NextRequest, NextResponse } from 'next/server'
 import { getValidGoogleToken } from '@/lib/google-auth'
+import { jsonWithETag } from '@/lib/etag'
 
 export async function GET(request: NextRequest) {
     const supabase = await createClient()
@@ -9,6 +10,9 @@ export async function GET(request: NextRequest) {
     const { searchParams } = new URL(request.url)
     const includeFull = searchParams.get('full') === 'true'
     const limit = Math.min(parseInt(searchParams.get('limit') || '10'), 20)
+    const cursor = searchParams.get('cursor')
+    // Specific messages by ID (e.g. bodies for the agent's summary cache), instead of a page
+    const ids = (searchParams.get('ids') || '').split(',').filter(Boolean).slice(0, 20)
 
     // Get user - either from session cookie OR from X-User-ID header (for agent)
     let userId: string | null = null
@@ -36,25 +40,31 @@ export async function GET(request: NextRequest) {
     }
 
     try {
-        // Fetch messages from Gmail API
-        const response = await fetch(
-            'https://gmail.googleapis.com/gmail/v1/users/me/messages?maxResults=20&labelIds=INBOX',
-            {
-                headers: {
-                    Authorization: `Bearer ${accessToken}`,
-                },
+        let data: any = {}
+        if (ids.length > 0) {
+            data = { messages: ids.map((id) => ({ id })) }
+        } else {
+            // Fetch one page of messages from Gmail API (cursor is Gmail's page token)
+            const pageParam = cursor ? `&pageToken=${encodeURIComponent(cursor)}` : ''
+            const response = await fetch(
+                `https://gmail.googleapis.com/gmail/v1/users/me/messages?maxResults=${limit}&labelIds=INBOX${pageParam}`,
+                {
+                    headers: {
+                        Authorization: `Bearer ${accessToken}`,
+                    },
+                }
+            )
+
+            if (!response.ok) {
+                const errorData = await response.json()
+                return NextResponse.json({
+                    error: 'Gmail API error',
+                    details: errorData
+                }, { status: response.status })
             }
-        )
 
-        if (!response.ok) {
-            const errorData = await response.json()
-            return NextResponse.json({
-                error: 'Gmail API error',
-                details: errorData
-            }, { status: response.status })
+            data = await response.json()
         }
-
-        const data = await response.json()
         const messageIds = data.messages || []
 
         // Fetch details for each message (in parallel)
@@ -62,7 +72,7 @@ export async function GET(request: NextRequest) {
         const metadataHeaders = includeFull ? '' : '&metadataHeaders=From&metadataHeaders=Subject&metadataHeaders=Date'
 
         const messageDetails = await Promise.all(
-            messageIds.slice(0, limit).map(async (msg: any) => {
+            messageIds.slice(0, ids.length > 0 ? ids.length : limit).map(async (msg: any) => {
                 const detailResponse = await fetch(
                     `https://gmail.googleapis.com/gmail/v1/users/me/messages/${msg.id}?format=${format}${metadataHeaders}`,
                     {
@@ -112,15 +122,17 @@ export async function GET(request: NextRequest) {
 
         // Also create events format for voice agent
         const events = formattedMessages.map((msg: any) => ({
+            id: msg.id,
             actor: msg.from,
             title: msg.subject,
             date: msg.date,
             unread: msg.unread,
         }))
 
-        return NextResponse.json({
+        return jsonWithETag(request, {
             messages: formattedMessages,
             events,  // For voice agent compatibility
+            nextCursor: data.nextPageToken || null,
             connected: true
         })
     } catch (err) {
@@ -35,15 +35,29 @@ export async function POST(request: NextRequest) {
         const body = await request.json()
         const { to, subject, body: emailBody } = body
 
-        if (!to || !subject || !emailBody) {
+        // One address or a list of them (a single email to everyone)
+        const recipients: string[] = (Array.isArray(to) ? to : [to])
+            .filter((r: unknown) => typeof r === 'string')
+            .map((r: string) => r.trim())
+            .filter(Boolean)
+
+        if (!recipients.length || !subject || !emailBody) {
             return NextResponse.json({
                 error: 'Missing required fields: to, subject, body'
             }, { status: 400 })
         }
 
+        const invalid = recipients.filter((r) => !/^[^\s@,<>]+@[^\s@,<>]+$/.test(r))
+        if (invalid.length) {
+            return NextResponse.json({
+                error: 'Invalid recipient address',
+                invalid
+            }, { status: 400 })
+        }
+
         // Construct RFC 2822 formatted email
         const email = [
-            `To: ${to}`,
+            `To: ${recipients.join(', ')}`,
             `Subject: ${subject}`,
             'Content-Type: text/plain; charset=utf-8',
             '',
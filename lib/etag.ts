@@ -0,0 +1,29 @@
+/**
+ * Conditional GET Utility
+ * JSON responses with a content-hash ETag, answering 304 Not Modified when
+ * the caller (e.g. the voice agent) already holds the same body
+ */
+
+import { createHash } from 'crypto'
+import { NextRequest, NextResponse } from 'next/server'
+
+/**
+ * Build a JSON response with an ETag, or a bodiless 304 if If-None-Match matches
+ */
+export function jsonWithETag(request: NextRequest, body: unknown): NextResponse {
+    const payload = JSON.stringify(body)
+    const etag = `"${createHash('sha1').update(payload).digest('base64url')}"`
+    const headers = {
+        ETag: etag,
+        'Cache-Control': 'private, no-cache',
+    }
+
+    if (request.headers.get('If-None-Match') === etag) {
+        return new NextResponse(null, { status: 304, headers })
+    }
+
+    return new NextResponse(payload, {
+        status: 200,
+        headers: { ...headers, 'Content-Type': 'application/json' },
+    })
+}